@@ -0,0 +1,50 @@
+"""
+create decision audit
+
+Revision ID: 5d2f8a61c4b7
+Revises: 3c41d0f5a9e2
+Create Date: 2026-10-18 14:05:00.000000
+"""
+
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "5d2f8a61c4b7"
+down_revision: Union[str, Sequence[str], None] = "3c41d0f5a9e2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "decision_audit",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("decided_at", sa.DateTime(), nullable=False),
+        sa.Column("application", sa.JSON(), nullable=False),
+        sa.Column("state", sa.String(), nullable=False),
+        sa.Column("tier", sa.String(), nullable=False),
+        sa.Column("state_risk", sa.String(), nullable=False),
+        sa.Column("debt_ratio", sa.Float(), nullable=False),
+        sa.Column("bureau_score", sa.Integer(), nullable=False),
+        sa.Column("max_eligible", sa.Float(), nullable=False),
+        sa.Column("stability_max_dti_ratio", sa.Float(), nullable=False),
+        sa.Column("pin_serviceable", sa.Boolean(), nullable=False),
+        sa.Column("risk_assessment", sa.String(), nullable=False),
+        sa.Column("decision", sa.String(), nullable=False),
+        sa.Column("message", sa.String(), nullable=False),
+        sa.Column("approved_amount", sa.Float(), nullable=False),
+        sa.Column("manual_review_required", sa.Boolean(), nullable=False),
+        sa.Column("interest_rate", sa.String(), nullable=False),
+        sa.Column("rule_version", sa.String(), nullable=False),
+        sa.Column("bureau_version", sa.String(), nullable=False),
+        sa.Column("decision_version", sa.String(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_decision_audit_decided_at", "decision_audit", ["decided_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_decision_audit_decided_at", table_name="decision_audit")
+    op.drop_table("decision_audit")
@@ -0,0 +1,46 @@
+"""
+add outbox idempotency key
+
+Revision ID: 7a9c3e1f2b64
+Revises: 5d2f8a61c4b7
+Create Date: 2026-10-18 16:40:00.000000
+"""
+
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "7a9c3e1f2b64"
+down_revision: Union[str, Sequence[str], None] = "5d2f8a61c4b7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "post_approval_outbox",
+        sa.Column("idempotency_key", sa.String(), nullable=True),
+    )
+    op.add_column(
+        "post_approval_outbox", sa.Column("payload_hash", sa.String(), nullable=True)
+    )
+    op.add_column(
+        "post_approval_outbox", sa.Column("response", sa.JSON(), nullable=True)
+    )
+    op.create_index(
+        "ux_post_approval_outbox_idempotency_key",
+        "post_approval_outbox",
+        ["idempotency_key"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ux_post_approval_outbox_idempotency_key", table_name="post_approval_outbox"
+    )
+    with op.batch_alter_table("post_approval_outbox") as batch_op:
+        batch_op.drop_column("response")
+        batch_op.drop_column("payload_hash")
+        batch_op.drop_column("idempotency_key")
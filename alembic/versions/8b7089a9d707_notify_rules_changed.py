@@ -0,0 +1,46 @@
+"""
+notify rules changed
+
+Revision ID: 8b7089a9d707
+Revises: e2bad41618ea
+Create Date: 2026-10-18 09:10:00.000000
+"""
+
+from typing import Sequence, Union
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "8b7089a9d707"
+down_revision: Union[str, Sequence[str], None] = "e2bad41618ea"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+RULE_TABLES = ["state_risk", "city_rules", "unserviceable_pins", "risk_level_rules"]
+
+
+def upgrade() -> None:
+    # Statement-level triggers: a bulk import sends one notification per
+    # statement rather than one per row. The payload is the table name so
+    # listeners can reload just that table.
+    op.execute("""
+        CREATE OR REPLACE FUNCTION notify_rules_changed() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('rules_changed', TG_TABLE_NAME);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """)
+
+    for table in RULE_TABLES:
+        op.execute(f"""
+            CREATE TRIGGER {table}_notify_rules_changed
+            AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table}
+            FOR EACH STATEMENT EXECUTE FUNCTION notify_rules_changed()
+            """)
+
+
+def downgrade() -> None:
+    for table in RULE_TABLES:
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_notify_rules_changed ON {table}")
+
+    op.execute("DROP FUNCTION IF EXISTS notify_rules_changed()")
@@ -0,0 +1,33 @@
+from fastapi import APIRouter, HTTPException, Query, status
+
+from app.services.credit.loan_evaluator import get_decision_engine
+
+router = APIRouter(prefix="/debug", tags=["Debug"])
+
+
+@router.get("/traces")
+async def list_traces(limit: int = Query(20, ge=1, le=1000), label: str | None = None):
+    """
+    Most recent decision traces first: per node, its timing and the rule it
+    matched, plus the zen input and result.
+    """
+    tracer = get_decision_engine().tracer
+    return {"stats": tracer.stats(), "traces": tracer.recent(limit, label)}
+
+
+@router.get("/traces/{trace_id}")
+async def get_trace(trace_id: str):
+    trace = get_decision_engine().tracer.get(trace_id)
+    if trace is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Trace not found; it may have been evicted from the buffer",
+        )
+    return trace
+
+
+@router.delete("/traces")
+async def clear_traces():
+    tracer = get_decision_engine().tracer
+    tracer.clear()
+    return tracer.stats()
@@ -0,0 +1,23 @@
+from fastapi import APIRouter, status
+from fastapi.responses import JSONResponse
+
+from app.core.startup import startup_profile
+
+router = APIRouter(prefix="/health", tags=["Health"])
+
+
+@router.get("/live")
+async def live():
+    return {"status": "ok"}
+
+
+@router.get("/ready")
+async def ready():
+    """
+    503 until startup warm-up has completed (and again while shutting down),
+    with the startup timings either way.
+    """
+    body = {**startup_profile.stats(), "error": startup_profile.error}
+    if not startup_profile.ready:
+        return JSONResponse(body, status_code=status.HTTP_503_SERVICE_UNAVAILABLE)
+    return body
@@ -1,24 +1,137 @@
 from fastapi import (
     APIRouter,
     Depends,
+    Header,
     HTTPException,
+    Request,
     status,
 )
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import ORJSONResponse
+from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
 import logging
 
-from app.schemas.loan import LoanRequest, LoanResponse
+from app.schemas.loan import (
+    LoanBatchRequest,
+    LoanBatchResponse,
+    LoanRequest,
+    LoanResponse,
+)
+from app.core import settings
 from app.core.database import get_async_db
+from app.services.admission import AdmissionRejected, admission_controller
+from app.services.credit.batch_evaluator import evaluate_loan_batch
 from app.services.credit.loan_evaluator import evaluate_loan
+from app.services.decision_audit import AuditBackpressure
+from app.services.idempotency import (
+    MAX_KEY_LENGTH,
+    IdempotencyConflict,
+    idempotency_store,
+)
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/loan", tags=["Loan"])
 
 
-@router.post("/evaluate", response_model=LoanResponse)
-async def evaluate(request: LoanRequest, db: AsyncSession = Depends(get_async_db)):
+# The body is parsed by the route itself, so describe it (and its 422) for the
+# OpenAPI docs. Both schemas are in the components through the batch route.
+LOAN_REQUEST_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "application/json": {"schema": {"$ref": "#/components/schemas/LoanRequest"}}
+        },
+    },
+    "responses": {
+        "422": {
+            "description": "Validation Error",
+            "content": {
+                "application/json": {
+                    "schema": {"$ref": "#/components/schemas/HTTPValidationError"}
+                }
+            },
+        }
+    },
+}
+
+
+def parse_loan_request(body: bytes) -> LoanRequest:
+    """
+    Validates the raw body straight from JSON bytes (no intermediate dict).
+    Errors surface as the usual 422 response, located under "body".
+    """
     try:
-        return await evaluate_loan(request, db)
+        return LoanRequest.model_validate_json(body)
+    except ValidationError as e:
+        errors = e.errors(include_url=False)
+        for error in errors:
+            error["loc"] = ("body", *error["loc"])
+        raise RequestValidationError(errors)
+
+
+def audit_unavailable(e: AuditBackpressure) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=str(e),
+        headers={"Retry-After": str(e.retry_after)},
+    )
+
+
+@router.post(
+    "/evaluate", response_model=LoanResponse, openapi_extra=LOAN_REQUEST_OPENAPI
+)
+async def evaluate(
+    http_request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    idempotency_key: str | None = Header(None, min_length=1, max_length=MAX_KEY_LENGTH),
+    x_decision_trace: str | None = Header(
+        None,
+        max_length=MAX_KEY_LENGTH,
+        description="Trace this evaluation; the value labels the trace in /debug/traces",
+    ),
+    x_request_timeout_ms: float | None = Header(
+        None,
+        gt=0,
+        description="How long the client will wait; bounds the time spent queued",
+    ),
+):
+    request = parse_loan_request(await http_request.body())
+    timeout = x_request_timeout_ms / 1000 if x_request_timeout_ms else None
+    # Forced traces are only readable through /debug; without it they would
+    # just cost a slower evaluation.
+    trace_label = x_decision_trace if settings.DEBUG_ENDPOINTS else None
+
+    async def admitted_evaluation(idempotency):
+        # Only real evaluations take a slot; replays and coalesced retries don't.
+        async with admission_controller.admit(timeout):
+            return await evaluate_loan(
+                request, db, trace_label=trace_label, idempotency=idempotency
+            )
+
+    try:
+        # Retries (same Idempotency-Key, or same payload in "payload" mode)
+        # share one evaluation and one set of post-approval actions.
+        response, replayed = await idempotency_store.run(
+            request, idempotency_key, admitted_evaluation
+        )
+        # evaluate_loan returns LoanResponse-typed values; encode them directly
+        # instead of validating the response model a second time.
+        return ORJSONResponse(
+            response, headers={"Idempotent-Replayed": "true"} if replayed else None
+        )
+    except IdempotencyConflict as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e)
+        )
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=e.status_code,
+            detail=e.reason,
+            headers={"Retry-After": str(e.retry_after)},
+        )
+    except AuditBackpressure as e:
+        raise audit_unavailable(e)
     except Exception as e:
         logger.error("Unexpected error in /loan/evaluate: %s", e)
 
@@ -26,3 +139,20 @@ async def evaluate(request: LoanRequest, db: AsyncSession = Depends(get_async_db
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="An unexpected error occurred while evaluating the loan.",
         )
+
+
+@router.post("/evaluate/batch", response_model=LoanBatchResponse)
+async def evaluate_batch(
+    batch: LoanBatchRequest, db: AsyncSession = Depends(get_async_db)
+):
+    try:
+        return {"results": await evaluate_loan_batch(batch.applications, db)}
+    except AuditBackpressure as e:
+        raise audit_unavailable(e)
+    except Exception as e:
+        logger.error("Unexpected error in /loan/evaluate/batch: %s", e)
+
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An unexpected error occurred while evaluating the loan batch.",
+        )
@@ -0,0 +1,24 @@
+from fastapi import APIRouter
+
+from app.services.credit.loan_evaluator import get_shadow_evaluator
+
+router = APIRouter(prefix="/shadow", tags=["Shadow"])
+
+
+@router.get("")
+async def shadow_report():
+    """
+    Champion/challenger agreement so far: counters, disagreement groups
+    (most frequent first) and the most recent disagreeing evaluations.
+    """
+    return get_shadow_evaluator().report()
+
+
+@router.delete("")
+async def reset_shadow_report():
+    """
+    Starts a fresh comparison, e.g. after editing the challenger rules.
+    """
+    shadow_evaluator = get_shadow_evaluator()
+    shadow_evaluator.reset()
+    return shadow_evaluator.stats()
@@ -1,25 +1,69 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-from dotenv import load_dotenv
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.orm import declarative_base, sessionmaker
 import os
 
-# Load environment variables
-load_dotenv()
-DATABASE_URL = os.getenv("DATABASE_URL")
-
-async_engine = create_async_engine(DATABASE_URL)
-
-# Async session maker
-AsyncSessionLocal = sessionmaker(
-    bind=async_engine, expire_on_commit=False, class_=AsyncSession
-)
+# Environment variables (and a local .env) are loaded with the settings.
+from app.core import settings  # noqa: F401
 
 # Base model for ORM classes
 Base = declarative_base()
 
+# The engine and its session maker are created on first use, so importing
+# models, repositories or services needs neither DATABASE_URL nor a driver.
+_engine: AsyncEngine | None = None
+_sessionmaker: sessionmaker | None = None
+
+
+def database_url() -> str:
+    url = os.getenv("DATABASE_URL")
+    if not url:
+        raise RuntimeError("DATABASE_URL is not set")
+    return url
+
+
+def get_engine() -> AsyncEngine:
+    global _engine, _sessionmaker
+    if _engine is None:
+        _engine = create_async_engine(database_url())
+        _sessionmaker = sessionmaker(
+            bind=_engine, expire_on_commit=False, class_=AsyncSession
+        )
+    return _engine
+
+
+def new_session() -> AsyncSession:
+    """
+    A session on the shared engine; use as `async with new_session() as db`.
+    """
+    if _sessionmaker is None:
+        get_engine()
+    return _sessionmaker()
+
+
+async def dispose_engine() -> None:
+    """
+    Closes the pool's connections. The engine is created again if used later.
+    """
+    global _engine, _sessionmaker
+    if _engine is not None:
+        engine, _engine, _sessionmaker = _engine, None, None
+        await engine.dispose()
+
+
+def pool_stats() -> dict:
+    """
+    Connection pool usage; pools that don't track a figure report it as 0,
+    and so does every figure before the engine is created.
+    """
+    pool = _engine.pool if _engine is not None else None
+    stats = {"pool": type(pool).__name__ if pool is not None else "none"}
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        figure = getattr(pool, name, None)
+        stats[name] = figure() if callable(figure) else 0
+    return stats
+
 
 # Dependency for FastAPI
 async def get_async_db():
-    async with AsyncSessionLocal() as session:
+    async with new_session() as session:
         yield session
@@ -0,0 +1,365 @@
+"""
+Minimal in-process Prometheus metrics: counters, gauges and histograms with
+labels, plus component stats() dicts exported as gauges at scrape time.
+Rendered in the Prometheus text exposition format by the /metrics route.
+"""
+
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from contextlib import contextmanager
+import math
+import re
+import threading
+import time
+
+# Latency buckets in seconds, from sub-millisecond rule lookups up to slow requests.
+LATENCY_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if value == -math.inf:
+        return "-Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Metric(ABC):
+    type_name = ""
+
+    def __init__(self, name: str, help_text: str, labelnames=()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(labels.get(name, "") for name in self.labelnames)
+
+    def render(self) -> list[str]:
+        return [
+            f"# HELP {self.name} {self.help_text}",
+            f"# TYPE {self.name} {self.type_name}",
+            *self._samples(),
+        ]
+
+    @abstractmethod
+    def _samples(self) -> list[str]:
+        """
+        The metric's sample lines, rendered below its HELP and TYPE lines.
+        """
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def __init__(self, name, help_text, labelnames=()):
+        super().__init__(name, help_text, labelnames)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def _samples(self):
+        return [
+            f"{self.name}{_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in sorted(self._values.items())
+        ]
+
+
+class Gauge(_Metric):
+    type_name = "gauge"
+
+    def __init__(self, name, help_text, labelnames=()):
+        super().__init__(name, help_text, labelnames)
+        self._values: dict[tuple, float] = {}
+
+    def set(self, value: float, **labels) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def _samples(self):
+        return [
+            f"{self.name}{_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in sorted(self._values.items())
+        ]
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: dict[tuple, _HistogramSeries] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        self.labels(*self._key(labels)).observe(value)
+
+    def labels(self, *values) -> "_HistogramSeries":
+        """
+        The series for these label values (in labelnames order). Hot paths
+        can hold on to it and skip the label lookup.
+        """
+        series = self._series.get(values)
+        if series is None:
+            with self._lock:
+                series = self._series.setdefault(values, _HistogramSeries(self.buckets))
+        return series
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def _samples(self):
+        lines = []
+        for key, series in sorted(self._series.items()):
+            counts, total, count = series.snapshot()
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(float(bound))}"'
+                lines.append(
+                    f"{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}"
+                )
+            labels = _labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class _HistogramSeries:
+    __slots__ = ("buckets", "counts", "total", "count", "_lock")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        # One count per bucket, +Inf last
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.total += value
+            self.count += 1
+
+    def snapshot(self):
+        with self._lock:
+            return list(self.counts), self.total, self.count
+
+
+def _metric_name(*parts) -> str:
+    return re.sub(r"[^a-zA-Z0-9_]", "_", "_".join(p for p in parts if p))
+
+
+class Registry:
+    def __init__(self, prefix: str):
+        self.prefix = prefix
+        self._metrics: list[_Metric] = []
+        self._stats_sources: dict = {}
+
+    def _add(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, help_text, labelnames=()) -> Counter:
+        return self._add(Counter(f"{self.prefix}_{name}", help_text, labelnames))
+
+    def gauge(self, name, help_text, labelnames=()) -> Gauge:
+        return self._add(Gauge(f"{self.prefix}_{name}", help_text, labelnames))
+
+    def histogram(
+        self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS
+    ) -> Histogram:
+        return self._add(
+            Histogram(f"{self.prefix}_{name}", help_text, labelnames, buckets)
+        )
+
+    def register_stats(self, component: str, stats) -> None:
+        """
+        Exports a component's stats() at scrape time: numbers (and bools) become
+        gauges, strings become labels on a <component>_info gauge, nested dicts
+        are flattened with their key as a name prefix.
+        """
+        self._stats_sources[component] = stats
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for component, stats in self._stats_sources.items():
+            try:
+                values = stats()
+            except Exception as e:
+                lines.append(f"# {component} stats unavailable: {_escape(e)}")
+                continue
+            lines.extend(
+                self._render_stats(_metric_name(self.prefix, component), values)
+            )
+        return "\n".join(lines) + "\n"
+
+    def _render_stats(self, base: str, values: dict) -> list[str]:
+        lines, info = [], {}
+        for key, value in values.items():
+            name = _metric_name(base, key)
+            if isinstance(value, dict):
+                lines.extend(self._render_stats(name, value))
+            elif isinstance(value, bool):
+                lines += [f"# TYPE {name} gauge", f"{name} {int(value)}"]
+            elif isinstance(value, (int, float)):
+                lines += [f"# TYPE {name} gauge", f"{name} {_format_value(value)}"]
+            elif isinstance(value, str):
+                info[key] = value
+        if info:
+            name = f"{base}_info"
+            lines += [
+                f"# TYPE {name} gauge",
+                f"{name}{_labels([_metric_name(k) for k in info], info.values())} 1",
+            ]
+        return lines
+
+
+registry = Registry("loan_engine")
+
+stage_seconds = registry.histogram(
+    "evaluation_stage_seconds",
+    "Time spent in each stage of a single loan evaluation.",
+    ("stage", "decision", "tier"),
+)
+evaluation_seconds = registry.histogram(
+    "evaluation_seconds",
+    "End-to-end time of a single loan evaluation.",
+    ("decision", "tier"),
+)
+batch_stage_seconds = registry.histogram(
+    "batch_stage_seconds",
+    "Time spent in each stage of a batch evaluation.",
+    ("stage",),
+)
+decisions_total = registry.counter(
+    "decisions_total", "Loan decisions returned.", ("decision", "tier")
+)
+http_requests_in_flight = registry.gauge(
+    "http_requests_in_flight", "HTTP requests currently being handled."
+)
+http_requests_in_flight.set(0)
+http_request_seconds = registry.histogram(
+    "http_request_seconds",
+    "HTTP request latency.",
+    ("method", "path", "status"),
+)
+
+
+class StageTimer:
+    """
+    Times the stages of one evaluation. Durations are kept locally and only
+    recorded at the end, once the decision label and tier are known.
+    """
+
+    __slots__ = ("started", "stages", "_last")
+
+    def __init__(self):
+        self.started = self._last = time.perf_counter()
+        self.stages: list[tuple[str, float]] = []
+
+    def lap(self, stage: str) -> None:
+        """
+        Ends the current stage: everything since the previous lap is `stage`.
+        """
+        now = time.perf_counter()
+        self.stages.append((stage, now - self._last))
+        self._last = now
+
+    def record(self, decision: str, tier: str) -> None:
+        for stage, seconds in self.stages:
+            stage_seconds.labels(stage, decision, tier).observe(seconds)
+        evaluation_seconds.labels(decision, tier).observe(
+            time.perf_counter() - self.started
+        )
+        decisions_total.inc(decision=decision, tier=tier)
+
+    def record_batch(self) -> None:
+        for stage, seconds in self.stages:
+            batch_stage_seconds.labels(stage).observe(seconds)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware for in-flight and latency metrics. The path label is the
+    route template (e.g. /loan/evaluate), so label cardinality stays bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        http_requests_in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_requests_in_flight.dec()
+            route = scope.get("route")
+            http_request_seconds.observe(
+                time.perf_counter() - started,
+                method=scope.get("method", ""),
+                path=getattr(route, "path", "unmatched"),
+                status=status,
+            )
@@ -0,0 +1,174 @@
+"""
+Runtime settings, read once from environment variables (a local .env is honoured).
+"""
+
+from dotenv import load_dotenv
+import os
+
+load_dotenv()
+
+
+def _get_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    return float(value) if value not in (None, "") else default
+
+
+def _get_str(name: str, default: str) -> str:
+    value = os.getenv(name)
+    return value if value not in (None, "") else default
+
+
+_TRUE = {"1", "true", "yes", "on"}
+_FALSE = {"0", "false", "no", "off"}
+
+
+def _get_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value in (None, ""):
+        return default
+    flag = value.strip().lower()
+    if flag in _TRUE:
+        return True
+    if flag in _FALSE:
+        return False
+    raise ValueError(
+        f"{name} must be one of {sorted(_TRUE)} or {sorted(_FALSE)}, got {value!r}"
+    )
+
+
+# Rule snapshot cache: how long a loaded snapshot is served before the
+# rule tables are read again.
+RULE_SNAPSHOT_TTL_SECONDS = _get_float("RULE_SNAPSHOT_TTL_SECONDS", 300.0)
+
+# How often the decision rules file is checked for edits (0 disables hot reload).
+DECISION_RULES_WATCH_INTERVAL_SECONDS = _get_float(
+    "DECISION_RULES_WATCH_INTERVAL_SECONDS", 2.0
+)
+
+# Largest number of applications accepted by /loan/evaluate/batch.
+LOAN_BATCH_MAX_SIZE = int(_get_float("LOAN_BATCH_MAX_SIZE", 5000))
+
+# Where zen decisions run: "thread" (bounded thread pool), "async" (zen's own
+# async API) or "inline" (on the event loop, as before). Note that zen's async
+# API returns full-precision floats where the sync API rounds to 15 significant
+# digits, so "async" can differ from the other modes in the last digits of amounts.
+DECISION_EXECUTOR_MODE = _get_str("DECISION_EXECUTOR_MODE", "thread")
+
+# How decisions are evaluated: "zen", or "native" to compile the rules file's
+# decision tables to Python (falling back to zen for anything the compiler
+# doesn't support). Native follows zen's full-precision (async) semantics: under
+# the "thread" and "inline" executor modes, switching to native changes
+# passed-through amounts (approved_amount) in their last digits only; decisions
+# and messages are identical (checked by benchmarks.decision_parity).
+DECISION_ENGINE_BACKEND = _get_str("DECISION_ENGINE_BACKEND", "zen")
+
+# Maximum decision evaluations running at once; extra callers wait in a queue.
+DECISION_EXECUTOR_MAX_CONCURRENCY = int(
+    _get_float("DECISION_EXECUTOR_MAX_CONCURRENCY", os.cpu_count() or 4)
+)
+
+# How often bureau_score_config.json is checked for edits; a changed file is
+# revalidated and recompiled into the credit scorer.
+BUREAU_CONFIG_CHECK_INTERVAL_SECONDS = _get_float(
+    "BUREAU_CONFIG_CHECK_INTERVAL_SECONDS", 2.0
+)
+
+# Post-approval outbox: background workers that send notifications, create
+# loan records and build repayment schedules for approved applications.
+OUTBOX_WORKERS = int(_get_float("OUTBOX_WORKERS", 2))
+# Outbox rows claimed and processed together by one worker.
+OUTBOX_BATCH_SIZE = int(_get_float("OUTBOX_BATCH_SIZE", 100))
+# How often the outbox table is polled when no in-process wake-up arrives.
+OUTBOX_POLL_INTERVAL_SECONDS = _get_float("OUTBOX_POLL_INTERVAL_SECONDS", 1.0)
+# Attempts per row before it is marked FAILED; retries back off exponentially.
+OUTBOX_MAX_ATTEMPTS = int(_get_float("OUTBOX_MAX_ATTEMPTS", 8))
+OUTBOX_RETRY_BASE_SECONDS = _get_float("OUTBOX_RETRY_BASE_SECONDS", 2.0)
+# A claimed row becomes due again after this long if its worker never finishes.
+OUTBOX_LEASE_SECONDS = _get_float("OUTBOX_LEASE_SECONDS", 60.0)
+
+# Decision result cache in front of the zen engine (0 entries disables it).
+# Entries are keyed on the rules and snapshot versions, so rule changes never
+# serve stale decisions; the TTL only bounds how long unused entries linger.
+DECISION_CACHE_MAX_ENTRIES = int(_get_float("DECISION_CACHE_MAX_ENTRIES", 10000))
+DECISION_CACHE_TTL_SECONDS = _get_float("DECISION_CACHE_TTL_SECONDS", 300.0)
+
+# Shadow evaluation: a challenger decision graph and/or risk rules file (JSON
+# list of risk_level_rules rows) evaluated in the background on a sample of
+# live traffic and compared with the champion's responses. Off when neither
+# file is set.
+SHADOW_RULES_FILE = _get_str("SHADOW_RULES_FILE", "")
+SHADOW_RISK_RULES_FILE = _get_str("SHADOW_RISK_RULES_FILE", "")
+SHADOW_SAMPLE_RATE = _get_float("SHADOW_SAMPLE_RATE", 1.0)
+# Evaluations waiting for the challenger; beyond this they are dropped.
+SHADOW_QUEUE_SIZE = int(_get_float("SHADOW_QUEUE_SIZE", 1000))
+# Distinct kinds of disagreement tracked, and full examples kept.
+SHADOW_MAX_DISAGREEMENT_GROUPS = int(_get_float("SHADOW_MAX_DISAGREEMENT_GROUPS", 1000))
+SHADOW_MAX_EXAMPLES = int(_get_float("SHADOW_MAX_EXAMPLES", 50))
+
+# PIN geo index (build_pin_geo_index.py): "off" trusts the client's state and
+# city tier, "verify" counts disagreements with the index, "derive" evaluates
+# with the index's state and tier for known PINs. The file is memory-mapped
+# read-only; a configured mode with a missing file fails startup.
+PIN_GEO_MODE = _get_str("PIN_GEO_MODE", "off")
+# Defaults to app/rules/pin_geo_index.bin.
+PIN_GEO_INDEX_FILE = _get_str("PIN_GEO_INDEX_FILE", "")
+
+# /loan/evaluate retry deduplication: "header" deduplicates requests carrying
+# an Idempotency-Key, "payload" (opt-in) also deduplicates requests without one
+# by the hash of their payload, which merges separate applications with
+# identical bodies, "off" disables it. Completed responses are replayed for
+# IDEMPOTENCY_TTL_SECONDS; the store is per process.
+IDEMPOTENCY_MODE = _get_str("IDEMPOTENCY_MODE", "header")
+IDEMPOTENCY_MAX_ENTRIES = int(_get_float("IDEMPOTENCY_MAX_ENTRIES", 10000))
+IDEMPOTENCY_TTL_SECONDS = _get_float("IDEMPOTENCY_TTL_SECONDS", 300.0)
+
+# Decision tracing: the fraction of evaluations run with zen's node-level
+# trace (which node and rule matched, per-node timings), and how many recent
+# traces are kept for GET /debug/traces. A request can force a trace with the
+# X-Decision-Trace header.
+DECISION_TRACE_SAMPLE_RATE = _get_float("DECISION_TRACE_SAMPLE_RATE", 0.0)
+DECISION_TRACE_MAX_TRACES = int(_get_float("DECISION_TRACE_MAX_TRACES", 100))
+
+# Mounts the debug endpoints (GET/DELETE /debug/traces and /shadow) when set
+# to 1 (or true/yes/on; 0/false/no/off leave them off). They return applicants' full inputs and take no credentials, so they
+# are off by default; the X-Decision-Trace header is ignored while they are off.
+# Shadow evaluation itself still runs; its counters stay on /metrics.
+DEBUG_ENDPOINTS = _get_bool("DEBUG_ENDPOINTS", False)
+
+# Admission control for /loan/evaluate: "fixed" runs at most
+# ADMISSION_MAX_CONCURRENCY evaluations at once, "adaptive" moves that limit
+# between ADMISSION_MIN_CONCURRENCY and the maximum to keep p95 service time
+# under ADMISSION_TARGET_LATENCY_SECONDS, "off" admits everything. Requests
+# over the limit wait in a FIFO queue of ADMISSION_MAX_QUEUE for up to
+# ADMISSION_QUEUE_TIMEOUT_SECONDS, and are rejected (429/503 with
+# Retry-After) beyond that.
+ADMISSION_MODE = _get_str("ADMISSION_MODE", "fixed")
+ADMISSION_MAX_CONCURRENCY = int(_get_float("ADMISSION_MAX_CONCURRENCY", 64))
+ADMISSION_MIN_CONCURRENCY = int(_get_float("ADMISSION_MIN_CONCURRENCY", 4))
+ADMISSION_MAX_QUEUE = int(_get_float("ADMISSION_MAX_QUEUE", 256))
+ADMISSION_QUEUE_TIMEOUT_SECONDS = _get_float("ADMISSION_QUEUE_TIMEOUT_SECONDS", 1.0)
+ADMISSION_TARGET_LATENCY_SECONDS = _get_float("ADMISSION_TARGET_LATENCY_SECONDS", 0.25)
+
+# Startup warm-up (DB pool, rule snapshot, decision graphs, PIN geo index and
+# one probe evaluation): "blocking" completes it before the server accepts
+# requests, and a failure aborts startup; "background" accepts requests at
+# once while GET /health/ready answers 503 until it completes; "off" leaves
+# everything to load on first use.
+STARTUP_WARMUP = _get_str("STARTUP_WARMUP", "blocking")
+
+# Decision audit log: each decision's inputs, derived metrics and outcome are
+# buffered in process and written to the decision_audit table in batches
+# (multi-row INSERT, COPY on Postgres) once DECISION_AUDIT_BATCH_SIZE rows
+# are waiting or every DECISION_AUDIT_FLUSH_INTERVAL_SECONDS. With
+# DECISION_AUDIT_MAX_BUFFER rows waiting, requests wait up to
+# DECISION_AUDIT_ENQUEUE_TIMEOUT_SECONDS for room and then fail with a 503
+# rather than go unaudited. The buffer is drained on shutdown. "off" disables it.
+DECISION_AUDIT_MODE = _get_str("DECISION_AUDIT_MODE", "batched")
+DECISION_AUDIT_BATCH_SIZE = int(_get_float("DECISION_AUDIT_BATCH_SIZE", 500))
+DECISION_AUDIT_FLUSH_INTERVAL_SECONDS = _get_float(
+    "DECISION_AUDIT_FLUSH_INTERVAL_SECONDS", 1.0
+)
+DECISION_AUDIT_MAX_BUFFER = int(_get_float("DECISION_AUDIT_MAX_BUFFER", 20000))
+DECISION_AUDIT_ENQUEUE_TIMEOUT_SECONDS = _get_float(
+    "DECISION_AUDIT_ENQUEUE_TIMEOUT_SECONDS", 1.0
+)
@@ -0,0 +1,84 @@
+"""
+Startup timing and readiness.
+
+main.py imports this module before anything else, so the time until
+imports_done() is what importing the service costs. The warm-up steps that
+follow (see loan_evaluator.warm_up) are timed as phases, and the whole
+report is logged once the service is ready and exported on /metrics.
+"""
+
+from contextlib import contextmanager
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+_IMPORTED_AT = time.perf_counter()
+
+
+class StartupProfile:
+    """
+    Moves through starting -> warming -> ready (or failed), then stopping
+    on shutdown; only "ready" passes the readiness check.
+    """
+
+    def __init__(self, started_at: float | None = None):
+        self.started_at = _IMPORTED_AT if started_at is None else started_at
+        self.state = "starting"
+        self.error: str | None = None
+        self.imports_seconds: float | None = None
+        self.ready_seconds: float | None = None
+        self.phases: dict[str, float] = {}
+
+    @property
+    def ready(self) -> bool:
+        return self.state == "ready"
+
+    def imports_done(self) -> None:
+        self.imports_seconds = time.perf_counter() - self.started_at
+
+    @contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = time.perf_counter() - started
+
+    def warming(self) -> None:
+        self.state = "warming"
+
+    def mark_ready(self) -> None:
+        self.state = "ready"
+        self.ready_seconds = time.perf_counter() - self.started_at
+        logger.info("Startup complete | %s", self.report())
+
+    def mark_failed(self, error: Exception) -> None:
+        self.state = "failed"
+        self.error = str(error) or repr(error)
+        logger.error("Startup warm-up failed: %s | %s", self.error, self.report())
+
+    def stopping(self) -> None:
+        self.state = "stopping"
+
+    def report(self) -> str:
+        parts = []
+        if self.imports_seconds is not None:
+            parts.append(f"imports {self.imports_seconds * 1000:.0f}ms")
+        parts += [f"{name} {secs * 1000:.1f}ms" for name, secs in self.phases.items()]
+        if self.ready_seconds is not None:
+            parts.append(f"ready after {self.ready_seconds * 1000:.0f}ms")
+        return " | ".join(parts)
+
+    def stats(self) -> dict:
+        return {
+            "state": self.state,
+            "ready": self.ready,
+            "imports_seconds": self.imports_seconds,
+            "warmup_seconds": sum(self.phases.values()),
+            "ready_seconds": self.ready_seconds,
+            "phases": dict(self.phases),
+        }
+
+
+startup_profile = StartupProfile()
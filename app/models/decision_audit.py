@@ -0,0 +1,44 @@
+from sqlalchemy import JSON, Boolean, Column, DateTime, Float, Index, Integer, String
+from app.core.database import Base
+
+
+class DecisionAudit(Base):
+    """
+    One row per loan decision: the application as received, the metrics
+    derived from it, the outcome and the rule versions that produced it.
+    Written in batches by the DecisionAuditWriter.
+    """
+
+    __tablename__ = "decision_audit"
+
+    id = Column(Integer, primary_key=True)
+    # Naive UTC, like the outbox timestamps
+    decided_at = Column(DateTime, nullable=False)
+
+    # LoanRequest fields as submitted
+    application = Column(JSON, nullable=False)
+
+    # Derived metrics, as passed to the decision graph
+    state = Column(String, nullable=False)  # resolved state (PIN geo index)
+    tier = Column(String, nullable=False)  # city tier applied
+    state_risk = Column(String, nullable=False)
+    debt_ratio = Column(Float, nullable=False)
+    bureau_score = Column(Integer, nullable=False)
+    max_eligible = Column(Float, nullable=False)
+    stability_max_dti_ratio = Column(Float, nullable=False)
+    pin_serviceable = Column(Boolean, nullable=False)
+    risk_assessment = Column(String, nullable=False)
+
+    # Outcome
+    decision = Column(String, nullable=False)
+    message = Column(String, nullable=False)
+    approved_amount = Column(Float, nullable=False)
+    manual_review_required = Column(Boolean, nullable=False)
+    interest_rate = Column(String, nullable=False)
+
+    # Rule snapshot, bureau config and decision graph versions
+    rule_version = Column(String, nullable=False)
+    bureau_version = Column(String, nullable=False)
+    decision_version = Column(String, nullable=False)
+
+    __table_args__ = (Index("ix_decision_audit_decided_at", "decided_at"),)
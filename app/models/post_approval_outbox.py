@@ -0,0 +1,47 @@
+from datetime import datetime, timezone
+from sqlalchemy import JSON, Column, DateTime, Index, Integer, String
+from app.core.database import Base
+
+
+def utcnow() -> datetime:
+    # Naive UTC; due times are compared with values the app itself writes.
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class PostApprovalOutbox(Base):
+    """
+    One row per approved application, written in the request's transaction and
+    worked off by the OutboxDispatcher (notification, loan record, schedule).
+    """
+
+    __tablename__ = "post_approval_outbox"
+
+    id = Column(Integer, primary_key=True)
+
+    # PENDING / DONE / FAILED (gave up after OUTBOX_MAX_ATTEMPTS)
+    status = Column(String, nullable=False, default="PENDING")
+    # {"application": {...}, "approved_amount": ..., "interest_rate": ...}
+    payload = Column(JSON, nullable=False)
+
+    attempts = Column(Integer, nullable=False, default=0)
+    # Due time for the next attempt; a claimed row is pushed out by the lease,
+    # so a row held by a crashed worker becomes due again on its own.
+    next_attempt_at = Column(DateTime, nullable=False, default=utcnow)
+    last_error = Column(String)
+
+    created_at = Column(DateTime, nullable=False, default=utcnow)
+    processed_at = Column(DateTime)
+
+    # Idempotency-Key of the request that approved (NULL without one), with
+    # its payload hash and response. The unique index makes a retry that lands
+    # on another process fail its commit instead of queueing the actions twice.
+    idempotency_key = Column(String)
+    payload_hash = Column(String)
+    response = Column(JSON)
+
+    __table_args__ = (
+        Index("ix_post_approval_outbox_due", "status", "next_attempt_at"),
+        Index(
+            "ux_post_approval_outbox_idempotency_key", "idempotency_key", unique=True
+        ),
+    )
@@ -6,4 +6,5 @@ class UnserviceablePin(Base):
     __tablename__ = "unserviceable_pins"
 
     id = Column(Integer, primary_key=True)
+    # A 6-digit pin, a district prefix ("1100") or an inclusive range ("110000-110499")
     pin_code = Column(String, unique=True)
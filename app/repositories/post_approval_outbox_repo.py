@@ -0,0 +1,90 @@
+from datetime import datetime, timedelta
+from sqlalchemy import func, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from app.models.post_approval_outbox import PostApprovalOutbox, utcnow
+
+
+class PostApprovalOutboxRepository:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    def add(
+        self,
+        payload: dict,
+        idempotency_key: str | None = None,
+        payload_hash: str | None = None,
+        response: dict | None = None,
+    ) -> PostApprovalOutbox:
+        # Flushed with the caller's transaction; nothing is written until it commits.
+        row = PostApprovalOutbox(
+            payload=payload,
+            status="PENDING",
+            attempts=0,
+            idempotency_key=idempotency_key,
+            payload_hash=payload_hash,
+            response=response,
+        )
+        self.session.add(row)
+        return row
+
+    async def get_by_idempotency_key(self, key: str) -> PostApprovalOutbox | None:
+        result = await self.session.execute(
+            select(PostApprovalOutbox).where(PostApprovalOutbox.idempotency_key == key)
+        )
+        return result.scalar_one_or_none()
+
+    async def claim_due(self, limit: int, lease_seconds: float) -> list:
+        """
+        Claims up to `limit` due rows by pushing their due time out by the lease
+        and counting the attempt, then commits. SKIP LOCKED keeps concurrent
+        dispatchers (other processes) from claiming the same rows on Postgres.
+        """
+        now = utcnow()
+        result = await self.session.execute(
+            select(PostApprovalOutbox)
+            .where(
+                PostApprovalOutbox.status == "PENDING",
+                PostApprovalOutbox.next_attempt_at <= now,
+            )
+            .order_by(PostApprovalOutbox.next_attempt_at, PostApprovalOutbox.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        rows = list(result.scalars().all())
+        lease_until = now + timedelta(seconds=lease_seconds)
+        for row in rows:
+            row.next_attempt_at = lease_until
+            row.attempts += 1
+        await self.session.commit()
+        return rows
+
+    async def mark_done(self, ids: list[int]) -> None:
+        if ids:
+            await self.session.execute(
+                update(PostApprovalOutbox)
+                .where(PostApprovalOutbox.id.in_(ids))
+                .values(status="DONE", processed_at=utcnow(), last_error=None)
+            )
+
+    async def mark_retry(self, row_id: int, error: str, retry_at: datetime) -> None:
+        await self.session.execute(
+            update(PostApprovalOutbox)
+            .where(PostApprovalOutbox.id == row_id)
+            .values(next_attempt_at=retry_at, last_error=error)
+        )
+
+    async def mark_failed(self, row_id: int, error: str) -> None:
+        await self.session.execute(
+            update(PostApprovalOutbox)
+            .where(PostApprovalOutbox.id == row_id)
+            .values(status="FAILED", processed_at=utcnow(), last_error=error)
+        )
+
+    async def count_pending(self) -> int:
+        result = await self.session.execute(
+            select(func.count())
+            .select_from(PostApprovalOutbox)
+            .where(PostApprovalOutbox.status == "PENDING")
+        )
+        return result.scalar_one()
@@ -10,3 +10,7 @@ class UnserviceablePinRepository:
     async def get_all(self):
         result = await self.session.execute(select(UnserviceablePin))
         return result.scalars().all()
+
+    async def get_all_codes(self) -> list[str]:
+        result = await self.session.execute(select(UnserviceablePin.pin_code))
+        return list(result.scalars().all())
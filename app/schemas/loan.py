@@ -1,4 +1,6 @@
-from pydantic import BaseModel, constr
+from pydantic import BaseModel, Field, constr
+
+from app.core import settings
 
 
 class LoanRequest(BaseModel):
@@ -26,3 +28,19 @@ class LoanResponse(BaseModel):
     tier_applied: str
     max_eligible_amount: float
     interest_rate: str
+
+
+class LoanBatchRequest(BaseModel):
+    applications: list[LoanRequest] = Field(
+        min_length=1, max_length=settings.LOAN_BATCH_MAX_SIZE
+    )
+
+
+class LoanBatchItemResult(BaseModel):
+    index: int
+    result: LoanResponse | None = None
+    error: str | None = None
+
+
+class LoanBatchResponse(BaseModel):
+    results: list[LoanBatchItemResult]
@@ -0,0 +1,221 @@
+from collections import deque
+from contextlib import asynccontextmanager
+import asyncio
+import logging
+import math
+import time
+
+from app.core import settings
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionRejected(Exception):
+    """
+    A request was shed instead of queued: 429 when the wait queue is full,
+    503 when it couldn't be started before its deadline.
+    """
+
+    def __init__(self, status_code: int, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.status_code = status_code
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    Bounds how many evaluations run at once, so a burst queues briefly or is
+    turned away instead of slowing every request down together.
+
+    Up to `limit` requests run; the next max_queue wait in FIFO order, each
+    until its deadline (queue_timeout, or less if the client said so). A
+    request is rejected straight away when the queue is full (429) or when
+    the expected wait already exceeds its deadline (503), and with a 503 when
+    its deadline passes in the queue. Rejections carry a Retry-After based
+    on the observed service time.
+
+    "adaptive" mode moves the limit between min_limit and max_limit (AIMD):
+    every `window` completions, if the window's p95 service time is above
+    target_latency the limit is cut by a quarter; if it was met while the
+    limit was the bottleneck, the limit grows by one.
+    """
+
+    MODES = ("off", "fixed", "adaptive")
+
+    def __init__(
+        self,
+        mode: str,
+        max_limit: int,
+        max_queue: int,
+        queue_timeout: float,
+        min_limit: int = 1,
+        target_latency: float = 0.25,
+        window: int = 50,
+    ):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown admission mode: {mode!r}")
+        if max_limit < 1 or min_limit < 1:
+            raise ValueError("Admission limits must be at least 1")
+
+        self.mode = mode
+        self.max_limit = max_limit
+        self.min_limit = min(min_limit, max_limit)
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.target_latency = target_latency
+        self.window = window
+        self.limit = max_limit
+
+        self.running = 0
+        self._waiters: deque = deque()
+        self._latencies: list[float] = []
+        self._saturated = False
+        # Moving average of service time, for wait estimates and Retry-After.
+        self.avg_latency = 0.0
+
+        self.admitted = 0
+        self.queued_total = 0
+        self.rejected_queue_full = 0
+        self.rejected_deadline = 0
+        self.rejected_timeout = 0
+        self.limit_increases = 0
+        self.limit_decreases = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "off"
+
+    def _retry_after(self) -> int:
+        drain = self.avg_latency * (len(self._waiters) + 1) / self.limit
+        return max(1, math.ceil(drain))
+
+    def _reject(self, status_code: int, reason: str) -> AdmissionRejected:
+        return AdmissionRejected(status_code, reason, self._retry_after())
+
+    @asynccontextmanager
+    async def admit(self, timeout: float | None = None):
+        """
+        Holds a slot for the duration of the block. timeout is the caller's
+        own deadline in seconds; the wait is bounded by the shorter of it
+        and queue_timeout.
+        """
+        if not self.enabled:
+            yield
+            return
+
+        await self._acquire(
+            self.queue_timeout if timeout is None else min(timeout, self.queue_timeout)
+        )
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._release(time.perf_counter() - started)
+
+    async def _acquire(self, timeout: float) -> None:
+        if self.running < self.limit and not self._waiters:
+            self.running += 1
+            self.admitted += 1
+            return
+
+        self._saturated = True
+        if len(self._waiters) >= self.max_queue:
+            self.rejected_queue_full += 1
+            raise self._reject(429, "Too many requests waiting, retry later")
+        expected_wait = self.avg_latency * (len(self._waiters) + 1) / self.limit
+        if expected_wait > timeout:
+            self.rejected_deadline += 1
+            raise self._reject(503, "Server busy, request would miss its deadline")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.queued_total += 1
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout)
+        except asyncio.TimeoutError:
+            if not waiter.done():
+                self._abandon(waiter)
+                self.rejected_timeout += 1
+                raise self._reject(503, "Server busy, timed out waiting for a slot")
+        except BaseException:
+            # Cancelled while waiting (client went away): hand back a slot we
+            # may have been given in the meantime.
+            if waiter.done() and not waiter.cancelled():
+                self._release(None)
+            else:
+                self._abandon(waiter)
+            raise
+        # The slot was handed over (and counted) by _release.
+        self.admitted += 1
+
+    def _abandon(self, waiter) -> None:
+        # Out of the queue now, not when it reaches the head: a waiter that
+        # gave up must not count toward the queue-full check, the wait
+        # estimate or hold back the fast path.
+        waiter.cancel()
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    def _release(self, latency: float | None) -> None:
+        self.running -= 1
+        if latency is not None:
+            self._observe(latency)
+        while self._waiters and self.running < self.limit:
+            waiter = self._waiters.popleft()
+            if waiter.done():
+                continue
+            self.running += 1
+            waiter.set_result(None)
+
+    def _observe(self, latency: float) -> None:
+        self.avg_latency = (
+            latency if not self.avg_latency else 0.9 * self.avg_latency + 0.1 * latency
+        )
+        if self.mode != "adaptive":
+            return
+        self._latencies.append(latency)
+        if len(self._latencies) < self.window:
+            return
+
+        latencies = sorted(self._latencies)
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        saturated = self._saturated
+        self._latencies.clear()
+        self._saturated = False
+
+        if p95 > self.target_latency and self.limit > self.min_limit:
+            self.limit = max(self.min_limit, int(self.limit * 0.75))
+            self.limit_decreases += 1
+            logger.info("Admission limit lowered to %d (p95 %.3fs)", self.limit, p95)
+        elif p95 <= self.target_latency and saturated and self.limit < self.max_limit:
+            self.limit += 1
+            self.limit_increases += 1
+
+    def stats(self) -> dict:
+        return {
+            "mode": self.mode,
+            "limit": self.limit,
+            "running": self.running,
+            "queued": len(self._waiters),
+            "avg_latency_seconds": self.avg_latency,
+            "admitted": self.admitted,
+            "queued_total": self.queued_total,
+            "rejected_queue_full": self.rejected_queue_full,
+            "rejected_deadline": self.rejected_deadline,
+            "rejected_timeout": self.rejected_timeout,
+            "limit_increases": self.limit_increases,
+            "limit_decreases": self.limit_decreases,
+        }
+
+
+admission_controller = AdmissionController(
+    settings.ADMISSION_MODE,
+    max_limit=settings.ADMISSION_MAX_CONCURRENCY,
+    max_queue=settings.ADMISSION_MAX_QUEUE,
+    queue_timeout=settings.ADMISSION_QUEUE_TIMEOUT_SECONDS,
+    min_limit=settings.ADMISSION_MIN_CONCURRENCY,
+    target_latency=settings.ADMISSION_TARGET_LATENCY_SECONDS,
+)
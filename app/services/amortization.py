@@ -0,0 +1,191 @@
+from dataclasses import dataclass
+from datetime import date
+import numpy as np
+
+# Installments fall due every 30 days, the first one 30 days after disbursal.
+INSTALLMENT_INTERVAL_DAYS = 30
+
+
+def parse_annual_rate(rate) -> float:
+    """
+    City rule rates are stored as percentage strings ("11%"); numbers are
+    read as percentages too. Returns the annual rate as a fraction (0.11).
+    """
+    if isinstance(rate, str):
+        rate = rate.strip().rstrip("%").strip()
+    value = float(rate) / 100
+    if not np.isfinite(value) or value < 0:
+        raise ValueError(f"Invalid interest rate: {rate!r}")
+    return value
+
+
+def monthly_emis(principals, annual_rates, tenures):
+    """
+    Reducing-balance EMI, P * r * (1 + r)^n / ((1 + r)^n - 1) with r the
+    monthly rate, over arrays of loans; zero-rate loans repay P / n.
+    Not rounded.
+    """
+    principals = np.asarray(principals, dtype=float)
+    r = np.asarray(annual_rates, dtype=float) / 12
+    n = np.asarray(tenures, dtype=float)
+
+    growth = np.power(1 + r, n)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        emi = principals * r * growth / (growth - 1)
+    return np.where(r > 0, emi, principals / n)
+
+
+@dataclass(frozen=True)
+class RepaymentSchedule:
+    """
+    One loan's schedule as columns (NumPy arrays, one element per installment).
+    Amounts are rounded to paise; the last installment absorbs the rounding so
+    principal sums to exactly the loan amount.
+    """
+
+    loan_id: str
+    installment_no: np.ndarray
+    due_date: np.ndarray  # datetime64[D]
+    emi: np.ndarray
+    principal: np.ndarray
+    interest: np.ndarray
+    balance: np.ndarray  # outstanding after the installment
+
+    def __len__(self) -> int:
+        return len(self.installment_no)
+
+    def rows(self):
+        """
+        Lazily yields one dict per installment, for callers that want records.
+        """
+        for i in range(len(self)):
+            yield {
+                "loan_id": self.loan_id,
+                "installment_no": int(self.installment_no[i]),
+                "emi": float(self.emi[i]),
+                "principal": float(self.principal[i]),
+                "interest": float(self.interest[i]),
+                "balance": float(self.balance[i]),
+                "due_date": self.due_date[i].item(),
+            }
+
+
+@dataclass(frozen=True)
+class ScheduleBook:
+    """
+    Schedules for many loans stored back to back in flat columns.
+    Loan i's installments are rows offsets[i]:offsets[i + 1]; nothing is
+    allocated per installment until a schedule is asked for.
+    """
+
+    loan_ids: list
+    offsets: np.ndarray
+    installment_no: np.ndarray
+    due_date: np.ndarray
+    emi: np.ndarray
+    principal: np.ndarray
+    interest: np.ndarray
+    balance: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.loan_ids)
+
+    def schedule(self, i: int) -> RepaymentSchedule:
+        # Slices are views, not copies.
+        rows = slice(self.offsets[i], self.offsets[i + 1])
+        return RepaymentSchedule(
+            loan_id=self.loan_ids[i],
+            installment_no=self.installment_no[rows],
+            due_date=self.due_date[rows],
+            emi=self.emi[rows],
+            principal=self.principal[rows],
+            interest=self.interest[rows],
+            balance=self.balance[rows],
+        )
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.schedule(i)
+
+
+def build_schedules(
+    loan_ids, principals, annual_rates, tenures, start_dates
+) -> ScheduleBook:
+    """
+    Amortizes many loans at once. Interest is charged on the outstanding
+    balance and rounded to paise each month, as a loan servicing system
+    would. The month-by-month recurrence runs as array operations across
+    every loan still running that month, so a book of any size takes at
+    most max(tenure) steps.
+    """
+    principals = np.asarray(principals, dtype=float)
+    annual_rates = np.asarray(annual_rates, dtype=float)
+    tenures = np.asarray(tenures, dtype=np.int64)
+    start_dates = np.asarray(start_dates, dtype="datetime64[D]")
+    if tenures.size and tenures.min() < 1:
+        raise ValueError("Tenure must be at least one month")
+
+    offsets = np.zeros(len(tenures) + 1, dtype=np.int64)
+    np.cumsum(tenures, out=offsets[1:])
+    rows = int(offsets[-1])
+
+    # Amounts are kept in integer paise so balances never drift.
+    balance = np.rint(principals * 100).astype(np.int64)
+    emis = np.rint(monthly_emis(principals, annual_rates, tenures) * 100).astype(
+        np.int64
+    )
+    monthly_rates = annual_rates / 12
+
+    interest_col = np.empty(rows, dtype=np.int64)
+    principal_col = np.empty(rows, dtype=np.int64)
+    balance_col = np.empty(rows, dtype=np.int64)
+
+    running = np.arange(len(tenures))
+    for month in range(1, int(tenures.max(initial=0)) + 1):
+        running = running[tenures[running] >= month]
+        opening = balance[running]
+        interest = np.rint(opening * monthly_rates[running]).astype(np.int64)
+        # The last installment clears whatever is left, absorbing rounding.
+        principal = np.where(
+            tenures[running] == month, opening, emis[running] - interest
+        )
+        balance[running] = opening - principal
+
+        at = offsets[running] + (month - 1)
+        interest_col[at] = interest
+        principal_col[at] = principal
+        balance_col[at] = balance[running]
+
+    loan = np.repeat(np.arange(len(tenures)), tenures)
+    installment_no = np.arange(rows) - offsets[loan] + 1
+    due_date = start_dates[loan] + (installment_no * INSTALLMENT_INTERVAL_DAYS).astype(
+        "timedelta64[D]"
+    )
+
+    return ScheduleBook(
+        loan_ids=list(loan_ids),
+        offsets=offsets,
+        installment_no=installment_no,
+        due_date=due_date,
+        emi=(principal_col + interest_col) / 100,
+        principal=principal_col / 100,
+        interest=interest_col / 100,
+        balance=balance_col / 100,
+    )
+
+
+def build_schedule(
+    loan_id: str,
+    principal: float,
+    annual_rate: float,
+    tenure_months: int,
+    start_date: date | None = None,
+) -> RepaymentSchedule:
+    book = build_schedules(
+        [loan_id],
+        [principal],
+        [annual_rate],
+        [tenure_months],
+        [start_date or date.today()],
+    )
+    return book.schedule(0)
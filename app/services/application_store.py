@@ -0,0 +1,194 @@
+"""
+Columnar store of historical loan applications, for offline analysis.
+
+A store is a directory with one NumPy .npy file per LoanRequest field plus
+the source row number, and a meta.json describing them. Numbers and booleans
+are stored as they are; strings (state, city tier, PIN code) are dictionary
+encoded as int32 codes into a per-field list of distinct values. Columns are
+memory-mapped read-only, so worker processes share one copy through the page
+cache and a whole-column comparison is a single NumPy operation.
+
+    store = ApplicationStore("data/applications")
+    incomes = store.column("monthly_income")      # float64 memmap
+    store.codes("state"), store.categories("state")
+"""
+
+from array import array
+from pathlib import Path
+import json
+import logging
+import os
+import shutil
+import tempfile
+
+import numpy as np
+from pydantic import ValidationError
+
+from app.schemas.loan import LoanRequest
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+META_FILE = "meta.json"
+# Source row number of each application (the file line or CSV row it came from).
+ROW_COLUMN = "_row"
+
+# LoanRequest annotation -> (kind, array typecode, NumPy dtype)
+_KINDS = {
+    int: ("int", "q", np.int64),
+    float: ("float", "d", np.float64),
+    bool: ("bool", "b", np.bool_),
+    str: ("category", "i", np.int32),
+}
+
+
+def _field_kinds() -> dict[str, str]:
+    kinds = {}
+    for name, field in LoanRequest.model_fields.items():
+        # constr(...) annotates as str with constraints attached
+        annotation = field.annotation if field.annotation in _KINDS else str
+        kinds[name] = _KINDS[annotation][0]
+    return kinds
+
+
+FIELD_KINDS = _field_kinds()
+_KIND_SPECS = {kind: (typecode, dtype) for kind, typecode, dtype in _KINDS.values()}
+
+
+class ApplicationStore:
+    """
+    Read-only view of a store directory.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        with open(self.path / META_FILE, "r") as f:
+            meta = json.load(f)
+        if meta.get("format") != FORMAT_VERSION:
+            raise ValueError(f"{self.path} is not an application store")
+        self.rows = meta["rows"]
+        self.kinds = meta["kinds"]
+        self._categories = meta["categories"]
+        self._columns = {
+            name: np.load(self.path / f"{name}.npy", mmap_mode="r")
+            for name in [ROW_COLUMN, *self.kinds]
+        }
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def column(self, name: str) -> np.ndarray:
+        """
+        The raw column: values for numbers and booleans, codes for strings.
+        """
+        return self._columns[name]
+
+    def codes(self, name: str) -> np.ndarray:
+        if self.kinds[name] != "category":
+            raise ValueError(f"{name} is not a string column")
+        return self._columns[name]
+
+    def categories(self, name: str) -> list[str]:
+        return self._categories[name]
+
+    def row_numbers(self) -> np.ndarray:
+        return self._columns[ROW_COLUMN]
+
+    def application(self, i: int) -> LoanRequest:
+        """
+        Row i as a LoanRequest. Rows were validated when the store was written.
+        """
+        values = {}
+        for name, kind in self.kinds.items():
+            value = self._columns[name][i]
+            if kind == "category":
+                values[name] = self._categories[name][value]
+            else:
+                values[name] = value.item()
+        return LoanRequest.model_construct(**values)
+
+
+class ApplicationStoreWriter:
+    """
+    Accumulates validated applications column by column and writes them as
+    a new store. Starting from an existing store appends to its rows (the
+    whole store is rewritten, keeping its string codes).
+    """
+
+    def __init__(self, base: ApplicationStore | None = None):
+        self._values = {}
+        self._categories = {}
+        self._lookup = {}
+        for name, kind in [(ROW_COLUMN, "int"), *FIELD_KINDS.items()]:
+            typecode = _KIND_SPECS[kind][0]
+            self._values[name] = array(typecode)
+            if base is not None:
+                self._values[name].frombytes(base.column(name).tobytes())
+            if kind == "category":
+                categories = list(base.categories(name)) if base is not None else []
+                self._categories[name] = categories
+                self._lookup[name] = {value: i for i, value in enumerate(categories)}
+
+        self.rows = len(base) if base is not None else 0
+        self.invalid = 0
+
+    def add(self, row_number: int, raw: dict) -> bool:
+        """
+        Validates raw against LoanRequest and appends it; returns False (and
+        counts it) when it doesn't validate.
+        """
+        try:
+            request = LoanRequest.model_validate(raw)
+        except ValidationError:
+            self.invalid += 1
+            return False
+
+        self._values[ROW_COLUMN].append(row_number)
+        for name, kind in FIELD_KINDS.items():
+            value = getattr(request, name)
+            if kind == "category":
+                lookup = self._lookup[name]
+                code = lookup.get(value)
+                if code is None:
+                    code = lookup[value] = len(lookup)
+                    self._categories[name].append(value)
+                value = code
+            self._values[name].append(value)
+        self.rows += 1
+        return True
+
+    def write(self, path: str | Path) -> None:
+        """
+        Writes the store to path, replacing any store already there. The files
+        are written to a temporary directory first, so a reader never sees a
+        partly written store.
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = Path(tempfile.mkdtemp(prefix=f".{path.name}-", dir=path.parent))
+        try:
+            for name, values in self._values.items():
+                kind = FIELD_KINDS.get(name, "int")
+                dtype = _KIND_SPECS[kind][1]
+                np.save(tmp / f"{name}.npy", np.frombuffer(values, dtype=dtype))
+            meta = {
+                "format": FORMAT_VERSION,
+                "rows": self.rows,
+                "kinds": FIELD_KINDS,
+                "categories": self._categories,
+            }
+            with open(tmp / META_FILE, "w") as f:
+                json.dump(meta, f)
+
+            if path.exists():
+                old = path.with_name(f".{path.name}-old")
+                shutil.rmtree(old, ignore_errors=True)
+                os.replace(path, old)
+                os.replace(tmp, path)
+                shutil.rmtree(old)
+            else:
+                os.replace(tmp, path)
+        except BaseException:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+        logger.info("Application store written | %s | %d rows", path, self.rows)
@@ -0,0 +1,36 @@
+"""
+Input helpers shared by the offline CLIs (rescore.py, impact.py): reading
+application files and loading the live rule snapshot once per run.
+"""
+
+import csv
+import json
+
+
+def read_applications(path: str, fmt: str):
+    """
+    Yields (row_number, raw_application) lazily so the file is never held in memory.
+    """
+    with open(path, "r", newline="") as f:
+        if fmt == "csv":
+            for row_number, row in enumerate(csv.DictReader(f), start=1):
+                yield row_number, row
+        else:
+            for row_number, line in enumerate(f, start=1):
+                if line.strip():
+                    yield row_number, json.loads(line)
+
+
+async def load_live_snapshot():
+    """
+    Reads the rule snapshot from the database, then disposes the engine so
+    the CLI can fork workers or exit without an open pool.
+    """
+    from app.core.database import dispose_engine, new_session
+    from app.services.credit.loaders import load_rule_snapshot
+
+    try:
+        async with new_session() as session:
+            return await load_rule_snapshot(session)
+    finally:
+        await dispose_engine()
@@ -1,3 +1,35 @@
-from .loaders import load_rules, load_bureau_config_from_json, load_stability_config
-from .scoring import calculate_credit_score
-from .risk import get_risk_level
+"""
+Credit scoring, rule loading and the rule snapshot.
+
+The names below are imported from their submodule on first access, so
+importing the package (or one light submodule through it) loads neither
+SQLAlchemy nor NumPy.
+"""
+
+import importlib
+
+_EXPORTS = {
+    "load_rules": "loaders",
+    "load_bureau_config_from_json": "loaders",
+    "load_stability_config": "loaders",
+    "load_rule_snapshot": "loaders",
+    "calculate_credit_score": "scoring",
+    "calculate_credit_scores": "scoring",
+    "compile_credit_scorer": "scoring",
+    "credit_scorer_cache": "scoring",
+    "get_risk_level": "risk",
+    "RiskRuleIndex": "risk",
+    "RuleSnapshot": "snapshot",
+    "rule_snapshot_cache": "snapshot",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,160 @@
+import asyncio
+import logging
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.metrics import StageTimer, decisions_total
+from app.services.credit import calculate_credit_scores
+from app.services.credit.loan_evaluator import (
+    apply_decision,
+    build_zen_input,
+    commit_post_actions,
+    get_decision_engine,
+    get_shadow_evaluator,
+    location_resolver,
+)
+from app.services.credit.scoring import credit_scorer_cache
+from app.services.credit.snapshot import rule_snapshot_cache
+from app.services.decision_audit import audit_row, decision_audit_writer
+
+logger = logging.getLogger(__name__)
+
+
+async def evaluate_loan_batch(requests: list, db: AsyncSession) -> list[dict]:
+    """
+    Evaluates many loan requests against one rule snapshot.
+    Metrics are computed over NumPy arrays for the whole batch; each item is then
+    decided by zen on its own, so one failing item doesn't fail the batch.
+    Output for every item is identical to evaluate_loan.
+    """
+    timer = StageTimer()
+    decision_engine = get_decision_engine()
+    shadow_evaluator = get_shadow_evaluator()
+
+    # 1. Load Data once for the whole batch
+    snapshot = await rule_snapshot_cache.get(db)
+    timer.lap("rules")
+    city_rules = snapshot.city_rules
+    pin_index = snapshot.unserviceable_pins
+    risk_index = snapshot.risk_index
+    scorer = credit_scorer_cache.get()
+    bureau_cfg = scorer.cfg
+
+    # 2. Logic & Metrics, vectorised
+    locations = [
+        location_resolver.resolve(r.state, r.city_tier, r.pin_code) for r in requests
+    ]
+    tiers = [
+        city_tier if city_tier in city_rules else "Rural" for _, city_tier in locations
+    ]
+    state_risks = np.array(
+        [snapshot.state_risk.get(state, "HIGH") for state, _ in locations],
+        dtype=object,
+    )
+    incomes = np.array([r.monthly_income for r in requests], dtype=float)
+    debts = np.array([r.existing_debt for r in requests], dtype=float)
+    multipliers = np.array(
+        [city_rules[tier]["multiplier"] for tier in tiers], dtype=float
+    )
+
+    debt_ratios = np.divide(
+        debts, incomes, out=np.ones(len(requests)), where=incomes > 0
+    )
+    max_eligibles = incomes * multipliers
+    bureau_scores = calculate_credit_scores(
+        debt_ratios,
+        [r.employment_duration_months for r in requests],
+        [r.age for r in requests],
+        bureau_cfg,
+    )
+    stability_max_dti = risk_index.stability_max_dtis(bureau_scores)
+
+    # Back to plain Python values so zen input and responses match the single path
+    debt_ratios = debt_ratios.tolist()
+    max_eligibles = max_eligibles.tolist()
+    bureau_scores = bureau_scores.tolist()
+    stability_max_dti = stability_max_dti.tolist()
+    risk_levels = [
+        risk_index.risk_level(state_risks[i], debt_ratios[i], bureau_scores[i])
+        for i in range(len(requests))
+    ]
+    timer.lap("scoring")
+
+    # 3. Decide each item; evaluations run concurrently on the decision executor
+    zen_inputs = [None] * len(requests)
+
+    async def decide(i, request):
+        zen_input = zen_inputs[i] = build_zen_input(
+            request,
+            city_rules[tiers[i]],
+            state_risks[i],
+            debt_ratios[i],
+            max_eligibles[i],
+            bureau_scores[i],
+            pin_index.is_serviceable(request.pin_code),
+            stability_max_dti[i],
+            location=(
+                locations[i]
+                if locations[i] != (request.state, request.city_tier)
+                else None
+            ),
+        )
+        return await decision_engine.evaluate_async(zen_input, snapshot.version)
+
+    raw_results = await asyncio.gather(
+        *(decide(i, request) for i, request in enumerate(requests)),
+        return_exceptions=True,
+    )
+    timer.lap("decision")
+
+    # 4. Post-actions & Responses, in input order
+    results = []
+    audit_rows = []
+    for i, (request, raw_result) in enumerate(zip(requests, raw_results)):
+        derived = {
+            "tier": tiers[i],
+            "city_rule": city_rules[tiers[i]],
+            "bureau_score": bureau_scores[i],
+            "max_eligible": max_eligibles[i],
+            "risk_assessment": risk_levels[i],
+        }
+        try:
+            if isinstance(raw_result, Exception):
+                raise raw_result
+            response = apply_decision(request, db, raw_result, **derived)
+        except Exception as e:
+            logger.error("Error evaluating batch item %d: %s", i, e)
+            decisions_total.inc(decision="ERROR", tier=tiers[i])
+            results.append(
+                {
+                    "index": i,
+                    "result": None,
+                    "error": "An unexpected error occurred while evaluating the loan.",
+                }
+            )
+            continue
+
+        decisions_total.inc(decision=response["decision"], tier=tiers[i])
+        results.append({"index": i, "result": response, "error": None})
+        audit_rows.append(
+            audit_row(
+                request,
+                zen_inputs[i],
+                derived,
+                response,
+                snapshot.version,
+                scorer.version,
+                decision_engine.version,
+            )
+        )
+        shadow_evaluator.submit(zen_inputs[i], derived, response)
+
+    # Audit room for the whole batch is reserved before its outbox rows are
+    # committed; the rows are buffered once the commit succeeds.
+    async with decision_audit_writer.reserve(audit_rows):
+        timer.lap("audit")
+        # One commit for every approval's outbox row
+        await commit_post_actions(db)
+    timer.lap("post_actions")
+    timer.record_batch()
+    return results
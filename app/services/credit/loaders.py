@@ -6,28 +6,21 @@ import logging
 from app.repositories.state_risk_repo import StateRiskRepository
 from app.repositories.city_rule_repo import CityRuleRepository
 from app.repositories.unserviceable_pin_repo import UnserviceablePinRepository
+from app.models.risk_level import RiskLevelRule
 from app.repositories.risk_level_repo import RiskLevelRuleRepository
+from app.services.credit.snapshot import RuleSnapshot
 
 logger = logging.getLogger(__name__)
 
 
-async def load_rules(session: AsyncSession):
-    """
-    Async load state risk, city rules, and unserviceable pins from DB.
-    Exceptions are not caught here so the caller (API) can handle the failure.
-    """
-    state_risk_repo = StateRiskRepository(session)
-    city_rule_repo = CityRuleRepository(session)
-    unserviceable_pin_repo = UnserviceablePinRepository(session)
+async def load_state_risk(session: AsyncSession) -> dict:
+    state_risk_list = await StateRiskRepository(session).get_all()
+    return {r.state: r.risk_level for r in state_risk_list}
 
-    # If these fail, they will raise an exception to the router
-    state_risk_list = await state_risk_repo.get_all()
-    city_rule_list = await city_rule_repo.get_all()
-    unserviceable_pin_list = await unserviceable_pin_repo.get_all()
-
-    state_risk = {r.state: r.risk_level for r in state_risk_list}
 
-    city_rules = {
+async def load_city_rules(session: AsyncSession) -> dict:
+    city_rule_list = await CityRuleRepository(session).get_all()
+    return {
         r.tier: {
             "min_income": r.min_income,
             "multiplier": r.multiplier,
@@ -36,7 +29,21 @@ async def load_rules(session: AsyncSession):
         for r in city_rule_list
     }
 
-    unserviceable_pins = {r.pin_code for r in unserviceable_pin_list}
+
+async def load_unserviceable_pins(session: AsyncSession) -> set:
+    # Only the codes are needed; skip building an ORM object per pin
+    return set(await UnserviceablePinRepository(session).get_all_codes())
+
+
+async def load_rules(session: AsyncSession):
+    """
+    Async load state risk, city rules, and unserviceable pins from DB.
+    Exceptions are not caught here so the caller (API) can handle the failure.
+    """
+    # If these fail, they will raise an exception to the router
+    state_risk = await load_state_risk(session)
+    city_rules = await load_city_rules(session)
+    unserviceable_pins = await load_unserviceable_pins(session)
 
     return state_risk, city_rules, unserviceable_pins
 
@@ -49,16 +56,57 @@ async def load_stability_config(session: AsyncSession):
     return await risk_repo.get_all()
 
 
-def load_bureau_config_from_json() -> dict:
+async def load_rule_snapshot(session: AsyncSession) -> RuleSnapshot:
     """
-    JSON file loader. Raises FileNotFoundError or JSONDecodeError if config is invalid.
+    Async load every rule table into one immutable RuleSnapshot.
     """
-    config_path = (
-        Path(__file__).resolve().parent.parent.parent
-        / "rules"
-        / "bureau_score_config.json"
-    )
+    state_risk, city_rules, unserviceable_pins = await load_rules(session)
+    risk_rules = await load_stability_config(session)
+    return RuleSnapshot.build(state_risk, city_rules, unserviceable_pins, risk_rules)
 
+
+async def load_risk_rules(session: AsyncSession) -> tuple:
+    return tuple(await load_stability_config(session))
+
+
+# DB table name -> (RuleSnapshot field, loader), for reloading a single table
+RULE_TABLE_LOADERS = {
+    "state_risk": ("state_risk", load_state_risk),
+    "city_rules": ("city_rules", load_city_rules),
+    "unserviceable_pins": ("unserviceable_pins", load_unserviceable_pins),
+    "risk_level_rules": ("risk_rules", load_risk_rules),
+}
+
+
+BUREAU_CONFIG_FILE = (
+    Path(__file__).resolve().parent.parent.parent / "rules" / "bureau_score_config.json"
+)
+
+
+def load_bureau_config_from_json(config_path: Path = BUREAU_CONFIG_FILE) -> dict:
+    """
+    JSON file loader. Raises FileNotFoundError or JSONDecodeError if config is invalid.
+    """
     # We use a context manager; if file is missing, the error bubbles up
     with open(config_path, "r") as f:
         return json.load(f)
+
+
+RISK_RULE_FIELDS = ("risk_level", "state_risk", "min_credit_score", "max_dti_ratio")
+
+
+def load_risk_rules_from_json(rules_path: str | Path) -> list[RiskLevelRule]:
+    """
+    Candidate risk_level_rules from a JSON list of objects with the table's
+    columns, in priority order. The rows are not attached to a session.
+    """
+    with open(rules_path, "r") as f:
+        rows = json.load(f)
+
+    rules = []
+    for i, row in enumerate(rows):
+        missing = [field for field in RISK_RULE_FIELDS if row.get(field) is None]
+        if missing:
+            raise ValueError(f"Risk rule {i} in {rules_path} is missing {missing}")
+        rules.append(RiskLevelRule(**{field: row[field] for field in RISK_RULE_FIELDS}))
+    return rules
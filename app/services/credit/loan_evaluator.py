@@ -1,65 +1,68 @@
 from pathlib import Path
 import logging
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.services.credit import (
-    calculate_credit_score,
-    get_risk_level,
-)
-from app.services.credit.loaders import (
-    load_bureau_config_from_json,
-    load_rules,
-    load_stability_config,
-)
-from app.services.los_post_actions import (
-    notify_applicant,
-    create_loan_record,
-    generate_repayment_schedule,
-)
-from app.services.zen_engine import LoanDecisionEngine
+from app.services.pin_geo import create_location_resolver
+from app.services.credit.scoring import CreditScorer, credit_scorer_cache
+from app.core.database import get_engine, new_session
+from app.core.metrics import StageTimer
+from app.core.startup import StartupProfile
+from app.schemas.loan import LoanRequest
+from app.repositories.post_approval_outbox_repo import PostApprovalOutboxRepository
+from app.services.credit.snapshot import RuleSnapshot, rule_snapshot_cache
+from app.services.decision_audit import audit_row, decision_audit_writer
+from app.services.idempotency import IdempotencyConflict, IdempotentReplay
+from app.services.outbox_dispatcher import outbox_dispatcher, outbox_payload
 
 logger = logging.getLogger(__name__)
-decision_engine = LoanDecisionEngine()
 
 RULES_FILE = (
     Path(__file__).resolve().parent.parent.parent / "rules" / "loan_decision.json"
 )
 
+# Loads its file on first use, or in warm_up() at startup.
+location_resolver = create_location_resolver()
 
-async def evaluate_loan(request, db: AsyncSession):
-    """
-    Evaluates loan request. If critical steps fail, exceptions bubble up to the Router.
-    """
-    # 1. Load Data (If these fail, the Router catches the error)
-    state_risk_map, city_rules, bad_pins = await load_rules(db)
-    bureau_cfg = load_bureau_config_from_json()
-    risk_rules = await load_stability_config(db)
+# The decision engine and the shadow evaluator are created on first use (or
+# by the app's lifespan), so importing this module loads neither zen nor the
+# rules file.
+_decision_engine = None
+_shadow_evaluator = None
 
-    # 2. Logic & Metrics
-    tier = request.city_tier if request.city_tier in city_rules else "Rural"
-    city_rule = city_rules[tier]
-    state_risk = state_risk_map.get(request.state, "HIGH")
+# A typical application, evaluated once by warm_up() so the scorer, the risk
+# index and the decision graph have all run before the first request.
+WARMUP_APPLICATION = {
+    "age": 35,
+    "monthly_income": 60000.0,
+    "employment_duration_months": 48,
+    "existing_debt": 5000.0,
+    "loan_requested": 300000.0,
+    "state": "Maharashtra",
+    "city_tier": "Metro",
+    "pin_code": "400001",
+    "disaster_affected_area": False,
+    "address_duration_months": 36,
+    "work_location_matches_residence": True,
+}
 
-    debt_ratio = (
-        request.existing_debt / request.monthly_income
-        if request.monthly_income > 0
-        else 1.0
-    )
-    max_eligible = request.monthly_income * city_rule["multiplier"]
-    bureau_score = calculate_credit_score(request, debt_ratio, bureau_cfg)
-
-    stability_rule = next(
-        (
-            r
-            for r in risk_rules
-            if r.min_credit_score <= bureau_score and r.max_dti_ratio is not None
-        ),
-        None,
-    )
 
-    # 3. Prepare & Evaluate Decision
+def build_zen_input(
+    request,
+    city_rule: dict,
+    state_risk: str,
+    debt_ratio: float,
+    max_eligible: float,
+    bureau_score: int,
+    pin_serviceable: bool,
+    stability_max_dti_ratio: float,
+    *,
+    location: tuple[str, str] | None = None,
+) -> dict:
+    # LoanRequest is flat and already validated, so its field dict is the
+    # zen input as-is; spreading it skips model_dump's serializer pass.
     zen_input = {
-        **request.model_dump(),
+        **request.__dict__,
         "city_rule_min_income": city_rule["min_income"],
         "city_rule_multiplier": city_rule["multiplier"],
         "city_rule_rate": city_rule["rate"],
@@ -67,48 +70,292 @@ async def evaluate_loan(request, db: AsyncSession):
         "max_eligible": max_eligible,
         "bureau_score": bureau_score,
         "state_risk": state_risk,
-        "pin_serviceable": request.pin_code not in bad_pins,
-        "stability_max_dti_ratio": (
-            stability_rule.max_dti_ratio if stability_rule else 0.5
-        ),
+        "pin_serviceable": pin_serviceable,
+        "stability_max_dti_ratio": stability_max_dti_ratio,
     }
+    # (state, city_tier) resolved from the PIN code, when they differ from the request's
+    if location is not None:
+        zen_input["state"], zen_input["city_tier"] = location
+    return zen_input
 
-    # If GoRules fails, we want it to raise an error so we don't give a false 'REJECTED' status
-    raw_result = decision_engine.evaluate(
-        rules_path=str(RULES_FILE),
-        input_data=zen_input,
-    )
-    result = raw_result.get("result", {})
 
-    decision_label = result.get("decision_label", "REJECTED")
-    approved_amount = result.get("approved_amount", 0)
-    manual_review = result.get("manual_review", False)
-    reason = result.get("reason", "No reason provided")
-
-    # 4. Post-actions
-    if decision_label == "APPROVED":
-        try:
-            # Note: create_loan_record should ideally be part of the main transaction,
-            # but we keep this simple for now.
-            notify_applicant(request, approved_amount, city_rule["rate"])
-            loan_id = create_loan_record(
-                db, request, approved_amount, city_rule["rate"]
-            )
-            generate_repayment_schedule(loan_id, approved_amount)
-        except Exception as e:
-            logger.error("Non-critical error in post-approval actions: %s", e)
+def build_response(
+    raw_result: dict,
+    tier: str,
+    city_rule: dict,
+    bureau_score: int,
+    max_eligible: float,
+    risk_assessment: str,
+) -> dict:
+    """
+    Shapes the API response from a zen result and the derived metrics.
+    Values already have the LoanResponse types, so /loan/evaluate can encode
+    the dict without validating it again.
+    """
+    result = raw_result.get("result", {})
 
     return {
-        "decision": decision_label,
-        "message": reason,
-        "manual_review_required": manual_review,
+        "decision": result.get("decision_label", "REJECTED"),
+        "message": result.get("reason", "No reason provided"),
+        "manual_review_required": result.get("manual_review", False),
         "guarantor_required": tier == "Rural",
         "credit_score": bureau_score,
-        "approved_amount": approved_amount,
-        "risk_assessment": get_risk_level(
-            state_risk, debt_ratio, bureau_score, risk_rules
-        ),
+        "approved_amount": float(result.get("approved_amount", 0)),
+        "risk_assessment": risk_assessment,
         "tier_applied": tier,
         "max_eligible_amount": max_eligible,
         "interest_rate": str(city_rule["rate"]),
     }
+
+
+def get_decision_engine():
+    """
+    The LoanDecisionEngine for RULES_FILE. Its decision is built on first
+    evaluation, or by warm_up().
+    """
+    global _decision_engine
+    if _decision_engine is None:
+        from app.services.zen_engine import LoanDecisionEngine
+
+        _decision_engine = LoanDecisionEngine(RULES_FILE)
+    return _decision_engine
+
+
+def get_shadow_evaluator():
+    """
+    The ShadowEvaluator configured by the SHADOW_* settings.
+    """
+    global _shadow_evaluator
+    if _shadow_evaluator is None:
+        from app.services.shadow_evaluator import create_shadow_evaluator
+
+        _shadow_evaluator = create_shadow_evaluator(RULES_FILE, build_response)
+    return _shadow_evaluator
+
+
+def run_post_actions(
+    request,
+    db: AsyncSession,
+    response: dict,
+    city_rule: dict,
+    idempotency: tuple[str, str] | None = None,
+):
+    """
+    Queues the post-approval actions in the outbox as part of the caller's
+    transaction; the OutboxDispatcher runs them after commit_post_actions.
+    An (Idempotency-Key, payload hash) pair is stored on the row with the
+    response.
+    """
+    if response["decision"] != "APPROVED":
+        return
+
+    key, digest = idempotency or (None, None)
+    PostApprovalOutboxRepository(db).add(
+        outbox_payload(request, response["approved_amount"], city_rule["rate"]),
+        idempotency_key=key,
+        payload_hash=digest,
+        response=response if key is not None else None,
+    )
+
+
+async def commit_post_actions(
+    db: AsyncSession, idempotency: tuple[str, str] | None = None
+) -> None:
+    """
+    Commits queued outbox rows (if any) before the response goes out, so an
+    approval is never returned without its post-approval work being recorded.
+
+    If the Idempotency-Key is already on an outbox row (a retry committed by
+    another process first), rolls back and raises IdempotentReplay with the
+    stored response, or IdempotencyConflict if it came with another payload.
+    """
+    if not db.new:
+        return
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        if idempotency is None:
+            raise
+        key, digest = idempotency
+        stored = await PostApprovalOutboxRepository(db).get_by_idempotency_key(key)
+        if stored is None:
+            raise
+        if stored.payload_hash != digest:
+            raise IdempotencyConflict(
+                "Idempotency-Key was already used with a different payload"
+            )
+        raise IdempotentReplay(stored.response)
+    outbox_dispatcher.wake()
+
+
+def apply_decision(
+    request,
+    db: AsyncSession,
+    raw_result: dict,
+    tier: str,
+    city_rule: dict,
+    bureau_score: int,
+    max_eligible: float,
+    risk_assessment: str,
+    idempotency: tuple[str, str] | None = None,
+) -> dict:
+    """
+    Runs post-approval actions for a zen result and shapes the API response.
+    """
+    response = build_response(
+        raw_result, tier, city_rule, bureau_score, max_eligible, risk_assessment
+    )
+    run_post_actions(request, db, response, city_rule, idempotency)
+    return response
+
+
+def prepare_evaluation(request, snapshot: RuleSnapshot, scorer: CreditScorer):
+    """
+    Derives the metrics for one request and builds its zen input.
+    Returns (zen_input, derived); derived holds the keyword arguments for
+    build_response / apply_decision.
+    """
+    city_rules = snapshot.city_rules
+    risk_index = snapshot.risk_index
+
+    location = location_resolver.resolve(
+        request.state, request.city_tier, request.pin_code
+    )
+    state, city_tier = location
+    tier = city_tier if city_tier in city_rules else "Rural"
+    city_rule = city_rules[tier]
+    state_risk = snapshot.state_risk.get(state, "HIGH")
+
+    debt_ratio = (
+        request.existing_debt / request.monthly_income
+        if request.monthly_income > 0
+        else 1.0
+    )
+    max_eligible = request.monthly_income * city_rule["multiplier"]
+    bureau_score = scorer.score(
+        debt_ratio, request.employment_duration_months, request.age
+    )
+    stability_rule = risk_index.stability_rule(bureau_score)
+
+    zen_input = build_zen_input(
+        request,
+        city_rule,
+        state_risk,
+        debt_ratio,
+        max_eligible,
+        bureau_score,
+        snapshot.unserviceable_pins.is_serviceable(request.pin_code),
+        stability_rule.max_dti_ratio if stability_rule else 0.5,
+        location=location if location != (request.state, request.city_tier) else None,
+    )
+    derived = {
+        "tier": tier,
+        "city_rule": city_rule,
+        "bureau_score": bureau_score,
+        "max_eligible": max_eligible,
+        "risk_assessment": risk_index.risk_level(state_risk, debt_ratio, bureau_score),
+    }
+    return zen_input, derived
+
+
+async def evaluate_loan(
+    request,
+    db: AsyncSession,
+    trace_label: str | None = None,
+    idempotency: tuple[str, str] | None = None,
+):
+    """
+    Evaluates loan request. If critical steps fail, exceptions bubble up to the Router.
+    A trace_label forces a decision trace, stored under that label.
+    idempotency is the request's (Idempotency-Key, payload hash), committed
+    with an approval's outbox row; see commit_post_actions.
+    """
+    timer = StageTimer()
+    tier = "unknown"
+    decision_engine = get_decision_engine()
+    try:
+        # 1. Load Data (If these fail, the Router catches the error)
+        # Rule tables come from the in-process snapshot; the DB is only read on refresh.
+        snapshot = await rule_snapshot_cache.get(db)
+        timer.lap("rules")
+
+        # The scorer is compiled once per bureau config version, not read per request.
+        scorer = credit_scorer_cache.get()
+
+        # 2. Logic & Metrics, 3. Prepare & Evaluate Decision
+        zen_input, derived = prepare_evaluation(request, snapshot, scorer)
+        tier = derived["tier"]
+        timer.lap("scoring")
+
+        # If GoRules fails, we want it to raise an error so we don't give a false 'REJECTED' status
+        raw_result = await decision_engine.evaluate_async(
+            zen_input,
+            snapshot.version,
+            force_trace=trace_label is not None,
+            trace_label=trace_label,
+        )
+        timer.lap("decision")
+
+        # 4. Post-actions & Response
+        response = apply_decision(
+            request, db, raw_result, **derived, idempotency=idempotency
+        )
+        # Room is reserved before the outbox commit, so an approval that
+        # can't be audited (AuditBackpressure) is never committed; the row is
+        # only buffered once the commit succeeds.
+        audit_rows = [
+            audit_row(
+                request,
+                zen_input,
+                derived,
+                response,
+                snapshot.version,
+                scorer.version,
+                decision_engine.version,
+            )
+        ]
+        async with decision_audit_writer.reserve(audit_rows):
+            timer.lap("audit")
+            await commit_post_actions(db, idempotency)
+        timer.lap("post_actions")
+    except IdempotentReplay:
+        # Not a new decision: nothing is audited, shadowed or timed.
+        raise
+    except Exception:
+        timer.record("ERROR", tier)
+        raise
+
+    # The challenger (if any) runs later, in the background.
+    get_shadow_evaluator().submit(zen_input, derived, response)
+    timer.record(response["decision"], tier)
+    return response
+
+
+async def warm_up(profile: StartupProfile) -> None:
+    """
+    Loads everything evaluate_loan would otherwise load on its first call,
+    timing each step as a startup phase. Failures propagate to the caller.
+    """
+    with profile.phase("database"):
+        # Opens the pool's first connection.
+        async with get_engine().connect():
+            pass
+    with profile.phase("rule_snapshot"):
+        async with new_session() as db:
+            snapshot = await rule_snapshot_cache.get(db)
+    with profile.phase("credit_scorer"):
+        scorer = credit_scorer_cache.get()
+    with profile.phase("pin_geo"):
+        location_resolver.load()
+    decision_engine = get_decision_engine()
+    shadow_evaluator = get_shadow_evaluator()
+    with profile.phase("decision_engine"):
+        decision_engine.load()
+    if shadow_evaluator.engine is not None:
+        with profile.phase("shadow_engine"):
+            shadow_evaluator.engine.load()
+    with profile.phase("decision_probe"):
+        request = LoanRequest(**WARMUP_APPLICATION)
+        zen_input, _ = prepare_evaluation(request, snapshot, scorer)
+        decision_engine.warm_up(zen_input)
@@ -0,0 +1,108 @@
+from bisect import bisect_right
+import logging
+
+logger = logging.getLogger(__name__)
+
+PIN_SPACE = 1_000_000
+
+
+def _parse_block(code: str) -> tuple[int, int] | None:
+    """
+    Parses a district-level entry into an inclusive (start, end) pin range.
+    "1100" blocks 110000-110099 and "110000-110499" blocks that range.
+    Returns None for anything that isn't a block.
+    """
+    if "-" in code:
+        start, _, end = code.partition("-")
+        start, end = start.strip(), end.strip()
+        if _is_pin(start) and _is_pin(end) and int(start) <= int(end):
+            return int(start), int(end)
+        return None
+
+    if 0 < len(code) < 6 and code.isascii() and code.isdigit():
+        scale = 10 ** (6 - len(code))
+        return int(code) * scale, (int(code) + 1) * scale - 1
+
+    return None
+
+
+def _is_pin(code: str) -> bool:
+    return len(code) == 6 and code.isascii() and code.isdigit()
+
+
+class PinIndex:
+    """
+    Unserviceable PIN lookup built from the unserviceable_pins table.
+    Exact six-digit pins live in a 1,000,000-bit bitmap (125 KB); district
+    blocks (prefix or range rows) live in a small sorted range table.
+    Built whole from the table's rows; a table change builds a new index.
+    """
+
+    def __init__(self):
+        self._bitmap = bytearray(PIN_SPACE // 8)
+        self._exact_count = 0
+        self._blocks: set[tuple[int, int]] = set()
+        self._starts: list[int] = []
+        self._ends: list[int] = []
+        # Rows that are neither pins nor blocks still match verbatim, as the old set did.
+        self._other: set[str] = set()
+
+    @classmethod
+    def from_codes(cls, codes) -> "PinIndex":
+        index = cls()
+        for code in codes:
+            index._add(code)
+        index._rebuild_ranges()
+        return index
+
+    def _add(self, code: str | None) -> None:
+        if code is None:
+            return
+        code = code.strip()
+        if _is_pin(code):
+            n = int(code)
+            byte, bit = n >> 3, 1 << (n & 7)
+            if not self._bitmap[byte] & bit:
+                self._bitmap[byte] |= bit
+                self._exact_count += 1
+            return
+
+        block = _parse_block(code)
+        if block is not None:
+            self._blocks.add(block)
+        else:
+            logger.warning("Unrecognised unserviceable pin entry: %r", code)
+            self._other.add(code)
+
+    def _rebuild_ranges(self) -> None:
+        # Merge overlapping blocks so a lookup is one bisect.
+        starts, ends = [], []
+        for start, end in sorted(self._blocks):
+            if ends and start <= ends[-1] + 1:
+                ends[-1] = max(ends[-1], end)
+            else:
+                starts.append(start)
+                ends.append(end)
+        self._starts, self._ends = starts, ends
+
+    def is_serviceable(self, pin: str) -> bool:
+        if not _is_pin(pin):
+            return pin not in self._other
+
+        n = int(pin)
+        if self._bitmap[n >> 3] & (1 << (n & 7)):
+            return False
+
+        i = bisect_right(self._starts, n) - 1
+        return not (i >= 0 and n <= self._ends[i])
+
+    def __contains__(self, pin: str) -> bool:
+        return not self.is_serviceable(pin)
+
+    def stats(self) -> dict:
+        return {
+            "exact_pins": self._exact_count,
+            "blocks": len(self._blocks),
+            "merged_ranges": len(self._starts),
+            "other_entries": len(self._other),
+        }
@@ -1,5 +1,7 @@
+from bisect import bisect_left, bisect_right
 from app.models.risk_level import RiskLevelRule
 import logging
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
@@ -23,3 +25,121 @@ def get_risk_level(
             return rule.risk_level
 
     return "MEDIUM"
+
+
+class _Staircase:
+    """
+    The rules of one Fenwick node that could ever be the first match: ordered
+    by table position, each one allows a higher DTI than every rule before it.
+    The first rule allowing debt_ratio is then one bisect away.
+    """
+
+    __slots__ = ("max_dtis", "positions")
+
+    def __init__(self, entries):
+        self.max_dtis = []
+        self.positions = []
+        for position, max_dti in sorted(entries):
+            if not self.max_dtis or max_dti > self.max_dtis[-1]:
+                self.max_dtis.append(max_dti)
+                self.positions.append(position)
+
+    def first_allowing(self, debt_ratio: float) -> int | None:
+        i = bisect_left(self.max_dtis, debt_ratio)
+        return self.positions[i] if i < len(self.positions) else None
+
+
+class _StateRiskIndex:
+    """
+    Rules of one state_risk sorted by min_credit_score. A score matches a
+    prefix of that order (one bisect); a Fenwick tree of staircases over it
+    finds the earliest-positioned rule in the prefix that allows the DTI.
+    """
+
+    def __init__(self, entries):
+        # entries: (position, min_credit_score, max_dti_ratio)
+        entries = sorted(entries, key=lambda e: (e[1], e[0]))
+        self.min_scores = [e[1] for e in entries]
+        self.tree = [None]
+        for node in range(1, len(entries) + 1):
+            low = node - (node & -node)
+            self.tree.append(_Staircase((e[0], e[2]) for e in entries[low:node]))
+
+    def first_match(self, debt_ratio: float, bureau_score) -> int | None:
+        node = bisect_right(self.min_scores, bureau_score)
+        best = None
+        while node:
+            position = self.tree[node].first_allowing(debt_ratio)
+            if position is not None and (best is None or position < best):
+                best = position
+            node -= node & -node
+        return best
+
+
+class RiskRuleIndex:
+    """
+    Prebuilt lookups over the risk_level_rules table, giving the same answers
+    as the linear scans (the first matching rule in table order wins) in
+    O(log^2 n) for risk levels and O(log n) for stability selection.
+    Built once per rule snapshot and never mutated.
+    """
+
+    def __init__(self, risk_rules):
+        self.rules = tuple(risk_rules)
+
+        by_state_risk = {}
+        for position, rule in enumerate(self.rules):
+            by_state_risk.setdefault(rule.state_risk, []).append(
+                (position, rule.min_credit_score, rule.max_dti_ratio)
+            )
+        self._by_state_risk = {
+            state_risk: _StateRiskIndex(entries)
+            for state_risk, entries in by_state_risk.items()
+        }
+
+        # Stability selection ignores state_risk: the earliest rule whose
+        # min_credit_score <= score is the prefix minimum of table positions.
+        stability = sorted(
+            (rule.min_credit_score, position)
+            for position, rule in enumerate(self.rules)
+            if rule.max_dti_ratio is not None
+        )
+        self._stability_scores = [score for score, _ in stability]
+        self._stability_first = []
+        for _, position in stability:
+            first = self._stability_first[-1] if self._stability_first else position
+            self._stability_first.append(min(first, position))
+
+    def risk_level(self, state_risk: str, debt_ratio: float, bureau_score) -> str:
+        """
+        Indexed get_risk_level. If no rule matches, defaults to MEDIUM.
+        """
+        index = self._by_state_risk.get(state_risk)
+        # NaN never satisfies <= in the scan, so it never matches here either.
+        if index is None or debt_ratio != debt_ratio:
+            return "MEDIUM"
+        position = index.first_match(debt_ratio, bureau_score)
+        return self.rules[position].risk_level if position is not None else "MEDIUM"
+
+    def stability_rule(self, bureau_score):
+        """
+        First rule with min_credit_score <= bureau_score and a max_dti_ratio, or None.
+        """
+        i = bisect_right(self._stability_scores, bureau_score)
+        return self.rules[self._stability_first[i - 1]] if i else None
+
+    def stability_max_dtis(self, bureau_scores, default: float = 0.5):
+        """
+        Vectorised stability_rule(...).max_dti_ratio over an array of scores.
+        """
+        scores = np.asarray(self._stability_scores)
+        max_dtis = np.array(
+            [self.rules[p].max_dti_ratio for p in self._stability_first] + [default],
+            dtype=float,
+        )
+        i = np.searchsorted(scores, bureau_scores, side="right") - 1
+        # i == -1 (no rule) picks the trailing default
+        return max_dtis[i]
+
+    def __len__(self) -> int:
+        return len(self.rules)
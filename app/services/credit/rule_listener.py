@@ -0,0 +1,166 @@
+from sqlalchemy.engine import make_url
+import asyncio
+import logging
+
+from app.services.credit.snapshot import RuleSnapshotCache
+
+logger = logging.getLogger(__name__)
+
+# Channel the rule-table triggers publish to; the payload is the table name.
+RULES_CHANGED_CHANNEL = "rules_changed"
+
+
+class RuleChangeListener:
+    """
+    Turns "table X changed" notifications into targeted snapshot reloads.
+    Notifications arriving close together are coalesced into one reload of
+    just the tables that changed.
+
+    This base class is what create_rule_listener returns for databases
+    without LISTEN/NOTIFY (SQLite): nothing notifies it, so the snapshot is
+    refreshed by its TTL alone. Calling notify(table) on it directly still
+    triggers the targeted reload (tests/test_rule_listener.py does this).
+    """
+
+    def __init__(
+        self,
+        cache: RuleSnapshotCache,
+        session_factory,
+        debounce_seconds: float = 0.2,
+    ):
+        self.cache = cache
+        self.session_factory = session_factory
+        self.debounce_seconds = debounce_seconds
+        self._pending: set[str] = set()
+        self._reload_task: asyncio.Task | None = None
+
+        self.notifications = 0
+        self.reloads = 0
+        self.reload_failures = 0
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        if self._reload_task is not None:
+            self._reload_task.cancel()
+            self._reload_task = None
+
+    def notify(self, table: str) -> None:
+        self.notifications += 1
+        self._pending.add(table)
+        if self._reload_task is None or self._reload_task.done():
+            self._reload_task = asyncio.get_running_loop().create_task(
+                self._reload_pending()
+            )
+
+    async def _reload_pending(self) -> None:
+        # Loop so notifications that arrive mid-reload are picked up too.
+        while self._pending:
+            await asyncio.sleep(self.debounce_seconds)
+            tables, self._pending = self._pending, set()
+            try:
+                async with self.session_factory() as session:
+                    await self.cache.reload_tables(session, tables)
+                self.reloads += 1
+            except Exception as e:
+                # Fall back to a full reload on the next request.
+                self.reload_failures += 1
+                logger.error("Reloading %s after notification failed: %s", tables, e)
+                self.cache.invalidate()
+
+    def stats(self) -> dict:
+        return {
+            "listener": type(self).__name__,
+            "notifications": self.notifications,
+            "reloads": self.reloads,
+            "reload_failures": self.reload_failures,
+        }
+
+
+class PostgresRuleListener(RuleChangeListener):
+    """
+    LISTENs on rules_changed over a dedicated asyncpg connection (outside the
+    SQLAlchemy pool). If the connection drops it reconnects with backoff and
+    invalidates the cache, since notifications sent meanwhile were lost.
+    """
+
+    def __init__(self, cache, session_factory, database_url: str, **kwargs):
+        super().__init__(cache, session_factory, **kwargs)
+        # asyncpg wants a plain postgresql:// DSN, not SQLAlchemy's +asyncpg form
+        self.dsn = (
+            make_url(database_url)
+            .set(drivername="postgresql")
+            .render_as_string(hide_password=False)
+        )
+        self._connection = None
+        self._reconnect_task: asyncio.Task | None = None
+        self._stopping = False
+        self.reconnects = 0
+
+    async def start(self) -> None:
+        self._stopping = False
+        try:
+            await self._connect()
+        except Exception as e:
+            # Don't block startup; the TTL keeps rules fresh until we're connected.
+            logger.error("Rule change listener could not connect: %s", e)
+            self._reconnect_task = asyncio.get_running_loop().create_task(
+                self._reconnect()
+            )
+
+    async def _connect(self) -> None:
+        import asyncpg
+
+        self._connection = await asyncpg.connect(self.dsn)
+        self._connection.add_termination_listener(self._on_terminated)
+        await self._connection.add_listener(RULES_CHANGED_CHANNEL, self._on_notify)
+        logger.info("Listening for rule changes on %r", RULES_CHANGED_CHANNEL)
+
+    def _on_notify(self, connection, pid, channel, payload) -> None:
+        self.notify(payload)
+
+    def _on_terminated(self, connection) -> None:
+        if self._stopping:
+            return
+        logger.warning("Rule change listener connection lost, reconnecting")
+        self._reconnect_task = asyncio.get_running_loop().create_task(self._reconnect())
+
+    async def _reconnect(self) -> None:
+        delay = 1.0
+        while not self._stopping:
+            try:
+                await self._connect()
+            except Exception as e:
+                logger.error("Rule change listener reconnect failed: %s", e)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 60.0)
+                continue
+
+            self.reconnects += 1
+            self.cache.invalidate()
+            return
+
+    async def stop(self) -> None:
+        self._stopping = True
+        if self._reconnect_task is not None:
+            self._reconnect_task.cancel()
+        if self._connection is not None:
+            await self._connection.close()
+            self._connection = None
+        await super().stop()
+
+    def stats(self) -> dict:
+        return {**super().stats(), "reconnects": self.reconnects}
+
+
+def create_rule_listener(
+    cache: RuleSnapshotCache, session_factory, database_url: str | None
+) -> RuleChangeListener:
+    """
+    Postgres gets a real LISTEN connection; any other backend gets the
+    in-process stand-in.
+    """
+    if database_url and make_url(database_url).get_backend_name() == "postgresql":
+        return PostgresRuleListener(cache, session_factory, database_url)
+    return RuleChangeListener(cache, session_factory)
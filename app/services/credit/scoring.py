@@ -1,22 +1,19 @@
-import json
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Callable
+import hashlib
+import json
 import logging
+import math
+import os
+import threading
+import time
+import numpy as np
 
-logger = logging.getLogger(__name__)
+from app.core import settings
+from app.services.credit.loaders import BUREAU_CONFIG_FILE
 
-
-def load_bureau_config_from_json() -> dict:
-    """
-    JSON file loader. If the file is missing or invalid,
-    the error bubbles up to stop the evaluation process.
-    """
-    config_path = (
-        Path(__file__).resolve().parent.parent.parent
-        / "rules"
-        / "bureau_score_config.json"
-    )
-    with open(config_path, "r") as f:
-        return json.load(f)
+logger = logging.getLogger(__name__)
 
 
 def calculate_credit_score(data, debt_ratio, cfg: dict) -> int:
@@ -47,3 +44,318 @@ def calculate_credit_score(data, debt_ratio, cfg: dict) -> int:
 
     # Ensure score within min/max
     return max(cfg["score_min"], min(cfg["score_max"], score))
+
+
+_SCORE_VALUE_KEYS = (
+    "base_score",
+    "debt_low_bonus",
+    "debt_medium_bonus",
+    "debt_high_penalty",
+    "emp_long_bonus",
+    "emp_medium_bonus",
+    "emp_short_penalty",
+    "age_bonus",
+    "score_min",
+    "score_max",
+)
+
+
+def calculate_credit_scores(debt_ratios, employment_months, ages, cfg: dict):
+    """
+    Vectorised calculate_credit_score over NumPy arrays.
+    Element i is exactly the score calculate_credit_score gives applicant i.
+    """
+    debt_ratios = np.asarray(debt_ratios, dtype=float)
+    employment_months = np.asarray(employment_months)
+    ages = np.asarray(ages)
+
+    # Same numeric type the scalar version ends up with (int unless the config has floats)
+    dtype = np.asarray([cfg[k] for k in _SCORE_VALUE_KEYS]).dtype
+    score = np.full(debt_ratios.shape, cfg["base_score"], dtype=dtype)
+
+    # Debt ratio impact
+    score = np.select(
+        [
+            debt_ratios <= cfg["debt_low_threshold"],
+            debt_ratios <= cfg["debt_medium_threshold"],
+            debt_ratios > cfg["debt_high_threshold"],
+        ],
+        [
+            score + cfg["debt_low_bonus"],
+            score + cfg["debt_medium_bonus"],
+            np.full_like(score, cfg["debt_high_penalty"]),
+        ],
+        default=score,
+    )
+
+    # Employment stability
+    score = np.select(
+        [
+            employment_months >= cfg["emp_long_months"],
+            employment_months >= cfg["emp_medium_months"],
+            employment_months < cfg["emp_short_months"],
+        ],
+        [
+            score + cfg["emp_long_bonus"],
+            score + cfg["emp_medium_bonus"],
+            np.full_like(score, cfg["emp_short_penalty"]),
+        ],
+        default=score,
+    )
+
+    # Age factor
+    score = np.where(
+        (ages >= cfg["age_min"]) & (ages <= cfg["age_max"]),
+        score + cfg["age_bonus"],
+        score,
+    )
+
+    # Ensure score within min/max
+    return np.maximum(cfg["score_min"], np.minimum(cfg["score_max"], score))
+
+
+BUREAU_CONFIG_KEYS = (
+    "base_score",
+    "debt_low_threshold",
+    "debt_low_bonus",
+    "debt_medium_threshold",
+    "debt_medium_bonus",
+    "debt_high_threshold",
+    "debt_high_penalty",
+    "emp_long_months",
+    "emp_long_bonus",
+    "emp_medium_months",
+    "emp_medium_bonus",
+    "emp_short_months",
+    "emp_short_penalty",
+    "age_min",
+    "age_max",
+    "age_bonus",
+    "score_min",
+    "score_max",
+)
+
+
+def validate_bureau_config(cfg: dict) -> None:
+    """
+    Raises ValueError if a key is missing or isn't a finite number.
+    """
+    missing = [k for k in BUREAU_CONFIG_KEYS if k not in cfg]
+    if missing:
+        raise ValueError(f"Bureau config is missing keys: {', '.join(missing)}")
+
+    for key in BUREAU_CONFIG_KEYS:
+        value = cfg[key]
+        if (
+            isinstance(value, bool)
+            or not isinstance(value, (int, float))
+            or not math.isfinite(value)
+        ):
+            raise ValueError(f"Bureau config {key!r} must be a number, got {value!r}")
+
+
+def compile_credit_scorer(cfg: dict) -> Callable[[float, int, int], int]:
+    """
+    Validates the config once and returns score(debt_ratio, employment_months, age)
+    with every threshold and bonus bound as a local, so a call does no dict lookups.
+    Gives exactly the same result as calculate_credit_score.
+    """
+    validate_bureau_config(cfg)
+
+    base_score = cfg["base_score"]
+    debt_low_threshold = cfg["debt_low_threshold"]
+    debt_low_bonus = cfg["debt_low_bonus"]
+    debt_medium_threshold = cfg["debt_medium_threshold"]
+    debt_medium_bonus = cfg["debt_medium_bonus"]
+    debt_high_threshold = cfg["debt_high_threshold"]
+    debt_high_penalty = cfg["debt_high_penalty"]
+    emp_long_months = cfg["emp_long_months"]
+    emp_long_bonus = cfg["emp_long_bonus"]
+    emp_medium_months = cfg["emp_medium_months"]
+    emp_medium_bonus = cfg["emp_medium_bonus"]
+    emp_short_months = cfg["emp_short_months"]
+    emp_short_penalty = cfg["emp_short_penalty"]
+    age_min = cfg["age_min"]
+    age_max = cfg["age_max"]
+    age_bonus = cfg["age_bonus"]
+    score_min = cfg["score_min"]
+    score_max = cfg["score_max"]
+
+    def score(debt_ratio: float, employment_months: int, age: int) -> int:
+        s = base_score
+
+        if debt_ratio <= debt_low_threshold:
+            s += debt_low_bonus
+        elif debt_ratio <= debt_medium_threshold:
+            s += debt_medium_bonus
+        elif debt_ratio > debt_high_threshold:
+            s = debt_high_penalty
+
+        if employment_months >= emp_long_months:
+            s += emp_long_bonus
+        elif employment_months >= emp_medium_months:
+            s += emp_medium_bonus
+        elif employment_months < emp_short_months:
+            s = emp_short_penalty
+
+        if age_min <= age <= age_max:
+            s += age_bonus
+
+        return max(score_min, min(score_max, s))
+
+    return score
+
+
+def _boundary_points(thresholds, integral: bool) -> list:
+    """
+    One point inside every band the thresholds cut the number line into,
+    plus the thresholds themselves.
+    """
+    points = {0, -1, 10**9, -(10**9)}
+    for t in thresholds:
+        if integral:
+            points.update(
+                {math.floor(t) - 1, math.floor(t), math.ceil(t), math.ceil(t) + 1}
+            )
+        else:
+            points.update(
+                {math.nextafter(t, -math.inf), t, math.nextafter(t, math.inf)}
+            )
+    return sorted(points)
+
+
+def verify_credit_scorer(scorer, cfg: dict) -> int:
+    """
+    Cheap guard run on every compile: scorer must match calculate_credit_score
+    on a point in every band (and on every edge) of each input. Both are
+    piecewise constant between the config thresholds, so this catches a
+    miscompiled band; benchmarks.scoring_parity is the full check.
+    Raises ValueError on the first mismatch; returns the number of points checked.
+    """
+
+    class _Applicant:
+        __slots__ = ("employment_duration_months", "age")
+
+    debt_points = _boundary_points(
+        [
+            cfg["debt_low_threshold"],
+            cfg["debt_medium_threshold"],
+            cfg["debt_high_threshold"],
+        ],
+        integral=False,
+    )
+    emp_points = _boundary_points(
+        [cfg["emp_long_months"], cfg["emp_medium_months"], cfg["emp_short_months"]],
+        integral=True,
+    )
+    age_points = _boundary_points([cfg["age_min"], cfg["age_max"]], integral=True)
+
+    applicant = _Applicant()
+    checked = 0
+    for employment_months in emp_points:
+        applicant.employment_duration_months = employment_months
+        for age in age_points:
+            applicant.age = age
+            for debt_ratio in debt_points:
+                expected = calculate_credit_score(applicant, debt_ratio, cfg)
+                actual = scorer(debt_ratio, employment_months, age)
+                if actual != expected or type(actual) is not type(expected):
+                    raise ValueError(
+                        f"Compiled scorer mismatch at debt_ratio={debt_ratio}, "
+                        f"employment_months={employment_months}, age={age}: "
+                        f"{actual!r} != {expected!r}"
+                    )
+                checked += 1
+    return checked
+
+
+@dataclass(frozen=True)
+class CreditScorer:
+    cfg: dict
+    version: str
+    score: Callable[[float, int, int], int]
+
+
+class CreditScorerCache:
+    """
+    Compiled scorer for the bureau config file, keyed by the file's content hash.
+    The file is stat'ed at most once per check interval and recompiled only when
+    its content changes; a broken edit keeps the last good scorer in service.
+    """
+
+    def __init__(self, config_path: Path, check_interval: float):
+        self.config_path = Path(config_path)
+        self.check_interval = check_interval
+        self._scorer: CreditScorer | None = None
+        self._file_signature = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+
+        self.reloads = 0
+        self.reload_failures = 0
+
+    def get(self) -> CreditScorer:
+        scorer = self._scorer
+        if scorer is not None and time.monotonic() < self._next_check:
+            return scorer
+
+        with self._lock:
+            if self._scorer is not None and time.monotonic() < self._next_check:
+                return self._scorer
+            try:
+                self._reload_if_changed()
+            except Exception as e:
+                if self._scorer is None:
+                    # Nothing to fall back to; retry on the next call.
+                    self._file_signature = None
+                    raise
+                self.reload_failures += 1
+                logger.error(
+                    "Failed to reload %s, keeping version %s: %s",
+                    self.config_path.name,
+                    self._scorer.version,
+                    e,
+                )
+            self._next_check = time.monotonic() + self.check_interval
+            return self._scorer
+
+    def _reload_if_changed(self) -> None:
+        stat = os.stat(self.config_path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if signature == self._file_signature:
+            return
+
+        # Recorded up front so a broken file is reported once, not on every check.
+        self._file_signature = signature
+        content = self.config_path.read_bytes()
+        version = hashlib.sha256(content).hexdigest()[:12]
+        if self._scorer is not None and version == self._scorer.version:
+            return
+
+        cfg = json.loads(content)
+        score = compile_credit_scorer(cfg)
+        verify_credit_scorer(score, cfg)
+
+        old_version = self._scorer.version if self._scorer else None
+        self._scorer = CreditScorer(cfg=cfg, version=version, score=score)
+        if old_version is not None:
+            self.reloads += 1
+        logger.info(
+            "Bureau score config compiled | %s | version: %s -> %s",
+            self.config_path.name,
+            old_version,
+            version,
+        )
+
+    def stats(self) -> dict:
+        return {
+            "config_file": self.config_path.name,
+            "version": self._scorer.version if self._scorer else None,
+            "reloads": self.reloads,
+            "reload_failures": self.reload_failures,
+        }
+
+
+credit_scorer_cache = CreditScorerCache(
+    BUREAU_CONFIG_FILE, settings.BUREAU_CONFIG_CHECK_INTERVAL_SECONDS
+)
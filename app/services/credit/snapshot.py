@@ -0,0 +1,245 @@
+from dataclasses import dataclass, field, replace
+from sqlalchemy.ext.asyncio import AsyncSession
+import asyncio
+import hashlib
+import json
+import logging
+import time
+
+from app.core import settings
+from app.services.credit.pin_index import PinIndex
+from app.services.credit.risk import RiskRuleIndex
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RuleSnapshot:
+    """
+    Immutable, in-process copy of the DB-backed rule tables.
+    A request holds on to one snapshot for its whole evaluation, so a refresh
+    that happens mid-request never mixes old and new rules. Nothing in it is
+    mutated after build; changes produce a new snapshot.
+    """
+
+    state_risk: dict
+    city_rules: dict
+    unserviceable_pins: PinIndex
+    risk_rules: tuple
+    risk_index: RiskRuleIndex
+    version: str
+    loaded_at: float
+    # Content hash per table, so one table can be replaced without rehashing the rest
+    table_versions: dict = field(default_factory=dict)
+
+    @classmethod
+    def build(cls, state_risk, city_rules, unserviceable_pins, risk_rules):
+        risk_rules = tuple(risk_rules)
+        table_versions = {
+            "state_risk": _digest(state_risk),
+            "city_rules": _digest(city_rules),
+            "unserviceable_pins": _pins_digest(unserviceable_pins),
+            "risk_rules": _risk_rules_digest(risk_rules),
+        }
+        return cls(
+            state_risk=state_risk,
+            city_rules=city_rules,
+            unserviceable_pins=PinIndex.from_codes(unserviceable_pins),
+            risk_rules=risk_rules,
+            risk_index=RiskRuleIndex(risk_rules),
+            version=_digest(table_versions),
+            loaded_at=time.time(),
+            table_versions=table_versions,
+        )
+
+    def replace_tables(self, **tables) -> "RuleSnapshot":
+        """
+        Returns a new snapshot with only the given tables replaced, taking the
+        same raw values as build() (pin codes for unserviceable_pins).
+        """
+        values = {}
+        table_versions = dict(self.table_versions)
+
+        if "state_risk" in tables:
+            values["state_risk"] = tables["state_risk"]
+            table_versions["state_risk"] = _digest(tables["state_risk"])
+        if "city_rules" in tables:
+            values["city_rules"] = tables["city_rules"]
+            table_versions["city_rules"] = _digest(tables["city_rules"])
+        if "unserviceable_pins" in tables:
+            codes = tables["unserviceable_pins"]
+            values["unserviceable_pins"] = PinIndex.from_codes(codes)
+            table_versions["unserviceable_pins"] = _pins_digest(codes)
+        if "risk_rules" in tables:
+            values["risk_rules"] = tuple(tables["risk_rules"])
+            values["risk_index"] = RiskRuleIndex(values["risk_rules"])
+            table_versions["risk_rules"] = _risk_rules_digest(values["risk_rules"])
+
+        return replace(
+            self,
+            **values,
+            version=_digest(table_versions),
+            loaded_at=time.time(),
+            table_versions=table_versions,
+        )
+
+
+def _digest(value) -> str:
+    """
+    Content hash; identical data gives identical versions in every worker process.
+    """
+    payload = json.dumps(value, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:12]
+
+
+def _pins_digest(codes) -> str:
+    return _digest(sorted(c for c in codes if c is not None))
+
+
+def _risk_rules_digest(risk_rules) -> str:
+    return _digest(
+        [
+            [r.risk_level, r.state_risk, r.min_credit_score, r.max_dti_ratio]
+            for r in risk_rules
+        ]
+    )
+
+
+class RuleSnapshotCache:
+    """
+    Holds the current RuleSnapshot and reloads it from the DB once the TTL
+    has expired (or after invalidate()). The new snapshot replaces the old one
+    with a single reference assignment, so readers never see a partial update.
+    """
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._snapshot: RuleSnapshot | None = None
+        self._expires_at = 0.0
+        self._lock = asyncio.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.refresh_failures = 0
+        self.last_refresh_seconds = 0.0
+        self.total_refresh_seconds = 0.0
+
+    def _fresh(self) -> RuleSnapshot | None:
+        if self._snapshot is not None and time.monotonic() < self._expires_at:
+            return self._snapshot
+        return None
+
+    async def get(self, session: AsyncSession) -> RuleSnapshot:
+        snapshot = self._fresh()
+        if snapshot is not None:
+            self.hits += 1
+            return snapshot
+
+        # Only one coroutine reloads; the rest wait and reuse its result.
+        async with self._lock:
+            snapshot = self._fresh()
+            if snapshot is not None:
+                self.hits += 1
+                return snapshot
+
+            self.misses += 1
+            return await self._refresh_locked(session)
+
+    async def refresh(self, session: AsyncSession) -> RuleSnapshot:
+        async with self._lock:
+            return await self._refresh_locked(session)
+
+    async def _refresh_locked(self, session: AsyncSession) -> RuleSnapshot:
+        # Imported here to avoid a cycle: loaders builds RuleSnapshot objects.
+        from app.services.credit.loaders import load_rule_snapshot
+
+        started = time.perf_counter()
+        try:
+            snapshot = await load_rule_snapshot(session)
+        except Exception as e:
+            self.refresh_failures += 1
+            if self._snapshot is None:
+                raise
+            # Keep serving the last good rules rather than failing every request.
+            logger.error("Rule snapshot refresh failed, serving stale rules: %s", e)
+            self._expires_at = time.monotonic() + min(self.ttl_seconds, 5.0)
+            return self._snapshot
+
+        elapsed = time.perf_counter() - started
+        self.refreshes += 1
+        self.last_refresh_seconds = elapsed
+        self.total_refresh_seconds += elapsed
+
+        previous = self._snapshot
+        self._snapshot = snapshot
+        self._expires_at = time.monotonic() + self.ttl_seconds
+
+        if previous is None or previous.version != snapshot.version:
+            logger.info(
+                "Rule snapshot loaded | version: %s -> %s | %.1f ms",
+                previous.version if previous else None,
+                snapshot.version,
+                elapsed * 1000,
+            )
+        return snapshot
+
+    async def reload_tables(self, session: AsyncSession, tables) -> RuleSnapshot:
+        """
+        Re-reads only the given DB tables and swaps in a snapshot that keeps
+        every other table as it was. Unknown tables trigger a full reload.
+        """
+        from app.services.credit.loaders import RULE_TABLE_LOADERS
+
+        async with self._lock:
+            current = self._snapshot
+            if current is None or any(t not in RULE_TABLE_LOADERS for t in tables):
+                return await self._refresh_locked(session)
+
+            started = time.perf_counter()
+            changes = {}
+            for table in tables:
+                snapshot_field, loader = RULE_TABLE_LOADERS[table]
+                changes[snapshot_field] = await loader(session)
+            snapshot = current.replace_tables(**changes)
+
+            elapsed = time.perf_counter() - started
+            self.refreshes += 1
+            self.last_refresh_seconds = elapsed
+            self.total_refresh_seconds += elapsed
+            self._snapshot = snapshot
+
+            logger.info(
+                "Rule snapshot reloaded %s | version: %s -> %s | %.1f ms",
+                ", ".join(sorted(tables)),
+                current.version,
+                snapshot.version,
+                elapsed * 1000,
+            )
+            return snapshot
+
+    def invalidate(self) -> None:
+        """
+        Forces the next get() to reload from the DB.
+        """
+        self._expires_at = 0.0
+
+    @property
+    def current(self) -> RuleSnapshot | None:
+        return self._snapshot
+
+    def stats(self) -> dict:
+        snapshot = self._snapshot
+        return {
+            "version": snapshot.version if snapshot else None,
+            "age_seconds": time.time() - snapshot.loaded_at if snapshot else None,
+            "hits": self.hits,
+            "misses": self.misses,
+            "refreshes": self.refreshes,
+            "refresh_failures": self.refresh_failures,
+            "last_refresh_seconds": self.last_refresh_seconds,
+            "total_refresh_seconds": self.total_refresh_seconds,
+        }
+
+
+rule_snapshot_cache = RuleSnapshotCache(ttl_seconds=settings.RULE_SNAPSHOT_TTL_SECONDS)
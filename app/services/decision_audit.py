@@ -0,0 +1,365 @@
+"""
+Decision audit log: every decision's inputs, derived metrics and outcome,
+written to the decision_audit table without a DB round trip per request.
+
+Requests append their rows to an in-process buffer and return; a background
+flusher writes the buffer in batches (one multi-row INSERT per batch, COPY
+on Postgres) once batch_size rows are waiting or every flush_interval.
+"""
+
+from contextlib import asynccontextmanager
+import asyncio
+import logging
+import math
+import time
+
+import orjson
+
+from app.core import settings
+from app.core.database import get_engine
+from app.models.decision_audit import DecisionAudit
+from app.models.post_approval_outbox import utcnow
+
+logger = logging.getLogger(__name__)
+
+MAX_RETRY_DELAY_SECONDS = 30.0
+
+_TABLE = DecisionAudit.__table__
+_COLUMNS = [c.name for c in _TABLE.columns if not c.primary_key]
+_JSON_COLUMNS = {"application"}
+
+
+def _short_error(e: Exception) -> str:
+    # DB errors carry the statement and every parameter; the first line is enough.
+    return str(e).splitlines()[0] if str(e) else repr(e)
+
+
+class AuditBackpressure(Exception):
+    """
+    The audit buffer stayed full for longer than the enqueue timeout, so the
+    decision can't be recorded; the request fails (503) rather than go out
+    unaudited.
+    """
+
+    def __init__(self, retry_after: int):
+        super().__init__("Decision audit log is falling behind")
+        self.retry_after = retry_after
+
+
+def audit_row(
+    request,
+    zen_input: dict,
+    derived: dict,
+    response: dict,
+    rule_version: str,
+    bureau_version: str,
+    decision_version: str,
+) -> dict:
+    return {
+        "decided_at": utcnow(),
+        "application": dict(request.__dict__),
+        "state": zen_input["state"],
+        "tier": derived["tier"],
+        "state_risk": zen_input["state_risk"],
+        "debt_ratio": zen_input["debt_ratio"],
+        "bureau_score": zen_input["bureau_score"],
+        "max_eligible": zen_input["max_eligible"],
+        "stability_max_dti_ratio": zen_input["stability_max_dti_ratio"],
+        "pin_serviceable": zen_input["pin_serviceable"],
+        "risk_assessment": response["risk_assessment"],
+        "decision": response["decision"],
+        "message": response["message"],
+        "approved_amount": response["approved_amount"],
+        "manual_review_required": response["manual_review_required"],
+        "interest_rate": response["interest_rate"],
+        "rule_version": rule_version,
+        "bureau_version": bureau_version,
+        "decision_version": decision_version,
+    }
+
+
+class DecisionAuditWriter:
+    """
+    Buffers audit rows and writes them in batches, in the order recorded.
+
+    The buffer holds at most max_buffer rows, counting rows reserved by
+    requests that are still committing. When the DB can't keep up (or is
+    down: a failed batch stays buffered and is retried with backoff),
+    reserve() waits up to enqueue_timeout for room and then raises
+    AuditBackpressure, so a slow audit log slows down and then sheds
+    requests instead of growing without bound. stop() drains the buffer.
+
+    Without a running flusher (scripts, benchmarks), record() writes full
+    batches itself; a write that fails there is logged and its rows stay
+    buffered. Rows still buffered are lost if the process dies.
+    """
+
+    MODES = ("batched", "off")
+
+    def __init__(
+        self,
+        engine_factory,
+        mode: str,
+        batch_size: int,
+        flush_interval: float,
+        max_buffer: int,
+        enqueue_timeout: float,
+    ):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown decision audit mode: {mode!r}")
+
+        self.engine_factory = engine_factory
+        self.mode = mode
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.max_buffer = max(self.batch_size, max_buffer)
+        self.enqueue_timeout = enqueue_timeout
+
+        self._buffer: list[dict] = []
+        # Rows of requests between reserve() and their commit
+        self._reserved = 0
+        self._flush_requested = asyncio.Event()
+        self._space = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+        self._stopping = False
+
+        self.recorded = 0
+        self.written = 0
+        self.batches = 0
+        self.max_buffered = 0
+        self.flush_failures = 0
+        self.backpressure_waits = 0
+        self.backpressure_seconds = 0.0
+        self.rejected = 0
+        self.last_flush_seconds = 0.0
+        self.total_flush_seconds = 0.0
+
+    @property
+    def buffered(self) -> int:
+        return len(self._buffer)
+
+    async def record(self, rows: list[dict]) -> None:
+        """
+        Buffers the rows of one request (or one batch request) together.
+        """
+        async with self.reserve(rows):
+            pass
+
+    @asynccontextmanager
+    async def reserve(self, rows: list[dict]):
+        """
+        Holds buffer room for the rows across the block (the caller's commit)
+        and buffers them only if the block succeeds, so a decision whose
+        transaction fails is never audited. Waiting for room happens before
+        the block: an approval that can't be audited (AuditBackpressure) is
+        never committed.
+        """
+        if self.mode == "off" or not rows:
+            yield
+            return
+        if self._full():
+            await self._wait_for_space()
+
+        self._reserved += len(rows)
+        try:
+            yield
+        except BaseException:
+            self._space.set()
+            raise
+        finally:
+            self._reserved -= len(rows)
+
+        self._buffer.extend(rows)
+        self.recorded += len(rows)
+        self.max_buffered = max(self.max_buffered, len(self._buffer))
+        if len(self._buffer) >= self.batch_size:
+            if self._task is None:
+                await self._flush_inline()
+            else:
+                self._flush_requested.set()
+
+    async def _flush_inline(self) -> None:
+        """
+        Flushes from the request path when no background task is running (CLI
+        tools, benchmarks). The caller's transaction has already committed, so
+        a failure is logged and the rows stay buffered for the next flush.
+        """
+        try:
+            await self.flush()
+        except Exception as e:
+            self.flush_failures += 1
+            logger.error(
+                "Writing the decision audit log failed, %d rows buffered: %s",
+                len(self._buffer),
+                _short_error(e),
+            )
+
+    def _full(self) -> bool:
+        return len(self._buffer) + self._reserved >= self.max_buffer
+
+    async def _wait_for_space(self) -> None:
+        self.backpressure_waits += 1
+        self._flush_requested.set()
+        started = time.monotonic()
+        deadline = started + self.enqueue_timeout
+        try:
+            while self._full():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.rejected += 1
+                    raise AuditBackpressure(
+                        max(1, math.ceil(self.last_flush_seconds + self.flush_interval))
+                    )
+                if self._task is None and self._buffer:
+                    await asyncio.wait_for(self.flush(), remaining)
+                    continue
+                # Room comes from a flush or from a released reservation.
+                self._space.clear()
+                try:
+                    await asyncio.wait_for(self._space.wait(), remaining)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            self.backpressure_seconds += time.monotonic() - started
+
+    async def flush(self) -> int:
+        """
+        Writes every buffered row, batch by batch; returns how many were
+        written. A failed batch stays at the head of the buffer.
+        """
+        written = 0
+        async with self._flush_lock:
+            while self._buffer:
+                # Rows recorded while a batch is written are appended behind it.
+                batch = self._buffer[: self.batch_size]
+                await self._write(batch)
+                del self._buffer[: len(batch)]
+                written += len(batch)
+                self._space.set()
+        return written
+
+    async def _write(self, batch: list[dict]) -> None:
+        started = time.perf_counter()
+        async with self.engine_factory().begin() as conn:
+            if conn.dialect.name == "postgresql":
+                raw = await conn.get_raw_connection()
+                # COPY in asyncpg's binary format; JSON goes over as text.
+                await raw.driver_connection.copy_records_to_table(
+                    _TABLE.name,
+                    records=[
+                        tuple(
+                            (
+                                orjson.dumps(row[name]).decode()
+                                if name in _JSON_COLUMNS
+                                else row[name]
+                            )
+                            for name in _COLUMNS
+                        )
+                        for row in batch
+                    ],
+                    columns=_COLUMNS,
+                )
+            else:
+                await conn.execute(_TABLE.insert(), batch)
+
+        elapsed = time.perf_counter() - started
+        self.batches += 1
+        self.written += len(batch)
+        self.last_flush_seconds = elapsed
+        self.total_flush_seconds += elapsed
+
+    async def start(self) -> None:
+        if self.mode == "off" or self._task is not None:
+            return
+        self._stopping = False
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        logger.info(
+            "Decision audit writer started | batch %d | every %.1fs",
+            self.batch_size,
+            self.flush_interval,
+        )
+
+    async def stop(self, drain_timeout: float = 10.0) -> None:
+        """
+        Stops the flusher and writes whatever is still buffered.
+        """
+        if self._task is not None:
+            # Not in the middle of a write: cancelling one could leave its
+            # connection holding the transaction that drain needs.
+            async with self._flush_lock:
+                # The flag as well: wait_for() can swallow a cancel that
+                # lands as its timeout fires.
+                self._stopping = True
+                self._flush_requested.set()
+                self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if not self._buffer:
+            return
+        try:
+            await asyncio.wait_for(self.flush(), drain_timeout)
+        except Exception as e:
+            logger.error(
+                "%d decision audit rows were not written at shutdown: %s",
+                len(self._buffer),
+                _short_error(e),
+            )
+
+    async def _run(self) -> None:
+        retry_delay = 0.0
+        while True:
+            try:
+                await asyncio.wait_for(
+                    self._flush_requested.wait(), self.flush_interval
+                )
+            except asyncio.TimeoutError:
+                pass
+            if self._stopping:
+                return
+            self._flush_requested.clear()
+
+            try:
+                await self.flush()
+                retry_delay = 0.0
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.flush_failures += 1
+                retry_delay = min(max(retry_delay, 0.5) * 2, MAX_RETRY_DELAY_SECONDS)
+                logger.error(
+                    "Writing the decision audit log failed, %d rows buffered, "
+                    "retrying in %.0fs: %s",
+                    len(self._buffer),
+                    retry_delay,
+                    _short_error(e),
+                )
+                # Size triggers would retry at once; back off instead.
+                await asyncio.sleep(retry_delay)
+
+    def stats(self) -> dict:
+        return {
+            "mode": self.mode,
+            "buffered": len(self._buffer),
+            "reserved": self._reserved,
+            "max_buffered": self.max_buffered,
+            "recorded": self.recorded,
+            "written": self.written,
+            "batches": self.batches,
+            "flush_failures": self.flush_failures,
+            "backpressure_waits": self.backpressure_waits,
+            "backpressure_seconds": self.backpressure_seconds,
+            "rejected": self.rejected,
+            "last_flush_seconds": self.last_flush_seconds,
+            "total_flush_seconds": self.total_flush_seconds,
+        }
+
+
+decision_audit_writer = DecisionAuditWriter(
+    get_engine,
+    mode=settings.DECISION_AUDIT_MODE,
+    batch_size=settings.DECISION_AUDIT_BATCH_SIZE,
+    flush_interval=settings.DECISION_AUDIT_FLUSH_INTERVAL_SECONDS,
+    max_buffer=settings.DECISION_AUDIT_MAX_BUFFER,
+    enqueue_timeout=settings.DECISION_AUDIT_ENQUEUE_TIMEOUT_SECONDS,
+)
@@ -0,0 +1,112 @@
+from collections import OrderedDict
+import json
+import logging
+import re
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+_IDENTIFIER = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+_STRING_LITERAL = re.compile(r"\"[^\"]*\"|'[^']*'")
+_PASSIVE_NODES = {"inputNode", "outputNode"}
+
+
+def decision_input_fields(content: str | bytes) -> frozenset | None:
+    """
+    Names of the input fields a decision graph can read: table input fields
+    plus every identifier used in rule cells and output expressions.
+    Returns None when the graph has nodes this can't see into (functions,
+    expression nodes, nested input paths); callers then key on the whole input.
+    """
+    graph = json.loads(content)
+    fields = set()
+    for node in graph.get("nodes", []):
+        node_type = node.get("type")
+        if node_type in _PASSIVE_NODES:
+            continue
+        if node_type != "decisionTableNode":
+            return None
+
+        table = node.get("content") or {}
+        if table.get("inputField"):
+            return None
+        for column in table.get("inputs", []):
+            if column.get("field"):
+                fields.add(column["field"].split(".")[0])
+        for rule in table.get("rules", []):
+            for column_id, cell in rule.items():
+                # _id / _description are metadata, not expressions
+                if isinstance(cell, str) and not column_id.startswith("_"):
+                    fields.update(_IDENTIFIER.findall(_STRING_LITERAL.sub("", cell)))
+    return frozenset(fields)
+
+
+class DecisionCache:
+    """
+    Bounded LRU + TTL cache of decision outputs, safe to share between threads.
+
+    Keys are built by the caller from the rules version, the rule snapshot
+    version and the values of the fields the graph reads, so a rules change
+    simply stops old entries from being hit; they age out through LRU/TTL.
+    Values hold only the fields a decision adds or changes, never the
+    (pass-through) input, which keeps every entry small.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at <= now:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value) -> None:
+        expires_at = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
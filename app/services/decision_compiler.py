@@ -0,0 +1,284 @@
+"""
+Compiles zen decision graphs made only of first-hit decision tables with
+simple comparisons into plain Python closures, so evaluating them never
+crosses into zen or marshals the input.
+
+Semantics follow zen's full-precision (async) evaluation:
+  - a cell is empty (always matches), "<op> operand" with op one of
+    == != < <= > >=, or a bare operand meaning "== operand";
+  - operands are number, string, true/false/null literals or input field
+    paths (a.b); unknown fields are null;
+  - ordering only holds between numbers (booleans are not numbers); any
+    other ordering comparison is false, equality across types is false;
+  - empty output cells leave the field untouched, and fields that end up
+    null are dropped from the result;
+  - integral number literals are returned as ints.
+Anything else (ranges, lists, functions, expression/function/switch nodes,
+nested input/output paths, other hit policies) raises UnsupportedDecision
+and the caller keeps using zen.
+"""
+
+import json
+import operator
+import re
+
+
+class UnsupportedDecision(ValueError):
+    """
+    The graph uses something the compiler doesn't handle; evaluate it with zen.
+    """
+
+
+_NUMBER = re.compile(r"-?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?")
+_STRING = re.compile(r"\"([^\"\\]*)\"|'([^'\\]*)'")
+_PATH = re.compile(r"[A-Za-z_][A-Za-z0-9_]*(?:\.[A-Za-z_][A-Za-z0-9_]*)*")
+_FIELD = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+_CELL = re.compile(r"(==|!=|<=|>=|<|>)?\s*(.*)", re.DOTALL)
+_LITERALS = {"true": True, "false": False, "null": None}
+# Words that make a cell an expression rather than a single operand.
+_RESERVED = {"and", "or", "not", "in", "matches"}
+_ORDERINGS = {
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _equals(a, b) -> bool:
+    if a is None or b is None:
+        return a is b
+    if isinstance(a, bool) or isinstance(b, bool):
+        return isinstance(a, bool) and isinstance(b, bool) and a is b
+    if _is_number(a) and _is_number(b):
+        return a == b
+    return type(a) is type(b) and a == b
+
+
+def _getter(path: str):
+    names = path.split(".")
+    if len(names) == 1:
+        name = names[0]
+        return lambda data: data.get(name)
+
+    def get(data):
+        for name in names:
+            if not isinstance(data, dict):
+                return None
+            data = data.get(name)
+        return data
+
+    return get
+
+
+def _parse_operand(text: str):
+    """
+    Returns (True, value) for a literal operand, (False, path) for a field.
+    """
+    text = text.strip()
+    if text in _LITERALS:
+        return True, _LITERALS[text]
+    if _NUMBER.fullmatch(text):
+        number = float(text)
+        if number.is_integer() and abs(number) < 2**53:
+            return True, int(number)
+        return True, number
+    if match := _STRING.fullmatch(text):
+        return True, match.group(1) if match.group(1) is not None else match.group(2)
+    if _PATH.fullmatch(text) and not set(text.split(".")) & _RESERVED:
+        return False, text
+    raise UnsupportedDecision(f"Unsupported expression: {text!r}")
+
+
+def parse_cell(cell: str) -> tuple[str, bool, object] | None:
+    """
+    Splits an input cell into (op, is_literal, operand): the operand is the
+    literal value, or the field path when is_literal is False. Returns None
+    for an empty cell; raises UnsupportedDecision for anything else the
+    compiler rejects.
+    """
+    cell = cell.strip()
+    if not cell:
+        return None
+    op, rest = _CELL.fullmatch(cell).groups()
+    return (op or "==", *_parse_operand(rest))
+
+
+def _operand(text: str):
+    """
+    Compiles one operand to a function of the node input.
+    """
+    is_literal, value = _parse_operand(text)
+    return (lambda data: value) if is_literal else _getter(value)
+
+
+def _literal_test(op: str, literal):
+    """
+    test(value, data) against a constant; most cells are these, so they are
+    specialised by the literal's type.
+    """
+    if op == "!=":
+        equals = _literal_test("==", literal)
+        return lambda value, data: not equals(value, data)
+    if op == "==":
+        if literal is None or isinstance(literal, bool):
+            return lambda value, data: value is literal
+        if isinstance(literal, str):
+            return lambda value, data: isinstance(value, str) and value == literal
+        return lambda value, data: _is_number(value) and value == literal
+
+    if not _is_number(literal):
+        return lambda value, data: False
+    compare = _ORDERINGS[op]
+    return lambda value, data: _is_number(value) and compare(value, literal)
+
+
+def compile_cell(cell: str):
+    """
+    Compiles an input cell to test(value, data), or None for an empty cell.
+    """
+    parsed = parse_cell(cell)
+    if parsed is None:
+        return None
+    op, is_literal, operand = parsed
+    if is_literal:
+        return _literal_test(op, operand)
+    operand = _getter(operand)
+
+    if op == "==":
+        return lambda value, data: _equals(value, operand(data))
+    if op == "!=":
+        return lambda value, data: not _equals(value, operand(data))
+
+    compare = _ORDERINGS[op]
+
+    def test(value, data):
+        other = operand(data)
+        return _is_number(value) and _is_number(other) and compare(value, other)
+
+    return test
+
+
+def _compile_table(node: dict):
+    content = node.get("content") or {}
+    name = node.get("name")
+    if content.get("hitPolicy", "first") != "first":
+        raise UnsupportedDecision(f"{name}: hit policy {content.get('hitPolicy')!r}")
+    if content.get("executionMode", "single") != "single":
+        raise UnsupportedDecision(
+            f"{name}: execution mode {content['executionMode']!r}"
+        )
+    if content.get("inputField") or content.get("outputPath"):
+        raise UnsupportedDecision(f"{name}: inputField/outputPath")
+
+    inputs = []
+    for column in content.get("inputs", []):
+        field = (column.get("field") or "").strip()
+        if field and not _PATH.fullmatch(field):
+            raise UnsupportedDecision(f"{name}: input field {field!r}")
+        inputs.append((column["id"], _getter(field) if field else None))
+
+    outputs = []
+    for column in content.get("outputs", []):
+        field = (column.get("field") or "").strip()
+        if not _FIELD.fullmatch(field):
+            raise UnsupportedDecision(f"{name}: output field {field!r}")
+        outputs.append((column["id"], field))
+
+    rules = []
+    for rule in content.get("rules", []):
+        conditions = []
+        for column_id, get in inputs:
+            test = compile_cell(rule.get(column_id) or "")
+            if test is None:
+                continue
+            if get is None:
+                raise UnsupportedDecision(f"{name}: expression column without a field")
+            conditions.append((get, test))
+
+        values = tuple(
+            (field, _operand(rule[column_id]))
+            for column_id, field in outputs
+            if (rule.get(column_id) or "").strip()
+        )
+        rules.append((tuple(conditions), values))
+
+    rules = tuple(rules)
+    pass_through = bool(content.get("passThrough"))
+
+    def evaluate(data: dict) -> dict:
+        for conditions, values in rules:
+            for get, test in conditions:
+                if not test(get(data), data):
+                    break
+            else:
+                result = {field: value(data) for field, value in values}
+                return {**data, **result} if pass_through else result
+        return dict(data) if pass_through else {}
+
+    return evaluate
+
+
+class CompiledDecision:
+    """
+    A decision graph compiled to closures; evaluate() mirrors zen's
+    decision.evaluate, returning {"result": ...}.
+    """
+
+    def __init__(self, content: str | bytes):
+        graph = json.loads(content)
+        nodes = {node["id"]: node for node in graph.get("nodes", [])}
+        parents: dict = {}
+        for edge in graph.get("edges", []):
+            if edge.get("sourceHandle") or edge.get("targetHandle"):
+                raise UnsupportedDecision("Edges with handles")
+            parents.setdefault(edge["targetId"], []).append(edge["sourceId"])
+
+        outputs = [n for n in nodes.values() if n.get("type") == "outputNode"]
+        if len(outputs) != 1:
+            raise UnsupportedDecision("Graph must have exactly one output node")
+
+        # Walk back from the output node; every node on the way must have a
+        # single parent, which gives the evaluation order.
+        steps, node = [], outputs[0]
+        while node.get("type") != "inputNode":
+            node_parents = parents.get(node["id"], [])
+            if len(node_parents) != 1 or node_parents[0] not in nodes:
+                raise UnsupportedDecision(
+                    f"{node.get('name')}: needs exactly one input"
+                )
+            node = nodes[node_parents[0]]
+            if node.get("type") == "decisionTableNode":
+                steps.append(_compile_table(node))
+            elif node.get("type") != "inputNode":
+                raise UnsupportedDecision(f"Node type {node.get('type')!r}")
+            if len(steps) > len(nodes):
+                raise UnsupportedDecision("Graph has a cycle")
+
+        self._steps = tuple(reversed(steps))
+
+    def evaluate(self, input_data: dict) -> dict:
+        data = input_data
+        for step in self._steps:
+            data = step(data)
+        if data is input_data:
+            data = dict(data)
+        if None in data.values():
+            data = {k: v for k, v in data.items() if v is not None}
+        return {"result": data}
+
+    def validate(self) -> None:
+        """
+        Compilation already checked the graph; kept for zen API parity.
+        """
+
+
+def compile_decision(content: str | bytes) -> CompiledDecision:
+    """
+    Compiles a decision graph, raising UnsupportedDecision if it can't be.
+    """
+    return CompiledDecision(content)
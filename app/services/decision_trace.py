@@ -0,0 +1,122 @@
+from collections import deque
+from datetime import datetime, timezone
+import random
+import threading
+import uuid
+
+
+def _node_summary(node: dict) -> dict:
+    """
+    One graph node from zen's trace: when it ran, how long it took and, for
+    decision tables, which rule matched on which input values.
+    """
+    summary = {
+        "name": node.get("name"),
+        "order": node.get("order"),
+        "performance": node.get("performance"),
+    }
+    trace_data = node.get("traceData")
+    if isinstance(trace_data, dict) and "rule" in trace_data:
+        rule = trace_data.get("rule") or {}
+        summary["matched_rule"] = {
+            "index": trace_data.get("index"),
+            "id": rule.get("_id"),
+            "description": rule.get("_description"),
+        }
+        summary["inputs"] = trace_data.get("reference_map")
+    return summary
+
+
+class DecisionTracer:
+    """
+    Decides which evaluations are traced and keeps the most recent traces.
+
+    A traced evaluation runs zen with its trace option, which roughly triples
+    its cost, so only a sample_rate fraction of calls are traced, plus any
+    call that forces it (the X-Decision-Trace header). Untraced calls pay one
+    random() comparison, or nothing when the rate is 0. Traces live in a
+    ring buffer of max_traces entries.
+    """
+
+    def __init__(self, sample_rate: float, max_traces: int):
+        self.sample_rate = sample_rate
+        self.max_traces = max_traces
+        self._traces: deque = deque(maxlen=max(1, max_traces))
+        self._lock = threading.Lock()
+
+        self.sampled = 0
+        self.forced = 0
+
+    def should_trace(self, force: bool = False) -> bool:
+        if force:
+            self.forced += 1
+            return self.max_traces > 0
+        if self.sample_rate > 0 and random.random() < self.sample_rate:
+            self.sampled += 1
+            return self.max_traces > 0
+        return False
+
+    def record(
+        self,
+        raw_result: dict,
+        input_data: dict,
+        version: str | None,
+        cache_scope: str | None,
+        elapsed_seconds: float,
+        label: str | None = None,
+    ) -> str:
+        """
+        Stores the trace of a zen result evaluated with {"trace": True} and
+        returns its id.
+        """
+        trace_id = uuid.uuid4().hex[:16]
+        nodes = sorted(
+            (_node_summary(node) for node in (raw_result.get("trace") or {}).values()),
+            key=lambda node: node["order"] if node["order"] is not None else -1,
+        )
+        trace = {
+            "trace_id": trace_id,
+            "at": datetime.now(timezone.utc).isoformat(),
+            "label": label,
+            "rules_version": version,
+            "snapshot_version": cache_scope,
+            "performance": raw_result.get("performance"),
+            "elapsed_ms": elapsed_seconds * 1000,
+            "nodes": nodes,
+            "input": input_data,
+            "result": raw_result.get("result"),
+        }
+        with self._lock:
+            self._traces.append(trace)
+        return trace_id
+
+    def recent(self, limit: int = 20, label: str | None = None) -> list[dict]:
+        """
+        Most recent traces first, optionally only those with the given label.
+        """
+        with self._lock:
+            traces = list(self._traces)
+        traces.reverse()
+        if label is not None:
+            traces = [trace for trace in traces if trace["label"] == label]
+        return traces[:limit]
+
+    def get(self, trace_id: str) -> dict | None:
+        with self._lock:
+            for trace in self._traces:
+                if trace["trace_id"] == trace_id:
+                    return trace
+        return None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._traces.clear()
+
+    def stats(self) -> dict:
+        return {
+            "sample_rate": self.sample_rate,
+            "max_traces": self.max_traces,
+            "buffered": len(self._traces),
+            "sampled": self.sampled,
+            "forced": self.forced,
+        }
@@ -0,0 +1,202 @@
+from collections import OrderedDict
+import asyncio
+import hashlib
+import logging
+import time
+
+import orjson
+
+from app.core import settings
+
+logger = logging.getLogger(__name__)
+
+# Longest Idempotency-Key header accepted.
+MAX_KEY_LENGTH = 255
+
+
+class IdempotencyConflict(ValueError):
+    """
+    An Idempotency-Key was reused with a different request payload.
+    """
+
+
+class IdempotentReplay(Exception):
+    """
+    Raised by an evaluation whose Idempotency-Key was already committed with
+    an approval, by this or another process; carries the stored response.
+    """
+
+    def __init__(self, response: dict):
+        super().__init__("Idempotency-Key was already committed")
+        self.response = response
+
+
+def payload_hash(request) -> str:
+    """
+    Hash of the validated request fields, so retries that differ only in key
+    order, whitespace or number formatting ("50000" vs 50000.0) match.
+    """
+    canonical = orjson.dumps(request.__dict__, option=orjson.OPT_SORT_KEYS)
+    return hashlib.blake2b(canonical, digest_size=16).hexdigest()
+
+
+class IdempotencyStore:
+    """
+    Deduplicates /loan/evaluate retries.
+
+    A request is identified by its Idempotency-Key header or, in "payload"
+    mode, by the hash of its payload when it has no key. The first request
+    for an identity runs the evaluation; duplicates arriving while it runs
+    await the same result, and duplicates arriving later get the stored
+    response until it expires (TTL) or is evicted (LRU). Failed evaluations
+    are passed to the waiting duplicates but not stored, so a retry after an
+    error runs again.
+
+    The store itself is per process. Requests with a key also hand
+    (key, payload hash) to the evaluation, which commits them with the
+    approval's outbox row; a retry that reached another process first then
+    fails that commit and raises IdempotentReplay, answered as a replay.
+    """
+
+    MODES = ("off", "header", "payload")
+
+    def __init__(self, mode: str, max_entries: int, ttl_seconds: float):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown idempotency mode: {mode!r}")
+        self.mode = mode
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        # identity -> (expires_at, payload hash, response)
+        self._responses: OrderedDict = OrderedDict()
+        # identity -> (payload hash, future of the response)
+        self._in_flight: dict = {}
+
+        self.evaluations = 0
+        self.replayed = 0
+        self.coalesced = 0
+        self.conflicts = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.outbox_replays = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "off" and self.max_entries > 0
+
+    def identity(self, request, key: str | None) -> tuple[str, str] | None:
+        """
+        Returns (identity, payload hash) for a request, or None when it
+        isn't deduplicated.
+        """
+        if not self.enabled or (key is None and self.mode != "payload"):
+            return None
+        digest = payload_hash(request)
+        return ("key:" + key if key is not None else "hash:" + digest), digest
+
+    def _stored(self, identity: str, digest: str):
+        entry = self._responses.get(identity)
+        if entry is None:
+            return None
+        expires_at, stored_digest, response = entry
+        if expires_at <= time.monotonic():
+            del self._responses[identity]
+            self.expirations += 1
+            return None
+        if stored_digest != digest:
+            self.conflicts += 1
+            raise IdempotencyConflict(
+                "Idempotency-Key was already used with a different payload"
+            )
+        self._responses.move_to_end(identity)
+        return response
+
+    def _store(self, identity: str, digest: str, response: dict) -> None:
+        expires_at = time.monotonic() + self.ttl_seconds
+        self._responses[identity] = (expires_at, digest, response)
+        self._responses.move_to_end(identity)
+        while len(self._responses) > self.max_entries:
+            self._responses.popitem(last=False)
+            self.evictions += 1
+
+    async def run(self, request, key: str | None, evaluate) -> tuple[dict, bool]:
+        """
+        Returns (response, replayed): the response of evaluate() for this
+        request's identity, and whether it came from an earlier evaluation.
+        Raises IdempotencyConflict if the key is known with another payload.
+
+        evaluate is called with (key, payload hash) when the request has an
+        Idempotency-Key, else None.
+        """
+        identity = self.identity(request, key)
+        if identity is None:
+            return await evaluate(None), False
+        identity, digest = identity
+
+        response = self._stored(identity, digest)
+        if response is not None:
+            self.replayed += 1
+            return response, True
+
+        in_flight = self._in_flight.get(identity)
+        if in_flight is not None:
+            in_flight_digest, future = in_flight
+            if in_flight_digest != digest:
+                self.conflicts += 1
+                raise IdempotencyConflict(
+                    "Idempotency-Key is in use by a request with a different payload"
+                )
+            self.coalesced += 1
+            # shield: a duplicate giving up must not cancel the evaluation
+            return await asyncio.shield(future), True
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[identity] = (digest, future)
+        self.evaluations += 1
+        replayed = False
+        try:
+            response = await evaluate((key, digest) if key is not None else None)
+        except IdempotentReplay as e:
+            # Committed earlier, possibly by another process.
+            self.outbox_replays += 1
+            response, replayed = e.response, True
+        except BaseException as e:
+            if isinstance(e, IdempotencyConflict):
+                self.conflicts += 1
+            elif not isinstance(e, Exception):
+                # Cancelled: the duplicates fail like an error and can retry.
+                e = RuntimeError("Original request was cancelled")
+            future.set_exception(e)
+            # Retrieved here so an error no duplicate awaited isn't logged.
+            future.exception()
+            raise
+        finally:
+            del self._in_flight[identity]
+        future.set_result(response)
+        self._store(identity, digest, response)
+        return response, replayed
+
+    def clear(self) -> None:
+        self._responses.clear()
+
+    def stats(self) -> dict:
+        return {
+            "mode": self.mode,
+            "enabled": self.enabled,
+            "size": len(self._responses),
+            "max_entries": self.max_entries,
+            "in_flight": len(self._in_flight),
+            "evaluations": self.evaluations,
+            "replayed": self.replayed,
+            "coalesced": self.coalesced,
+            "conflicts": self.conflicts,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "outbox_replays": self.outbox_replays,
+        }
+
+
+idempotency_store = IdempotencyStore(
+    settings.IDEMPOTENCY_MODE,
+    settings.IDEMPOTENCY_MAX_ENTRIES,
+    settings.IDEMPOTENCY_TTL_SECONDS,
+)
@@ -0,0 +1,725 @@
+"""
+Rule-change impact analysis: which historical decisions would change if a
+candidate rule set were promoted.
+
+Instead of replaying every application in an ApplicationStore, the analysis
+first selects the rows the change can affect, over whole columns at once:
+  - the zen input (and the applied tier) is derived for every row under
+    both rule sets, the way the batch evaluator does it; rows where any
+    derived value differs are selected;
+  - a risk_level_rules change also selects rows whose risk assessment
+    differs, evaluated once per group of rows that must share it;
+  - a loan_decision.json change is diffed rule by rule. In a first-hit
+    table, a row that matches none of the added, removed or edited rules
+    (old or new version) hits the same unchanged rule either way, so only
+    rows matching one of them are selected. A condition that can't be
+    tested over the columns counts as matching.
+Only the selected rows are then evaluated under both rule sets, through the
+same pipeline as /loan/evaluate, by worker processes that map the store
+themselves. The result is a flip matrix by state and tier.
+"""
+
+from collections import Counter, defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import NamedTuple
+import json
+import logging
+import multiprocessing
+import operator
+import time
+
+import numpy as np
+
+from app.models.risk_level import RiskLevelRule
+from app.services.application_store import ApplicationStore
+from app.services.credit.scoring import calculate_credit_scores
+from app.services.credit.snapshot import RuleSnapshot
+from app.services.decision_compiler import (
+    UnsupportedDecision,
+    compile_cell,
+    parse_cell,
+)
+from app.services.rule_import import IMPORT_SPECS, read_rows
+
+logger = logging.getLogger(__name__)
+
+# Response fields compared between the two evaluations of a row.
+RESPONSE_FIELDS = (
+    "decision",
+    "message",
+    "manual_review_required",
+    "guarantor_required",
+    "credit_score",
+    "approved_amount",
+    "risk_assessment",
+    "tier_applied",
+    "max_eligible_amount",
+    "interest_rate",
+)
+
+_NUMPY_COMPARISONS = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+
+
+@dataclass(frozen=True)
+class RuleSet:
+    """
+    Everything an evaluation depends on besides the application.
+    """
+
+    snapshot: RuleSnapshot
+    bureau_cfg: dict
+    rules_path: str
+
+    def replace(
+        self,
+        tables: dict | None = None,
+        bureau_cfg: dict | None = None,
+        rules_path: str | None = None,
+    ) -> "RuleSet":
+        return RuleSet(
+            self.snapshot.replace_tables(**tables) if tables else self.snapshot,
+            self.bureau_cfg if bureau_cfg is None else bureau_cfg,
+            self.rules_path if rules_path is None else rules_path,
+        )
+
+
+def load_candidate_table(table: str, path: str) -> tuple[str, object]:
+    """
+    Reads a candidate rule table from CSV (the import_rules.py format) and
+    returns (RuleSnapshot.replace_tables keyword, value).
+    """
+    spec = IMPORT_SPECS[table]
+    rows = [dict(zip(spec.columns, row[1:])) for row in read_rows(path, spec)]
+    if table == "state_risk":
+        return "state_risk", {r["state"]: r["risk_level"] for r in rows}
+    if table == "city_rules":
+        return "city_rules", {
+            r["tier"]: {
+                "min_income": r["min_income"],
+                "multiplier": r["multiplier"],
+                "rate": r["rate"],
+            }
+            for r in rows
+        }
+    if table == "unserviceable_pins":
+        return "unserviceable_pins", {r["pin_code"] for r in rows}
+    return "risk_rules", [RiskLevelRule(**r) for r in rows]
+
+
+class Column(NamedTuple):
+    """
+    One zen input field over every row. Strings are codes into labels; the
+    labels may repeat, and two columns derived from the same store column
+    share codes, so they can be compared label by label.
+    """
+
+    kind: str  # "number", "bool" or "string"
+    values: np.ndarray
+    labels: tuple = ()
+
+
+def _label_mask(column: Column, test) -> np.ndarray:
+    per_code = np.array([bool(test(label)) for label in column.labels], dtype=bool)
+    return per_code[column.values] if len(per_code) else np.zeros(0, dtype=bool)
+
+
+def base_columns(store: ApplicationStore, resolver) -> dict[str, Column]:
+    """
+    The request fields of the zen input, with state and city tier resolved
+    from the PIN code as prepare_evaluation does (once per distinct triple).
+    """
+    columns = {}
+    for name, kind in store.kinds.items():
+        if kind == "category":
+            columns[name] = Column(
+                "string", store.codes(name), tuple(store.categories(name))
+            )
+        else:
+            columns[name] = Column(
+                "bool" if kind == "bool" else "number", store.column(name)
+            )
+
+    if resolver.mode != "off" and len(store):
+        state, city_tier, pin = (
+            columns["state"],
+            columns["city_tier"],
+            columns["pin_code"],
+        )
+        triples, codes = np.unique(
+            np.stack([state.values, city_tier.values, pin.values], axis=1),
+            axis=0,
+            return_inverse=True,
+        )
+        codes = codes.reshape(-1)
+        locations = [
+            resolver.resolve(state.labels[s], city_tier.labels[t], pin.labels[p])
+            for s, t, p in triples
+        ]
+        columns["state"] = Column("string", codes, tuple(s for s, _ in locations))
+        columns["city_tier"] = Column("string", codes, tuple(t for _, t in locations))
+    return columns
+
+
+def derive_columns(base: dict[str, Column], rules: RuleSet) -> dict[str, Column]:
+    """
+    The derived zen input fields (and the applied tier) for every row,
+    matching what prepare_evaluation computes for each one.
+    """
+    snapshot = rules.snapshot
+    city_rules = snapshot.city_rules
+    if "Rural" not in city_rules:
+        raise ValueError("city_rules has no Rural tier to fall back to")
+
+    city_tier, state, pin = base["city_tier"], base["state"], base["pin_code"]
+    tiers = tuple(t if t in city_rules else "Rural" for t in city_tier.labels)
+    tier_rules = [city_rules[t] for t in tiers]
+
+    def per_tier(key: str) -> np.ndarray:
+        # None (a NULL column) becomes NaN, which compares like zen's null
+        values = np.array([r[key] for r in tier_rules], dtype=float)
+        return values[city_tier.values] if len(values) else np.zeros(0)
+
+    incomes = base["monthly_income"].values
+    debt_ratio = np.divide(
+        base["existing_debt"].values,
+        incomes,
+        out=np.ones(len(incomes)),
+        where=incomes > 0,
+    )
+    multiplier = per_tier("multiplier")
+    bureau_score = calculate_credit_scores(
+        debt_ratio,
+        base["employment_duration_months"].values,
+        base["age"].values,
+        rules.bureau_cfg,
+    )
+    serviceable = np.array(
+        [snapshot.unserviceable_pins.is_serviceable(p) for p in pin.labels], dtype=bool
+    )
+
+    return {
+        "tier": Column("string", city_tier.values, tiers),
+        "city_rule_min_income": Column("number", per_tier("min_income")),
+        "city_rule_multiplier": Column("number", multiplier),
+        "city_rule_rate": Column(
+            "string", city_tier.values, tuple(r["rate"] for r in tier_rules)
+        ),
+        "debt_ratio": Column("number", debt_ratio),
+        "max_eligible": Column("number", incomes * multiplier),
+        "bureau_score": Column("number", bureau_score),
+        "state_risk": Column(
+            "string",
+            state.values,
+            tuple(snapshot.state_risk.get(s, "HIGH") for s in state.labels),
+        ),
+        "pin_serviceable": Column(
+            "bool", serviceable[pin.values] if len(serviceable) else serviceable
+        ),
+        "stability_max_dti_ratio": Column(
+            "number", snapshot.risk_index.stability_max_dtis(bureau_score)
+        ),
+    }
+
+
+def _differs(old: Column, new: Column) -> np.ndarray:
+    if old.kind == "string":
+        per_code = np.array(
+            [a != b for a, b in zip(old.labels, new.labels)], dtype=bool
+        )
+        return per_code[old.values] if len(per_code) else np.zeros(0, dtype=bool)
+    differs = old.values != new.values
+    if old.values.dtype.kind == "f":
+        differs &= ~(np.isnan(old.values) & np.isnan(new.values))
+    return differs
+
+
+def _risk_assessment_differs(
+    derived: dict[str, Column], old: RuleSet, new: RuleSet
+) -> np.ndarray:
+    """
+    risk_level() is piecewise constant in the debt ratio between the rules'
+    max_dti_ratio thresholds, so rows with the same state risk, bureau score
+    and threshold band share it: it is evaluated once per such group.
+    """
+    state_risk = derived["state_risk"]
+    label_ids = {label: i for i, label in enumerate(sorted(set(state_risk.labels)))}
+    risk_ids = np.array([label_ids[l] for l in state_risk.labels], dtype=np.int64)
+    risk_ids = risk_ids[state_risk.values] if len(risk_ids) else risk_ids
+
+    thresholds = np.unique(
+        [
+            r.max_dti_ratio
+            for r in old.snapshot.risk_rules + new.snapshot.risk_rules
+            if r.max_dti_ratio is not None
+        ]
+    )
+    debt_ratio = derived["debt_ratio"].values
+    bands = np.searchsorted(thresholds, debt_ratio, side="left")
+    scores = derived["bureau_score"].values
+
+    keys = np.stack([risk_ids, scores.astype(np.float64), bands], axis=1)
+    _, first, groups = np.unique(keys, axis=0, return_index=True, return_inverse=True)
+    labels = np.array(state_risk.labels, dtype=object)[state_risk.values[first]]
+    per_group = np.array(
+        [
+            old.snapshot.risk_index.risk_level(label, debt_ratio[i], scores[i])
+            != new.snapshot.risk_index.risk_level(label, debt_ratio[i], scores[i])
+            for label, i in zip(labels, first)
+        ],
+        dtype=bool,
+    )
+    return per_group[groups.reshape(-1)] if len(per_group) else per_group
+
+
+def _strip_layout(node: dict) -> dict:
+    return {k: v for k, v in node.items() if k != "position"}
+
+
+def _rule_signatures(content: dict) -> list:
+    """
+    (id, conditions, outputs) per rule, with cells keyed by field rather than
+    column id, so re-creating a column doesn't count as a change.
+    """
+    inputs = [
+        (c["id"], (c.get("field") or "").strip()) for c in content.get("inputs", [])
+    ]
+    outputs = [
+        (c["id"], (c.get("field") or "").strip()) for c in content.get("outputs", [])
+    ]
+    signatures = []
+    for rule in content.get("rules", []):
+        conditions = tuple(
+            (name, (rule.get(column_id) or "").strip())
+            for column_id, name in inputs
+            if (rule.get(column_id) or "").strip()
+        )
+        values = tuple(
+            (name, (rule.get(column_id) or "").strip())
+            for column_id, name in outputs
+            if (rule.get(column_id) or "").strip()
+        )
+        signatures.append((rule.get("_id"), conditions, values))
+    return signatures
+
+
+def changed_decision_rules(old_content: bytes, new_content: bytes):
+    """
+    The conditions [(field, cell), ...] of every rule that was added,
+    removed or edited between two decision graphs, plus the fields the
+    graphs' tables produce (which can't be tested over the input columns).
+    Returns None when the graphs differ in a way that can't be bounded rule
+    by rule (edges, nodes, table settings, hit policies other than first):
+    every row is then affected.
+    """
+    if old_content == new_content:
+        return [], set()
+    old_graph, new_graph = json.loads(old_content), json.loads(new_content)
+
+    def edges(graph):
+        return sorted(
+            (e["sourceId"], e["targetId"], e.get("sourceHandle"), e.get("targetHandle"))
+            for e in graph.get("edges", [])
+        )
+
+    if edges(old_graph) != edges(new_graph):
+        return None
+    old_nodes = {n["id"]: _strip_layout(n) for n in old_graph.get("nodes", [])}
+    new_nodes = {n["id"]: _strip_layout(n) for n in new_graph.get("nodes", [])}
+    if old_nodes.keys() != new_nodes.keys():
+        return None
+
+    produced, changed = set(), []
+    for node in [*old_nodes.values(), *new_nodes.values()]:
+        for column in (node.get("content") or {}).get("outputs", []):
+            produced.add((column.get("field") or "").strip())
+
+    for node_id, old_node in old_nodes.items():
+        new_node = new_nodes[node_id]
+        if old_node == new_node:
+            continue
+        if not old_node.get("type") == new_node.get("type") == "decisionTableNode":
+            return None
+        old_table, new_table = (
+            old_node.get("content") or {},
+            new_node.get("content") or {},
+        )
+        settings_keys = set(old_table) | set(new_table)
+        settings_keys -= {"rules", "inputs", "outputs"}
+        if any(old_table.get(k) != new_table.get(k) for k in settings_keys):
+            return None
+        if old_table.get("hitPolicy", "first") != "first":
+            return None
+        if {k: v for k, v in old_node.items() if k != "content"} != {
+            k: v for k, v in new_node.items() if k != "content"
+        }:
+            return None
+
+        old_rules, new_rules = _rule_signatures(old_table), _rule_signatures(new_table)
+        kept = {rule[0] for rule in old_rules if rule[0] is not None} & {
+            rule[0] for rule in new_rules if rule[0] is not None
+        }
+        kept = {
+            rule_id
+            for rule_id in kept
+            if [r for r in old_rules if r[0] == rule_id]
+            == [r for r in new_rules if r[0] == rule_id]
+        }
+        # Unchanged rules must also keep their relative order.
+        if [r[0] for r in old_rules if r[0] in kept] != [
+            r[0] for r in new_rules if r[0] in kept
+        ]:
+            kept = set()
+        changed += [r[1] for r in old_rules + new_rules if r[0] not in kept]
+    return changed, produced
+
+
+def _condition_mask(columns: dict[str, Column], name: str, cell: str):
+    """
+    Rows passing one input cell, or None when that can't be told from the
+    columns (then the cell is treated as passing).
+    """
+    column = columns.get(name)
+    if column is None:
+        return None
+    try:
+        parsed = parse_cell(cell)
+        test = compile_cell(cell)
+    except UnsupportedDecision:
+        return None
+    if parsed is None:
+        return None
+    op, is_literal, operand = parsed
+
+    if not is_literal:
+        other = columns.get(operand)
+        if other is None or column.kind != "number" or other.kind != "number":
+            return None
+        mask = _NUMPY_COMPARISONS[op](column.values, other.values)
+        # A NaN stands for null, which zen compares differently; keep those rows.
+        if column.values.dtype.kind == "f" or other.values.dtype.kind == "f":
+            mask |= np.isnan(column.values) | np.isnan(other.values)
+        return mask
+
+    # Strings and booleans have few distinct values: run the compiled test
+    # (zen's semantics) on each of them.
+    if column.kind == "string":
+        return _label_mask(column, lambda label: test(label, None))
+    if column.kind == "bool":
+        per_value = np.array([test(False, None), test(True, None)], dtype=bool)
+        return per_value[column.values.astype(np.int8)]
+
+    values = column.values
+    if isinstance(operand, (int, float)) and not isinstance(operand, bool):
+        mask = _NUMPY_COMPARISONS[op](values, operand)
+    else:
+        # Against a non-number every number gives the same answer.
+        mask = np.full(len(values), test(0.0, None), dtype=bool)
+    if values.dtype.kind == "f":
+        mask = np.where(np.isnan(values), test(None, None), mask)
+    return mask
+
+
+def _rules_mask(columns: dict[str, Column], rules: list, n: int) -> np.ndarray:
+    selected = np.zeros(n, dtype=bool)
+    for conditions in rules:
+        matches = np.ones(n, dtype=bool)
+        for name, cell in conditions:
+            mask = _condition_mask(columns, name, cell)
+            if mask is not None:
+                matches &= mask
+        selected |= matches
+    return selected
+
+
+@dataclass
+class Selection:
+    mask: np.ndarray
+    # What selected the rows, and how many each cause selected (a row can
+    # have several causes).
+    reasons: dict = field(default_factory=dict)
+
+
+def select_affected(
+    store: ApplicationStore, old: RuleSet, new: RuleSet, resolver
+) -> Selection:
+    """
+    The rows whose response could differ between the two rule sets.
+    """
+    n = len(store)
+    base = base_columns(store, resolver)
+    old_derived, new_derived = derive_columns(base, old), derive_columns(base, new)
+
+    mask = np.zeros(n, dtype=bool)
+    reasons = {}
+    for name, old_column in old_derived.items():
+        differs = _differs(old_column, new_derived[name])
+        if differs.any():
+            reasons[name] = int(differs.sum())
+            mask |= differs
+
+    if (
+        old.snapshot.table_versions["risk_rules"]
+        != new.snapshot.table_versions["risk_rules"]
+    ):
+        differs = _risk_assessment_differs(new_derived, old, new)
+        reasons["risk_assessment"] = int(differs.sum())
+        mask |= differs
+
+    old_content = Path(old.rules_path).read_bytes()
+    new_content = Path(new.rules_path).read_bytes()
+    changes = changed_decision_rules(old_content, new_content)
+    if changes is None:
+        reasons["decision_graph"] = n
+        mask[:] = True
+    elif changes[0]:
+        rules, produced = changes
+        # Rows not selected so far have the same input under both rule sets.
+        columns = {
+            name: column
+            for name, column in {**base, **new_derived}.items()
+            if name not in produced
+        }
+        matches = _rules_mask(columns, rules, n)
+        reasons["decision_rules"] = int(matches.sum())
+        mask |= matches
+
+    return Selection(mask, reasons)
+
+
+# Set in each worker process by _init_worker
+_store = None
+_sides = None
+
+
+def _init_worker(store_path: str, old: RuleSet, new: RuleSet) -> None:
+    global _store, _sides
+    from app.services.credit.scoring import CreditScorer, compile_credit_scorer
+    from app.services.decision_cache import DecisionCache
+    from app.services.decision_trace import DecisionTracer
+    from app.services.zen_engine import DecisionExecutor, LoanDecisionEngine
+
+    _store = ApplicationStore(store_path)
+    _sides = []
+    for rules in (old, new):
+        scorer = CreditScorer(
+            cfg=rules.bureau_cfg,
+            version="impact",
+            score=compile_credit_scorer(rules.bureau_cfg),
+        )
+        if rules is new and new.rules_path == old.rules_path:
+            engine = _sides[0][2]
+        else:
+            # Workers evaluate synchronously, every row once: no watcher,
+            # pool or cache.
+            engine = LoanDecisionEngine(
+                rules.rules_path,
+                watch_interval=0,
+                executor=DecisionExecutor("inline", 1),
+                cache=DecisionCache(0, 0),
+                tracer=DecisionTracer(0, 0),
+            )
+            engine.load()
+        _sides.append((rules.snapshot, scorer, engine))
+
+
+def _evaluate_rows(indices) -> list[tuple]:
+    """
+    (row, state, tier, old response, new response) per row, or
+    (row, state, tier, error, None) when an evaluation failed.
+    """
+    from app.services.credit.loan_evaluator import build_response, prepare_evaluation
+
+    results = []
+    for i in indices.tolist():
+        request = _store.application(i)
+        responses, state, tier = [], request.state, None
+        previous = (None, None, None)
+        try:
+            for snapshot, scorer, engine in _sides:
+                zen_input, derived = prepare_evaluation(request, snapshot, scorer)
+                if tier is None:
+                    state, tier = zen_input["state"], derived["tier"]
+                # Same graph, same input: the old result stands (a tables-only
+                # change often leaves the zen input of a row untouched).
+                if previous[:2] == (engine, zen_input):
+                    raw_result = previous[2]
+                else:
+                    raw_result = engine.evaluate(zen_input)
+                previous = (engine, zen_input, raw_result)
+                responses.append(build_response(raw_result, **derived))
+        except Exception as e:
+            results.append((i, state, tier, str(e), None))
+            continue
+        results.append((i, state, tier, *responses))
+    return results
+
+
+class FlipMatrix:
+    """
+    Accumulates old -> new decision counts per (state, tier), where the state
+    is the one evaluated and the tier is the one applied under the old rules.
+    """
+
+    def __init__(self, max_examples: int):
+        self.max_examples = max_examples
+        self.evaluated = 0
+        self.errors = 0
+        self.changed = 0
+        self.transitions = Counter()
+        self.groups = defaultdict(
+            lambda: {"evaluated": 0, "changed": 0, "flips": Counter(), "amount": 0.0}
+        )
+        self.changed_fields = Counter()
+        self.examples = []
+        self.changed_rows = []
+
+    def add(self, row, row_number, state, tier, old, new) -> None:
+        group = self.groups[(state, tier)]
+        group["evaluated"] += 1
+        self.evaluated += 1
+        if new is None:
+            self.errors += 1
+            return
+        fields = [name for name in RESPONSE_FIELDS if old[name] != new[name]]
+        if not fields:
+            return
+        self.changed += 1
+        self.changed_rows.append(row)
+        self.changed_fields.update(fields)
+        group["changed"] += 1
+        group["amount"] += new["approved_amount"] - old["approved_amount"]
+        if old["decision"] != new["decision"]:
+            transition = f"{old['decision']} -> {new['decision']}"
+            self.transitions[transition] += 1
+            group["flips"][transition] += 1
+            if len(self.examples) < self.max_examples:
+                self.examples.append(
+                    {
+                        "row": row_number,
+                        "state": state,
+                        "tier": tier,
+                        "old": {k: old[k] for k in ("decision", "message")},
+                        "new": {k: new[k] for k in ("decision", "message")},
+                    }
+                )
+
+    def report(self) -> dict:
+        groups = [
+            {
+                "state": state,
+                "tier": tier,
+                "evaluated": g["evaluated"],
+                "changed": g["changed"],
+                "flipped": sum(g["flips"].values()),
+                "flips": dict(g["flips"].most_common()),
+                "approved_amount_delta": g["amount"],
+            }
+            for (state, tier), g in self.groups.items()
+            if g["changed"]
+        ]
+        groups.sort(key=lambda g: (-g["flipped"], -g["changed"], g["state"] or ""))
+        return {
+            "evaluated": self.evaluated,
+            "errors": self.errors,
+            "changed": self.changed,
+            "flipped": sum(self.transitions.values()),
+            "transitions": dict(self.transitions.most_common()),
+            "changed_fields": dict(self.changed_fields.most_common()),
+            "by_state_tier": groups,
+            "examples": self.examples,
+        }
+
+
+def analyze_impact(
+    store_path: str,
+    old: RuleSet,
+    new: RuleSet,
+    workers: int,
+    chunk_size: int = 2000,
+    verify: bool = False,
+    max_examples: int = 20,
+) -> dict:
+    """
+    Selects the rows the change can affect and evaluates them under both
+    rule sets. With verify=True every row is evaluated, and the report
+    counts changed rows the selection missed (which should be 0).
+    """
+    from app.services.credit.loan_evaluator import location_resolver
+
+    store = ApplicationStore(store_path)
+    started = time.perf_counter()
+    selection = select_affected(store, old, new, location_resolver)
+    selected = np.flatnonzero(selection.mask)
+    select_seconds = time.perf_counter() - started
+    logger.info(
+        "Selected %d of %d rows in %.2fs | %s",
+        len(selected),
+        len(store),
+        select_seconds,
+        selection.reasons,
+    )
+
+    to_evaluate = np.arange(len(store)) if verify else selected
+    matrix = FlipMatrix(max_examples)
+    row_numbers = store.row_numbers()
+    started = time.perf_counter()
+    if len(to_evaluate):
+        # spawn, not fork: workers start clean and map the store themselves.
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(
+            max_workers=max(1, min(workers, -(-len(to_evaluate) // chunk_size))),
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(str(store.path), old, new),
+        ) as pool:
+            # At most 2 chunks per worker in flight, as in rescore.py
+            pending = deque()
+
+            def drain_one():
+                for (
+                    row,
+                    state,
+                    tier,
+                    old_response,
+                    new_response,
+                ) in pending.popleft().result():
+                    matrix.add(
+                        row,
+                        int(row_numbers[row]),
+                        state,
+                        tier,
+                        old_response,
+                        new_response,
+                    )
+
+            for start in range(0, len(to_evaluate), chunk_size):
+                pending.append(
+                    pool.submit(_evaluate_rows, to_evaluate[start : start + chunk_size])
+                )
+                if len(pending) >= workers * 2:
+                    drain_one()
+            while pending:
+                drain_one()
+    evaluate_seconds = time.perf_counter() - started
+
+    report = {
+        "rows": len(store),
+        "selected": len(selected),
+        "selection": selection.reasons,
+        **matrix.report(),
+        "seconds": {"select": select_seconds, "evaluate": evaluate_seconds},
+    }
+    if verify:
+        report["missed_by_selection"] = int(
+            (~selection.mask[np.array(matrix.changed_rows, dtype=np.int64)]).sum()
+        )
+    return report
@@ -1,5 +1,13 @@
 import logging
-from datetime import date, timedelta
+from datetime import date
+
+from app.services.amortization import (
+    RepaymentSchedule,
+    ScheduleBook,
+    build_schedule,
+    build_schedules,
+    parse_annual_rate,
+)
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -14,6 +22,15 @@ def notify_applicant(application, approved_amount, interest_rate):
     )
 
 
+def notify_applicants(approvals):
+    """
+    Sends one batch of approval notifications.
+    Each approval is (application, approved_amount, interest_rate).
+    """
+    for application, approved_amount, interest_rate in approvals:
+        notify_applicant(application, approved_amount, interest_rate)
+
+
 def create_loan_record(db, application, approved_amount, interest_rate):
     loan_id = f"LN-{application.pin_code}-{approved_amount}"
     logger.info(
@@ -22,22 +39,47 @@ def create_loan_record(db, application, approved_amount, interest_rate):
     return loan_id
 
 
-def generate_repayment_schedule(loan_id, approved_amount, tenure_months=24):
-    emi = round(approved_amount / tenure_months, 2)
-    schedule = []
-    start_date = date.today() + timedelta(days=30)
+def create_loan_records(db, approvals) -> list[str]:
+    """
+    Creates loan records for one batch of approvals, returning their loan IDs in order.
+    """
+    return [
+        create_loan_record(db, application, approved_amount, interest_rate)
+        for application, approved_amount, interest_rate in approvals
+    ]
 
-    for i in range(tenure_months):
-        schedule.append(
-            {
-                "loan_id": loan_id,
-                "installment_no": i + 1,
-                "emi": emi,
-                "due_date": start_date + timedelta(days=30 * i),
-            }
-        )
+
+def generate_repayment_schedule(
+    loan_id, approved_amount, interest_rate, tenure_months=24
+) -> RepaymentSchedule:
+    schedule = build_schedule(
+        loan_id,
+        approved_amount,
+        parse_annual_rate(interest_rate),
+        tenure_months,
+        date.today(),
+    )
 
     logger.info(
-        f"[REPAYMENT] Schedule generated | LoanID: {loan_id} | EMI: {emi} | Tenure: {tenure_months} months"
+        f"[REPAYMENT] Schedule generated | LoanID: {loan_id} | EMI: {schedule.emi[0]} | Tenure: {tenure_months} months"
     )
     return schedule
+
+
+def generate_repayment_schedules(loan_ids, approvals, tenure_months=24) -> ScheduleBook:
+    """
+    Builds the schedules for one batch of approvals in a single pass.
+    Each approval is (application, approved_amount, interest_rate).
+    """
+    book = build_schedules(
+        loan_ids,
+        [approved_amount for _, approved_amount, _ in approvals],
+        [parse_annual_rate(interest_rate) for _, _, interest_rate in approvals],
+        [tenure_months] * len(approvals),
+        [date.today()] * len(approvals),
+    )
+
+    logger.info(
+        f"[REPAYMENT] Schedules generated | Loans: {len(book)} | Installments: {len(book.installment_no)}"
+    )
+    return book
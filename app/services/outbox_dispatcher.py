@@ -0,0 +1,270 @@
+from datetime import timedelta
+import asyncio
+import logging
+
+from app.core import settings
+from app.core.database import new_session
+from app.models.post_approval_outbox import utcnow
+from app.repositories.post_approval_outbox_repo import PostApprovalOutboxRepository
+from app.schemas.loan import LoanRequest
+from app.services.los_post_actions import (
+    create_loan_record,
+    create_loan_records,
+    generate_repayment_schedule,
+    generate_repayment_schedules,
+    notify_applicant,
+    notify_applicants,
+)
+
+logger = logging.getLogger(__name__)
+
+MAX_RETRY_DELAY_SECONDS = 300.0
+
+
+def outbox_payload(request, approved_amount, interest_rate) -> dict:
+    return {
+        "application": request.model_dump(mode="json"),
+        "approved_amount": approved_amount,
+        "interest_rate": interest_rate,
+    }
+
+
+class OutboxDispatcher:
+    """
+    Works off the post_approval_outbox table in the background.
+
+    A poller claims due rows in batches and hands them to a small pool of
+    async workers, which run the post-approval actions for a whole batch at
+    once. A batch that fails is retried row by row so one bad row doesn't
+    hold back the rest; failed rows back off exponentially and are marked
+    FAILED after max_attempts. Delivery is at-least-once: a row whose
+    worker dies mid-batch is claimed again when its lease runs out.
+    """
+
+    def __init__(
+        self,
+        session_factory,
+        workers: int,
+        batch_size: int,
+        poll_interval: float,
+        max_attempts: int,
+        retry_base_seconds: float,
+        lease_seconds: float,
+    ):
+        self.session_factory = session_factory
+        self.workers = max(1, workers)
+        self.batch_size = max(1, batch_size)
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.retry_base_seconds = retry_base_seconds
+        self.lease_seconds = lease_seconds
+
+        self._wake = asyncio.Event()
+        self._queue: asyncio.Queue | None = None
+        self._tasks: list[asyncio.Task] = []
+
+        self.pending_rows = 0
+        self.in_flight = 0
+        self.claimed = 0
+        self.processed = 0
+        self.retried = 0
+        self.failed = 0
+        self.batch_failures = 0
+        self.poll_errors = 0
+        self.last_lag_seconds = 0.0
+
+    async def start(self) -> None:
+        if self._tasks:
+            return
+        # One batch waiting per worker keeps them busy without over-claiming.
+        self._queue = asyncio.Queue(maxsize=self.workers)
+        loop = asyncio.get_running_loop()
+        self._tasks = [loop.create_task(self._poll())] + [
+            loop.create_task(self._work()) for _ in range(self.workers)
+        ]
+        logger.info("Outbox dispatcher started with %d workers", self.workers)
+
+    async def stop(self, drain_timeout: float = 5.0) -> None:
+        if not self._tasks:
+            return
+        poller, workers = self._tasks[0], self._tasks[1:]
+        poller.cancel()
+        # Let workers finish batches already claimed; anything left over is
+        # picked up again after its lease expires.
+        try:
+            await asyncio.wait_for(self._queue.join(), drain_timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Outbox dispatcher stopped with batches still queued")
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def wake(self) -> None:
+        """
+        Called after an outbox row is committed so it's picked up without
+        waiting for the next poll.
+        """
+        self._wake.set()
+
+    async def _poll(self) -> None:
+        delay = self.poll_interval
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+            try:
+                while True:
+                    async with self.session_factory() as session:
+                        repo = PostApprovalOutboxRepository(session)
+                        rows = await repo.claim_due(self.batch_size, self.lease_seconds)
+                        self.pending_rows = await repo.count_pending()
+                    if not rows:
+                        break
+                    self.claimed += len(rows)
+                    # Blocks while every worker is busy, which is the backpressure.
+                    await self._queue.put(rows)
+                    if len(rows) < self.batch_size:
+                        break
+                delay = self.poll_interval
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.poll_errors += 1
+                delay = min(max(delay, 1.0) * 2, 30.0)
+                logger.error("Polling the post-approval outbox failed: %s", e)
+
+    async def _work(self) -> None:
+        while True:
+            rows = await self._queue.get()
+            self.in_flight += len(rows)
+            try:
+                await self._process(rows)
+            except Exception as e:
+                # Results could not be recorded; the rows come back after their lease.
+                logger.error("Outbox batch of %d rows not recorded: %s", len(rows), e)
+            finally:
+                self.in_flight -= len(rows)
+                self._queue.task_done()
+
+    async def _process(self, rows) -> None:
+        approvals, invalid = [], {}
+        done, errors = [], {}
+        for row in rows:
+            try:
+                approvals.append((row, self._approval(row)))
+            except Exception as e:
+                # Retrying can't fix a payload, so it fails right away.
+                invalid[row.id] = f"Invalid payload: {e}"
+
+        async with self.session_factory() as session:
+            try:
+                self._run_batch(session, [approval for _, approval in approvals])
+                done = [row.id for row, _ in approvals]
+            except Exception as e:
+                self.batch_failures += 1
+                logger.warning(
+                    "Outbox batch of %d failed, retrying rows one by one: %s",
+                    len(approvals),
+                    e,
+                )
+                for row, approval in approvals:
+                    try:
+                        self._run_one(session, approval)
+                        done.append(row.id)
+                    except Exception as row_error:
+                        errors[row.id] = str(row_error)
+
+            repo = PostApprovalOutboxRepository(session)
+            await repo.mark_done(done)
+            for row in rows:
+                if row.id in errors:
+                    await self._record_failure(repo, row, errors[row.id])
+                elif row.id in invalid:
+                    self.failed += 1
+                    logger.error("Outbox row %s: %s", row.id, invalid[row.id])
+                    await repo.mark_failed(row.id, invalid[row.id])
+            await session.commit()
+
+        self.processed += len(done)
+        if done:
+            self.last_lag_seconds = (utcnow() - rows[0].created_at).total_seconds()
+
+    @staticmethod
+    def _approval(row) -> tuple:
+        payload = row.payload
+        return (
+            LoanRequest.model_validate(payload["application"]),
+            payload["approved_amount"],
+            payload["interest_rate"],
+        )
+
+    @staticmethod
+    def _run_batch(session, approvals) -> None:
+        if not approvals:
+            return
+        notify_applicants(approvals)
+        loan_ids = create_loan_records(session, approvals)
+        generate_repayment_schedules(loan_ids, approvals)
+
+    @staticmethod
+    def _run_one(session, approval) -> None:
+        application, approved_amount, interest_rate = approval
+        notify_applicant(application, approved_amount, interest_rate)
+        loan_id = create_loan_record(
+            session, application, approved_amount, interest_rate
+        )
+        generate_repayment_schedule(loan_id, approved_amount, interest_rate)
+
+    async def _record_failure(self, repo, row, error: str) -> None:
+        if row.attempts >= self.max_attempts:
+            self.failed += 1
+            logger.error(
+                "Outbox row %s failed after %d attempts: %s",
+                row.id,
+                row.attempts,
+                error,
+            )
+            await repo.mark_failed(row.id, error)
+            return
+
+        self.retried += 1
+        delay = min(
+            self.retry_base_seconds * 2 ** (row.attempts - 1), MAX_RETRY_DELAY_SECONDS
+        )
+        logger.warning(
+            "Outbox row %s attempt %d failed, retrying in %.0fs: %s",
+            row.id,
+            row.attempts,
+            delay,
+            error,
+        )
+        await repo.mark_retry(row.id, error, utcnow() + timedelta(seconds=delay))
+
+    def stats(self) -> dict:
+        return {
+            "pending_rows": self.pending_rows,
+            "queued_batches": self._queue.qsize() if self._queue else 0,
+            "in_flight": self.in_flight,
+            "claimed": self.claimed,
+            "processed": self.processed,
+            "retried": self.retried,
+            "failed": self.failed,
+            "batch_failures": self.batch_failures,
+            "poll_errors": self.poll_errors,
+            "last_lag_seconds": self.last_lag_seconds,
+        }
+
+
+outbox_dispatcher = OutboxDispatcher(
+    new_session,
+    workers=settings.OUTBOX_WORKERS,
+    batch_size=settings.OUTBOX_BATCH_SIZE,
+    poll_interval=settings.OUTBOX_POLL_INTERVAL_SECONDS,
+    max_attempts=settings.OUTBOX_MAX_ATTEMPTS,
+    retry_base_seconds=settings.OUTBOX_RETRY_BASE_SECONDS,
+    lease_seconds=settings.OUTBOX_LEASE_SECONDS,
+)
@@ -0,0 +1,261 @@
+"""
+PIN code -> state / district / city tier, from a sorted binary index file.
+
+The file is built offline (build_pin_geo_index.py) and memory-mapped
+read-only, so worker processes share one copy through the page cache and a
+lookup is a bisect over the mapped PIN column; nothing touches the DB.
+
+File layout (little-endian):
+    header   magic (8 bytes), entry count N, names length L   "<8sII"
+    names    L bytes of JSON: {"states": [...], "districts": [...], "tiers": [...]},
+             zero-padded to a multiple of 4
+    pins     N x uint32, ascending
+    states   N x uint16, index into names["states"]
+    district N x uint16, index into names["districts"]
+    tiers    N x uint8,  index into names["tiers"] ("" = unknown)
+"""
+
+from bisect import bisect_left
+from collections import Counter
+from pathlib import Path
+from typing import NamedTuple
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+import tempfile
+
+from app.core import settings
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"PINGEO\x00\x01"
+_HEADER = struct.Struct("<8sII")
+
+PIN_GEO_FILE = Path(__file__).resolve().parent.parent / "rules" / "pin_geo_index.bin"
+
+
+class PinLocation(NamedTuple):
+    state: str
+    district: str
+    tier: str | None
+
+
+def _padded(length: int) -> int:
+    return (length + 3) & ~3
+
+
+def _umask() -> int:
+    # The only way to read the umask is to set it.
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+
+def write_pin_geo_index(path: str | Path, entries) -> int:
+    """
+    Writes an index from (pin, state, district, tier) rows. A PIN listed more
+    than once (one row per post office) takes its most common location.
+    The file is replaced atomically, so processes that mapped the old one
+    keep a consistent view. Returns the number of PINs written.
+    """
+    votes: dict[int, Counter] = {}
+    for pin, state, district, tier in entries:
+        votes.setdefault(int(pin), Counter())[(state, district, tier or "")] += 1
+
+    pins = sorted(votes)
+    locations = [votes[pin].most_common(1)[0][0] for pin in pins]
+    states = sorted({state for state, _, _ in locations})
+    districts = sorted({district for _, district, _ in locations})
+    tiers = [""] + sorted({tier for _, _, tier in locations} - {""})
+    if len(states) > 0xFFFF or len(districts) > 0xFFFF or len(tiers) > 0xFF:
+        raise ValueError("Too many distinct states, districts or tiers")
+
+    state_ids = {name: i for i, name in enumerate(states)}
+    district_ids = {name: i for i, name in enumerate(districts)}
+    tier_ids = {name: i for i, name in enumerate(tiers)}
+
+    names = json.dumps(
+        {"states": states, "districts": districts, "tiers": tiers}
+    ).encode("utf-8")
+    n = len(pins)
+
+    path = Path(path)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=path.name + ".")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(_HEADER.pack(MAGIC, n, len(names)))
+            f.write(names.ljust(_padded(len(names)), b"\0"))
+            f.write(struct.pack(f"<{n}I", *pins))
+            f.write(struct.pack(f"<{n}H", *(state_ids[s] for s, _, _ in locations)))
+            f.write(struct.pack(f"<{n}H", *(district_ids[d] for _, d, _ in locations)))
+            f.write(struct.pack(f"<{n}B", *(tier_ids[t] for _, _, t in locations)))
+        # mkstemp creates the file 0600; workers may run as another user.
+        os.chmod(tmp_path, 0o644 & ~_umask())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return n
+
+
+class PinGeoIndex:
+    """
+    Read-only view of an index file. lookup() costs one bisect over N PINs
+    (~15 probes for all of India) plus three array reads.
+    """
+
+    def __init__(self, path: str | Path):
+        if sys.byteorder != "little":
+            raise RuntimeError("PinGeoIndex maps little-endian files directly")
+
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            magic, n, names_length = _HEADER.unpack_from(self._mmap, 0)
+            if magic != MAGIC:
+                raise ValueError(f"{self.path} is not a PIN geo index")
+            offset = _HEADER.size
+            names = json.loads(bytes(self._mmap[offset : offset + names_length]))
+            offset += _padded(names_length)
+
+            view = memoryview(self._mmap)
+            columns = []
+            for fmt, width in (("I", 4), ("H", 2), ("H", 2), ("B", 1)):
+                columns.append(view[offset : offset + n * width].cast(fmt))
+                offset += n * width
+            if offset > len(self._mmap):
+                raise ValueError(f"{self.path} is truncated")
+        except Exception:
+            self.close()
+            raise
+
+        self._pins, self._state_ids, self._district_ids, self._tier_ids = columns
+        self._states = names["states"]
+        self._districts = names["districts"]
+        self._tiers = [tier or None for tier in names["tiers"]]
+
+    def __len__(self) -> int:
+        return len(self._pins)
+
+    def lookup(self, pin_code: str) -> PinLocation | None:
+        # ASCII only: str.isdigit() also accepts other scripts' digits.
+        if not (len(pin_code) == 6 and pin_code.isascii() and pin_code.isdigit()):
+            return None
+        pin = int(pin_code)
+        pins = self._pins
+        i = bisect_left(pins, pin)
+        if i == len(pins) or pins[i] != pin:
+            return None
+        return PinLocation(
+            self._states[self._state_ids[i]],
+            self._districts[self._district_ids[i]],
+            self._tiers[self._tier_ids[i]],
+        )
+
+    def close(self) -> None:
+        # Views must be released before the map can be closed.
+        for name in ("_pins", "_state_ids", "_district_ids", "_tier_ids"):
+            view = self.__dict__.pop(name, None)
+            if view is not None:
+                view.release()
+        self._mmap.close()
+
+
+class LocationResolver:
+    """
+    Applies PIN_GEO_MODE to a request's state and city tier:
+      off    - trust the client's values (no index is opened);
+      verify - use the client's values, counting disagreements with the index;
+      derive - use the index's state and tier for PINs it knows (a PIN with
+               no tier keeps the client's tier); unknown PINs keep both.
+    Given index_path instead of an index, the file is mapped on first use
+    (or by load() during startup warm-up).
+    """
+
+    MODES = ("off", "verify", "derive")
+
+    def __init__(
+        self,
+        mode: str,
+        index: PinGeoIndex | None = None,
+        index_path: str | Path | None = None,
+    ):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown PIN geo mode: {mode!r}")
+        if mode != "off" and index is None and index_path is None:
+            raise ValueError(f"PIN geo mode {mode!r} needs an index")
+        self.mode = mode
+        self.index = index if mode != "off" else None
+        self.index_path = Path(index_path) if index_path is not None else None
+
+        self.lookups = 0
+        self.unknown_pins = 0
+        self.state_mismatches = 0
+        self.tier_mismatches = 0
+
+    def resolve(self, state: str, city_tier: str, pin_code: str) -> tuple[str, str]:
+        """
+        Returns the (state, city_tier) to evaluate the request with.
+        """
+        index = self.index
+        if index is None:
+            if self.mode == "off":
+                return state, city_tier
+            index = self.load()
+
+        self.lookups += 1
+        location = index.lookup(pin_code)
+        if location is None:
+            self.unknown_pins += 1
+            return state, city_tier
+
+        if location.state != state:
+            self.state_mismatches += 1
+        if location.tier is not None and location.tier != city_tier:
+            self.tier_mismatches += 1
+        if self.mode == "derive":
+            return location.state, location.tier or city_tier
+        return state, city_tier
+
+    def load(self) -> PinGeoIndex | None:
+        """
+        Maps the index file unless it is already mapped (or the mode is off).
+        A missing or corrupt file raises.
+        """
+        if self.index is None and self.mode != "off":
+            self.index = PinGeoIndex(self.index_path)
+            logger.info(
+                "PIN geo index mapped | %s | %d PINs",
+                self.index.path.name,
+                len(self.index),
+            )
+        return self.index
+
+    def stats(self) -> dict:
+        return {
+            "mode": self.mode,
+            "loaded": self.index is not None,
+            "entries": len(self.index) if self.index is not None else 0,
+            "lookups": self.lookups,
+            "unknown_pins": self.unknown_pins,
+            "state_mismatches": self.state_mismatches,
+            "tier_mismatches": self.tier_mismatches,
+        }
+
+
+def create_location_resolver() -> LocationResolver:
+    """
+    Builds the resolver from settings. Unless the mode is off, the index is
+    mapped on first use; a missing or corrupt file fails startup warm-up.
+    """
+    mode = settings.PIN_GEO_MODE
+    if mode == "off":
+        return LocationResolver(mode)
+    return LocationResolver(
+        mode, index_path=settings.PIN_GEO_INDEX_FILE or PIN_GEO_FILE
+    )
@@ -0,0 +1,307 @@
+"""
+Bulk import of rule tables from CSV.
+
+The file is streamed into a temporary staging table (COPY on Postgres,
+batched executemany elsewhere), then diffed against the live table with a
+handful of set-based statements: delete the keys that are gone, update the
+rows whose values changed, insert the new keys. Everything runs in one
+transaction, so readers see either the old table or the new one, and on
+Postgres the rules_changed triggers fire once per statement.
+"""
+
+from dataclasses import dataclass
+from itertools import islice
+import csv
+import logging
+import time
+
+from sqlalchemy import (
+    Column,
+    Index,
+    Integer,
+    MetaData,
+    Table,
+    and_,
+    func,
+    or_,
+    select,
+    text,
+)
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.models.city_rules import CityRule
+from app.models.risk_level import RiskLevelRule
+from app.models.state_risk import StateRisk
+from app.models.unserviceable_pin import UnserviceablePin
+
+logger = logging.getLogger(__name__)
+
+# Staging column holding the CSV line number, for ordering and error messages.
+LINE_COLUMN = "_line"
+
+
+class RuleImportError(ValueError):
+    """
+    The input can't be imported as given; nothing was changed.
+    """
+
+
+@dataclass(frozen=True)
+class ImportSpec:
+    """
+    How a rule table is matched: rows with the same key are the same rule.
+    A table without a key is ordered (its ids are rule priority), so it is
+    only ever replaced as a whole.
+    """
+
+    table: Table
+    key: tuple[str, ...]
+
+    @property
+    def columns(self) -> list[str]:
+        return [c.name for c in self.table.columns if not c.primary_key]
+
+    @property
+    def values(self) -> list[str]:
+        return [name for name in self.columns if name not in self.key]
+
+
+IMPORT_SPECS = {
+    "unserviceable_pins": ImportSpec(UnserviceablePin.__table__, ("pin_code",)),
+    "state_risk": ImportSpec(StateRisk.__table__, ("state",)),
+    "city_rules": ImportSpec(CityRule.__table__, ("tier",)),
+    "risk_level_rules": ImportSpec(RiskLevelRule.__table__, ()),
+}
+
+
+def read_rows(path: str, spec: ImportSpec):
+    """
+    Yields one tuple per CSV row: the line number, then the spec's columns
+    converted to their column types. The header must name every column.
+    """
+    columns = [spec.table.c[name] for name in spec.columns]
+    with open(path, "r", newline="", encoding="utf-8-sig") as f:
+        reader = csv.reader(f)
+        header = [name.strip().lower() for name in next(reader, [])]
+        missing = [c.name for c in columns if c.name not in header]
+        if missing:
+            raise RuleImportError(f"{path}: missing columns {', '.join(missing)}")
+        positions = [header.index(c.name) for c in columns]
+        converters = [c.type.python_type for c in columns]
+
+        for line, row in enumerate(reader, start=2):
+            if not any(cell.strip() for cell in row):
+                continue
+            values = [line]
+            for column, position, convert in zip(columns, positions, converters):
+                cell = row[position].strip() if position < len(row) else ""
+                if not cell:
+                    if not column.nullable or column.name in spec.key:
+                        raise RuleImportError(
+                            f"{path}:{line}: {column.name} is required"
+                        )
+                    values.append(None)
+                    continue
+                try:
+                    values.append(convert(cell))
+                except ValueError:
+                    raise RuleImportError(
+                        f"{path}:{line}: invalid {column.name} {cell!r}"
+                    ) from None
+            yield tuple(values)
+
+
+def _staging_table(spec: ImportSpec) -> Table:
+    return Table(
+        f"import_{spec.table.name}",
+        MetaData(),
+        Column(LINE_COLUMN, Integer),
+        *(Column(name, spec.table.c[name].type) for name in spec.columns),
+        prefixes=["TEMPORARY"],
+    )
+
+
+async def _load_staging(
+    conn: AsyncConnection, staging: Table, rows, batch_size: int
+) -> int:
+    names = [c.name for c in staging.columns]
+    if conn.dialect.name == "postgresql":
+        raw = await conn.get_raw_connection()
+        # COPY streams the rows in asyncpg's binary format; one round trip.
+        status = await raw.driver_connection.copy_records_to_table(
+            staging.name, records=rows, columns=names
+        )
+        return int(status.split()[-1])
+
+    count = 0
+    rows = iter(rows)
+    while batch := list(islice(rows, batch_size)):
+        await conn.execute(staging.insert(), [dict(zip(names, row)) for row in batch])
+        count += len(batch)
+    return count
+
+
+async def _index_staging(
+    conn: AsyncConnection, spec: ImportSpec, staging: Table
+) -> None:
+    # Built after the load (cheaper than maintaining it row by row); without
+    # it every anti-join below is quadratic.
+    index = Index(f"{staging.name}_key", *(staging.c[name] for name in spec.key))
+    await conn.run_sync(index.create)
+    if conn.dialect.name == "postgresql":
+        # Temporary tables are never auto-analyzed; give the planner row counts.
+        await conn.execute(text(f"ANALYZE {staging.name}"))
+
+
+async def _check_duplicate_keys(
+    conn: AsyncConnection, spec: ImportSpec, staging: Table
+) -> None:
+    keys = [staging.c[name] for name in spec.key]
+    duplicates = (
+        await conn.execute(
+            select(*keys, func.min(staging.c[LINE_COLUMN]))
+            .group_by(*keys)
+            .having(func.count() > 1)
+            .limit(5)
+        )
+    ).all()
+    if duplicates:
+        shown = ", ".join(f"{tuple(d[:-1])} (line {d[-1]})" for d in duplicates)
+        raise RuleImportError(f"Duplicate keys in input: {shown}")
+
+
+async def _apply_keyed(
+    conn: AsyncConnection, spec: ImportSpec, staging: Table, delete_missing: bool
+) -> dict:
+    target = spec.table
+    match = and_(*(target.c[name] == staging.c[name] for name in spec.key))
+    counts = {"inserted": 0, "updated": 0, "deleted": 0}
+
+    if delete_missing:
+        gone = ~select(staging.c[LINE_COLUMN]).where(match).exists()
+        counts["deleted"] = (await conn.execute(target.delete().where(gone))).rowcount
+
+    if spec.values:
+        changed = or_(
+            *(staging.c[name].is_distinct_from(target.c[name]) for name in spec.values)
+        )
+        update = (
+            target.update()
+            .values(
+                {
+                    name: select(staging.c[name]).where(match).scalar_subquery()
+                    for name in spec.values
+                }
+            )
+            .where(select(staging.c[LINE_COLUMN]).where(match, changed).exists())
+        )
+        counts["updated"] = (await conn.execute(update)).rowcount
+
+    new = ~select(target.c[spec.key[0]]).where(match).exists()
+    insert = target.insert().from_select(
+        spec.columns,
+        select(*(staging.c[name] for name in spec.columns))
+        .where(new)
+        .order_by(staging.c[LINE_COLUMN]),
+    )
+    counts["inserted"] = (await conn.execute(insert)).rowcount
+    return counts
+
+
+async def _apply_ordered(conn: AsyncConnection, spec: ImportSpec, staging: Table):
+    target = spec.table
+    current = (
+        await conn.execute(
+            select(*(target.c[name] for name in spec.columns)).order_by(
+                target.c[target.primary_key.columns.keys()[0]]
+            )
+        )
+    ).all()
+    incoming = (
+        await conn.execute(
+            select(*(staging.c[name] for name in spec.columns)).order_by(
+                staging.c[LINE_COLUMN]
+            )
+        )
+    ).all()
+    if [tuple(r) for r in current] == [tuple(r) for r in incoming]:
+        return {"inserted": 0, "updated": 0, "deleted": 0}
+
+    # Inserted in file order, so new ids keep the file's priority order.
+    deleted = (await conn.execute(target.delete())).rowcount
+    insert = target.insert().from_select(
+        spec.columns,
+        select(*(staging.c[name] for name in spec.columns)).order_by(
+            staging.c[LINE_COLUMN]
+        ),
+    )
+    inserted = (await conn.execute(insert)).rowcount
+    return {"inserted": inserted, "updated": 0, "deleted": deleted}
+
+
+async def import_rule_table(
+    engine,
+    table: str,
+    path: str,
+    delete_missing: bool = True,
+    dry_run: bool = False,
+    batch_size: int = 5000,
+) -> dict:
+    """
+    Makes `table` match the CSV at `path` and returns the row counts.
+    With delete_missing=False, rows absent from the file are kept (upsert).
+    A dry run computes the same counts and rolls back.
+    """
+    spec = IMPORT_SPECS.get(table)
+    if spec is None:
+        raise RuleImportError(
+            f"Unknown table {table!r}; expected one of {', '.join(IMPORT_SPECS)}"
+        )
+    if not spec.key and not delete_missing:
+        raise RuleImportError(f"{table} has no key, so it can only be replaced")
+
+    started = time.perf_counter()
+    staging = _staging_table(spec)
+    async with engine.connect() as conn:
+        transaction = await conn.begin()
+        try:
+            await conn.run_sync(staging.create)
+            rows = await _load_staging(conn, staging, read_rows(path, spec), batch_size)
+            if spec.key:
+                await _index_staging(conn, spec, staging)
+                await _check_duplicate_keys(conn, spec, staging)
+                counts = await _apply_keyed(conn, spec, staging, delete_missing)
+            else:
+                counts = await _apply_ordered(conn, spec, staging)
+            await conn.run_sync(staging.drop)
+        except BaseException:
+            await transaction.rollback()
+            raise
+        if dry_run:
+            await transaction.rollback()
+        else:
+            await transaction.commit()
+
+    if spec.key:
+        unchanged = rows - counts["inserted"] - counts["updated"]
+    else:
+        unchanged = 0 if counts["inserted"] or counts["deleted"] else rows
+    result = {
+        "table": table,
+        "rows": rows,
+        **counts,
+        "unchanged": unchanged,
+        "dry_run": dry_run,
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+    logger.info(
+        "%s%s: %d rows read | %d inserted | %d updated | %d deleted | %d unchanged",
+        "[dry run] " if dry_run else "",
+        table,
+        rows,
+        result["inserted"],
+        result["updated"],
+        result["deleted"],
+        result["unchanged"],
+    )
+    return result
@@ -0,0 +1,300 @@
+from collections import deque
+from datetime import datetime, timezone
+from pathlib import Path
+import asyncio
+import logging
+import random
+
+from app.core import settings
+from app.services.credit.loaders import load_risk_rules_from_json
+from app.services.credit.risk import RiskRuleIndex
+from app.services.decision_cache import DecisionCache
+from app.services.decision_trace import DecisionTracer
+from app.services.zen_engine import DecisionExecutor, LoanDecisionEngine
+
+logger = logging.getLogger(__name__)
+
+# Response fields whose champion/challenger values identify a disagreement.
+# approved_amount is compared too, but only counted (its values are unbounded).
+KEYED_FIELDS = ("decision", "message", "manual_review_required", "risk_assessment")
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class DisagreementLog:
+    """
+    Aggregated champion/challenger disagreements in bounded memory.
+
+    Each distinct set of changes (e.g. decision APPROVED -> REJECTED with
+    the messages that came with it) is one counter; once max_keys distinct
+    sets are tracked, new ones are only counted as overflow. The most
+    recent max_examples disagreements are kept whole for debugging.
+    """
+
+    def __init__(self, max_keys: int, max_examples: int):
+        self.max_keys = max_keys
+        self._groups: dict = {}
+        self._examples: deque = deque(maxlen=max_examples)
+        self.overflow = 0
+
+    def record(self, zen_input: dict, champion: dict, challenger: dict) -> None:
+        key = tuple(
+            (field, champion.get(field), challenger.get(field))
+            for field in KEYED_FIELDS
+            if champion.get(field) != challenger.get(field)
+        )
+        amount_delta = challenger.get("approved_amount", 0) - champion.get(
+            "approved_amount", 0
+        )
+        if amount_delta:
+            key += (("approved_amount",),)
+
+        now = _now()
+        group = self._groups.get(key)
+        if group is None:
+            if len(self._groups) >= self.max_keys:
+                self.overflow += 1
+            else:
+                self._groups[key] = {
+                    "count": 1,
+                    "approved_amount_delta": amount_delta,
+                    "first_seen": now,
+                    "last_seen": now,
+                }
+        else:
+            group["count"] += 1
+            group["approved_amount_delta"] += amount_delta
+            group["last_seen"] = now
+
+        self._examples.append(
+            {
+                "at": now,
+                "zen_input": zen_input,
+                "champion": champion,
+                "challenger": challenger,
+            }
+        )
+
+    def clear(self) -> None:
+        self._groups.clear()
+        self._examples.clear()
+        self.overflow = 0
+
+    def __len__(self) -> int:
+        return len(self._groups)
+
+    def groups(self) -> list[dict]:
+        """
+        Disagreement groups, most frequent first.
+        """
+        groups = [
+            {
+                "changes": {
+                    change[0]: (
+                        {"champion": change[1], "challenger": change[2]}
+                        if len(change) == 3
+                        else "changed"
+                    )
+                    for change in key
+                },
+                **group,
+            }
+            for key, group in self._groups.items()
+        ]
+        return sorted(groups, key=lambda g: g["count"], reverse=True)
+
+    def examples(self) -> list[dict]:
+        return list(self._examples)
+
+
+class ShadowEvaluator:
+    """
+    Runs a challenger rule set on a sample of live traffic, after the
+    champion's response has gone out.
+
+    evaluate_loan hands over the zen input it already built; a background
+    worker re-evaluates it with the challenger decision graph (and, if
+    given, the challenger risk rules) and compares the resulting response
+    with the champion's. The queue is bounded and submissions are dropped
+    when it's full, so shadow work never slows down or backs up requests.
+    The challenger has its own executor and no result cache.
+    """
+
+    def __init__(
+        self,
+        engine: LoanDecisionEngine | None,
+        risk_index: RiskRuleIndex | None,
+        respond,
+        sample_rate: float,
+        queue_size: int,
+        max_keys: int,
+        max_examples: int,
+        risk_rules_file: str | None = None,
+    ):
+        self.engine = engine
+        self.risk_index = risk_index
+        self.respond = respond
+        self.sample_rate = sample_rate
+        self.queue_size = max(1, queue_size)
+        self.risk_rules_file = risk_rules_file
+        self.disagreements = DisagreementLog(max_keys, max_examples)
+
+        self._queue: asyncio.Queue | None = None
+        self._task: asyncio.Task | None = None
+
+        self.submitted = 0
+        self.dropped = 0
+        self.evaluated = 0
+        self.agreed = 0
+        self.disagreed = 0
+        self.errors = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.engine is not None and self.sample_rate > 0
+
+    async def start(self) -> None:
+        if not self.enabled or self._task is not None:
+            return
+        self.engine.load()
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._task = asyncio.get_running_loop().create_task(self._work())
+        self.engine.start_watching()
+        logger.info(
+            "Shadow evaluation started | challenger %s (version %s) | sample rate %s",
+            self.engine.rules_path.name,
+            self.engine.version,
+            self.sample_rate,
+        )
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        # Pending shadow work is simply dropped; it never affects responses.
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        self._queue = None
+        self.engine.stop_watching()
+        self.engine.executor.shutdown()
+
+    def submit(self, zen_input: dict, derived: dict, champion: dict) -> None:
+        """
+        Queues a champion evaluation for the challenger. Never blocks.
+        """
+        if self._queue is None or random.random() >= self.sample_rate:
+            return
+        try:
+            self._queue.put_nowait((zen_input, derived, champion))
+            self.submitted += 1
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    async def _work(self) -> None:
+        while True:
+            zen_input, derived, champion = await self._queue.get()
+            try:
+                challenger = await self._evaluate(zen_input, derived)
+            except Exception as e:
+                self.errors += 1
+                logger.error("Shadow evaluation failed: %s", e)
+                continue
+
+            self.evaluated += 1
+            if challenger == champion:
+                self.agreed += 1
+            else:
+                self.disagreed += 1
+                self.disagreements.record(zen_input, champion, challenger)
+
+    async def _evaluate(self, zen_input: dict, derived: dict) -> dict:
+        if self.risk_index is not None:
+            bureau_score = zen_input["bureau_score"]
+            stability_rule = self.risk_index.stability_rule(bureau_score)
+            zen_input = {
+                **zen_input,
+                "stability_max_dti_ratio": (
+                    stability_rule.max_dti_ratio if stability_rule else 0.5
+                ),
+            }
+            derived = {
+                **derived,
+                "risk_assessment": self.risk_index.risk_level(
+                    zen_input["state_risk"], zen_input["debt_ratio"], bureau_score
+                ),
+            }
+
+        raw_result = await self.engine.evaluate_async(zen_input)
+        return self.respond(raw_result, **derived)
+
+    def reset(self) -> None:
+        self.disagreements.clear()
+        self.submitted = self.dropped = self.evaluated = 0
+        self.agreed = self.disagreed = self.errors = 0
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "sample_rate": self.sample_rate,
+            "queue_size": self._queue.qsize() if self._queue is not None else 0,
+            "queue_max": self.queue_size,
+            "submitted": self.submitted,
+            "dropped": self.dropped,
+            "evaluated": self.evaluated,
+            "agreed": self.agreed,
+            "disagreed": self.disagreed,
+            "errors": self.errors,
+            "disagreement_ratio": (
+                self.disagreed / self.evaluated if self.evaluated else 0.0
+            ),
+            "disagreement_groups": len(self.disagreements),
+            "disagreement_overflow": self.disagreements.overflow,
+        }
+
+    def report(self) -> dict:
+        return {
+            **self.stats(),
+            "challenger": {
+                "rules_file": self.engine.rules_path.name if self.engine else None,
+                "version": self.engine.version if self.engine else None,
+                "risk_rules_file": self.risk_rules_file,
+            },
+            "disagreements": self.disagreements.groups(),
+            "examples": self.disagreements.examples(),
+        }
+
+
+def create_shadow_evaluator(champion_rules_path: str | Path, respond):
+    """
+    Builds the shadow evaluator from settings. Shadowing is off unless a
+    challenger decision graph or challenger risk rules file is configured;
+    a challenger with only risk rules runs the champion's decision graph.
+    respond shapes the challenger's response like the champion's
+    (build_response).
+    """
+    rules_file = settings.SHADOW_RULES_FILE
+    risk_rules_file = settings.SHADOW_RISK_RULES_FILE
+    engine = risk_index = None
+
+    if rules_file or risk_rules_file:
+        engine = LoanDecisionEngine(
+            rules_file or champion_rules_path,
+            executor=DecisionExecutor(settings.DECISION_EXECUTOR_MODE, 1),
+            cache=DecisionCache(0, 0),
+            tracer=DecisionTracer(0, 0),
+        )
+    if risk_rules_file:
+        risk_index = RiskRuleIndex(load_risk_rules_from_json(risk_rules_file))
+
+    return ShadowEvaluator(
+        engine,
+        risk_index,
+        respond,
+        sample_rate=settings.SHADOW_SAMPLE_RATE,
+        queue_size=settings.SHADOW_QUEUE_SIZE,
+        max_keys=settings.SHADOW_MAX_DISAGREEMENT_GROUPS,
+        max_examples=settings.SHADOW_MAX_EXAMPLES,
+        risk_rules_file=risk_rules_file or None,
+    )
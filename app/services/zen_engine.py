@@ -1,14 +1,435 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import asyncio
+import hashlib
+import logging
+import os
+import threading
+import time
 import zen
 
+from app.core import settings
+from app.services.decision_cache import DecisionCache, decision_input_fields
+from app.services.decision_compiler import UnsupportedDecision, compile_decision
+from app.services.decision_trace import DecisionTracer
 
-def gorules_loader(key: str) -> str:
-    with open(key, "r") as f:
-        return f.read()
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+TRACE_OPTIONS = {"trace": True}
+
+
+def _short_error(e: Exception) -> str:
+    # zen errors carry a full native backtrace; the first line is the useful part.
+    return str(e).splitlines()[0] if str(e) else repr(e)
+
+
+class DecisionExecutor:
+    """
+    Runs zen evaluations off the asyncio event loop.
+    At most max_concurrency evaluations run at once; further callers wait on a
+    semaphore and are reported as queued until a slot frees up.
+    """
+
+    MODES = ("thread", "async", "inline")
+
+    def __init__(self, mode: str, max_concurrency: int):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown decision executor mode: {mode!r}")
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+
+        self.mode = mode
+        self.max_concurrency = max_concurrency
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._pool = (
+            ThreadPoolExecutor(
+                max_workers=max_concurrency, thread_name_prefix="zen-eval"
+            )
+            if mode == "thread"
+            else None
+        )
+
+        self.running = 0
+        self.queued = 0
+        self.max_queued = 0
+        self.completed = 0
+        self.failed = 0
+        self.total_queue_seconds = 0.0
+
+    async def run(self, decision, input_data: dict, options: dict | None = None):
+        if self._slots.locked():
+            self.queued += 1
+            self.max_queued = max(self.max_queued, self.queued)
+            started = time.perf_counter()
+            try:
+                await self._slots.acquire()
+            finally:
+                self.queued -= 1
+                self.total_queue_seconds += time.perf_counter() - started
+        else:
+            await self._slots.acquire()
+
+        args = (input_data,) if options is None else (input_data, options)
+        self.running += 1
+        try:
+            if self.mode == "thread":
+                loop = asyncio.get_running_loop()
+                result = await loop.run_in_executor(
+                    self._pool, decision.evaluate, *args
+                )
+            elif self.mode == "async":
+                result = await decision.async_evaluate(*args)
+            else:
+                result = decision.evaluate(*args)
+        except Exception:
+            self.failed += 1
+            raise
+        else:
+            # Successful evaluations only; errors are counted in failed.
+            self.completed += 1
+            return result
+        finally:
+            self.running -= 1
+            self._slots.release()
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+
+    def stats(self) -> dict:
+        return {
+            "mode": self.mode,
+            "max_concurrency": self.max_concurrency,
+            "running": self.running,
+            "queued": self.queued,
+            "max_queued": self.max_queued,
+            "completed": self.completed,
+            "failed": self.failed,
+            "total_queue_seconds": self.total_queue_seconds,
+        }
 
 
 class LoanDecisionEngine:
-    def __init__(self):
-        self.engine = zen.ZenEngine({"loader": gorules_loader})
+    """
+    Holds one precompiled zen decision for a rules file.
+    The decision is built once with create_decision, on first use or by
+    load() during startup warm-up; a background watcher rebuilds it when the
+    file changes and swaps it in atomically, so evaluate() never touches the
+    filesystem after that.
+
+    With the "native" backend the graph is also compiled to Python closures
+    (see decision_compiler) and evaluated in-process; graphs the compiler
+    can't handle keep running on zen.
+
+    evaluate_async traces a sample of calls (see DecisionTracer). Traced
+    calls always run on zen, bypassing the cache and the native backend,
+    since only zen reports which rule each node matched.
+    """
+
+    BACKENDS = ("zen", "native")
+
+    def __init__(
+        self,
+        rules_path: str | Path,
+        watch_interval: float | None = None,
+        executor: DecisionExecutor | None = None,
+        cache: DecisionCache | None = None,
+        backend: str | None = None,
+        tracer: DecisionTracer | None = None,
+    ):
+        self.backend = backend or settings.DECISION_ENGINE_BACKEND
+        if self.backend not in self.BACKENDS:
+            raise ValueError(f"Unknown decision engine backend: {self.backend!r}")
+        self.rules_path = Path(rules_path)
+        self.watch_interval = (
+            settings.DECISION_RULES_WATCH_INTERVAL_SECONDS
+            if watch_interval is None
+            else watch_interval
+        )
+        self.engine = zen.ZenEngine()
+        self.executor = executor or DecisionExecutor(
+            settings.DECISION_EXECUTOR_MODE,
+            settings.DECISION_EXECUTOR_MAX_CONCURRENCY,
+        )
+        self.cache = (
+            cache
+            if cache is not None
+            else DecisionCache(
+                settings.DECISION_CACHE_MAX_ENTRIES,
+                settings.DECISION_CACHE_TTL_SECONDS,
+            )
+        )
+
+        self.tracer = (
+            tracer
+            if tracer is not None
+            else DecisionTracer(
+                settings.DECISION_TRACE_SAMPLE_RATE,
+                settings.DECISION_TRACE_MAX_TRACES,
+            )
+        )
+
+        # (decision, version, key_fields, native, zen_decision) is replaced as
+        # one tuple so readers always get a matching set.
+        self._current: tuple = (None, None, None, False, None)
+        self._file_signature = None
+        self._failed_signature = None
+        self._reload_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher: threading.Thread | None = None
+
+        self.previous_version: str | None = None
+        self.reloads = 0
+        self.reload_failures = 0
+        self.loaded_at = 0.0
+        self.fallback_reason: str | None = None
+
+    @property
+    def version(self) -> str | None:
+        return self._current[1]
+
+    @property
+    def loaded(self) -> bool:
+        return self._current[0] is not None
+
+    def load(self) -> None:
+        """
+        Builds the decision unless it is already loaded. Raises if the rules
+        file is missing or invalid, which makes startup warm-up fail.
+        """
+        if self._current[0] is None:
+            self.reload(force=True)
+
+    def warm_up(self, input_data: dict) -> None:
+        """
+        Loads the decision and evaluates input_data once, outside the cache
+        and the executor, so the first request doesn't pay for zen's (or the
+        compiled graph's) first-call setup.
+        """
+        self.load()
+        self._current[0].evaluate(input_data)
+
+    def _loaded(self) -> tuple:
+        if self._current[0] is None:
+            self.load()
+        return self._current
+
+    def reload(self, force: bool = False) -> bool:
+        """
+        Rebuilds the decision if the rules file changed on disk.
+        Returns True when a new version was swapped in.
+        """
+        with self._reload_lock:
+            stat = os.stat(self.rules_path)
+            signature = (stat.st_mtime_ns, stat.st_size)
+            if not force and signature in (
+                self._file_signature,
+                self._failed_signature,
+            ):
+                return False
+
+            content = self.rules_path.read_bytes()
+            version = hashlib.sha256(content).hexdigest()[:12]
+            if version == self.version:
+                # Touched but not edited
+                self._file_signature = signature
+                return False
+
+            try:
+                zen_decision = decision = self.engine.create_decision(
+                    zen.ZenDecisionContent(content.decode("utf-8"))
+                )
+                decision.validate()
+                key_fields = decision_input_fields(content)
+            except Exception:
+                # Don't retry the same broken file on every watcher tick.
+                self._failed_signature = signature
+                raise
+
+            # zen has validated the graph either way; the native backend only
+            # replaces how it is evaluated.
+            native = False
+            fallback_reason = None
+            if self.backend == "native":
+                try:
+                    decision = compile_decision(content)
+                    native = True
+                except UnsupportedDecision as e:
+                    fallback_reason = str(e)
+                    logger.warning(
+                        "%s can't be compiled, evaluating it with zen: %s",
+                        self.rules_path.name,
+                        fallback_reason,
+                    )
+
+            old_version = self.version
+            # None means the cache keys on every input field.
+            self._current = (
+                decision,
+                version,
+                tuple(sorted(key_fields)) if key_fields is not None else None,
+                native,
+                zen_decision,
+            )
+            self.fallback_reason = fallback_reason
+            self._file_signature = signature
+            self.previous_version = old_version
+            self.loaded_at = time.time()
+            if old_version is not None:
+                self.reloads += 1
+
+            logger.info(
+                "Loan decision rules loaded | %s | version: %s -> %s",
+                self.rules_path.name,
+                old_version,
+                version,
+            )
+            return True
+
+    def evaluate(self, input_data: dict, cache_scope: str | None = None) -> dict:
+        """
+        Evaluates the decision, answering repeat inputs from the result cache.
+        cache_scope (the rule snapshot version) is part of the cache key, so
+        entries stop matching once the DB rules change.
+        """
+        decision, version, key_fields, _, _ = self._loaded()
+        key = self._cache_key(input_data, version, key_fields, cache_scope)
+        cached = self._cached_result(key, input_data)
+        if cached is not None:
+            return cached
+
+        raw_result = decision.evaluate(input_data)
+        self._cache_result(key, input_data, raw_result)
+        return raw_result
+
+    async def evaluate_async(
+        self,
+        input_data: dict,
+        cache_scope: str | None = None,
+        force_trace: bool = False,
+        trace_label: str | None = None,
+    ) -> dict:
+        """
+        Same as evaluate(), but runs through the bounded executor so the
+        event loop stays free while zen works. Cache hits skip the executor,
+        and so do compiled decisions, which take microseconds.
+        force_trace traces this call regardless of the sample rate; the trace
+        is stored under trace_label.
+        """
+        decision, version, key_fields, native, zen_decision = self._loaded()
+        if self.tracer.should_trace(force_trace):
+            started = time.perf_counter()
+            raw_result = await self.executor.run(
+                zen_decision, input_data, TRACE_OPTIONS
+            )
+            self.tracer.record(
+                raw_result,
+                input_data,
+                version,
+                cache_scope,
+                time.perf_counter() - started,
+                trace_label,
+            )
+            return raw_result
+
+        key = self._cache_key(input_data, version, key_fields, cache_scope)
+        cached = self._cached_result(key, input_data)
+        if cached is not None:
+            return cached
+
+        if native:
+            raw_result = decision.evaluate(input_data)
+        else:
+            raw_result = await self.executor.run(decision, input_data)
+        self._cache_result(key, input_data, raw_result)
+        return raw_result
+
+    def _cache_key(self, input_data, version, key_fields, cache_scope):
+        if not self.cache.enabled:
+            return None
+        names = key_fields if key_fields is not None else sorted(input_data)
+        # The value's type is part of the key so True, 1 and 1.0 stay distinct.
+        values = tuple(
+            (name, value.__class__, value)
+            for name in names
+            if (value := input_data.get(name, _MISSING)) is not _MISSING
+        )
+        key = (version, cache_scope, values)
+        try:
+            hash(key)
+        except TypeError:
+            # Nested lists/dicts in the input; evaluate without caching.
+            return None
+        return key
+
+    def _cached_result(self, key, input_data: dict) -> dict | None:
+        if key is None:
+            return None
+        outputs = self.cache.get(key)
+        if outputs is None:
+            return None
+        # Same shape as a zen result (minus "performance"): the graph passes
+        # its input through, with the decision's outputs on top.
+        return {"result": {**input_data, **outputs}}
+
+    def _cache_result(self, key, input_data: dict, raw_result: dict) -> None:
+        if key is None:
+            return
+        result = raw_result.get("result", {})
+        if not isinstance(result, dict):
+            # Not the input-plus-outputs shape _cached_result rebuilds
+            # (e.g. a collect hit policy's list); leave it uncached.
+            return
+        outputs = {
+            field: value
+            for field, value in result.items()
+            if field not in input_data or input_data[field] != value
+        }
+        self.cache.put(key, outputs)
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.watch_interval):
+            try:
+                self.reload()
+            except Exception as e:
+                # Keep serving the last good decision until the file is fixed.
+                self.reload_failures += 1
+                logger.error(
+                    "Failed to reload %s, keeping version %s: %s",
+                    self.rules_path.name,
+                    self.version,
+                    _short_error(e),
+                )
+
+    def start_watching(self) -> None:
+        if self.watch_interval <= 0 or self._watcher is not None:
+            return
+        self._stop.clear()
+        self._watcher = threading.Thread(
+            target=self._watch, name="decision-rules-watcher", daemon=True
+        )
+        self._watcher.start()
+
+    def stop_watching(self) -> None:
+        if self._watcher is None:
+            return
+        self._stop.set()
+        self._watcher.join(timeout=self.watch_interval + 1)
+        self._watcher = None
 
-    def evaluate(self, rules_path: str, input_data: dict) -> dict:
-        return self.engine.evaluate(rules_path, input_data)
+    def stats(self) -> dict:
+        return {
+            "rules_file": self.rules_path.name,
+            "loaded": self.loaded,
+            "version": self.version,
+            "backend": self.backend,
+            "active_backend": "native" if self._current[3] else "zen",
+            "fallback_reason": self.fallback_reason,
+            "previous_version": self.previous_version,
+            "loaded_at": self.loaded_at,
+            "reloads": self.reloads,
+            "reload_failures": self.reload_failures,
+            "cache": self.cache.stats(),
+            "trace": self.tracer.stats(),
+        }
@@ -0,0 +1,19 @@
+"""
+Performance benchmarks, run as modules from the project root:
+
+    python -m benchmarks.run --output bench.json --baseline benchmarks/baseline.json
+    python -m benchmarks.risk_rules
+
+The benchmark DB URL (and the settings below, which are read once at import)
+are set here, before any benchmark module imports the app.
+"""
+
+import os
+import tempfile
+
+BENCHMARK_DB_PATH = os.path.join(tempfile.gettempdir(), "loan_engine_benchmark.db")
+
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{BENCHMARK_DB_PATH}")
+# Every input is evaluated once per round; a warm decision cache would turn
+# later rounds into cache hits and hide regressions in zen evaluation.
+os.environ.setdefault("DECISION_CACHE_MAX_ENTRIES", "0")
@@ -0,0 +1,227 @@
+"""
+Decision audit write throughput: one INSERT and commit per decision against
+the buffered DecisionAuditWriter at several batch sizes.
+
+    python -m benchmarks.audit
+    python -m benchmarks.audit --rows 50000 --batch-sizes 100 1000 --producers 16
+
+Audit rows come from real evaluations of generated applications. In the
+batched runs, `producers` tasks record rows concurrently (as requests
+would) while the flusher writes them; throughput counts until stop() has
+drained the buffer, and the wait is what a request spends in record() (in
+the per-row run, its INSERT and commit).
+Every run checks the table ends up with exactly the rows recorded.
+
+With --min-rows-per-sec, exits non-zero when a batched run writes slower.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+
+from benchmarks import BENCHMARK_DB_PATH
+from benchmarks.db import seed_database
+from benchmarks.generators import generate_applications
+from benchmarks.run import _percentile
+
+# Distinct evaluations behind the audit rows; they are cycled to fill a run.
+DISTINCT_ROWS = 1000
+
+
+async def build_rows(n: int, seed: int) -> list[dict]:
+    from app.core.database import new_session
+    from app.services.credit.loan_evaluator import (
+        build_response,
+        get_decision_engine,
+        prepare_evaluation,
+    )
+    from app.services.credit.scoring import credit_scorer_cache
+    from app.services.credit.snapshot import rule_snapshot_cache
+    from app.services.decision_audit import audit_row
+
+    async with new_session() as session:
+        snapshot = await rule_snapshot_cache.get(session)
+    scorer = credit_scorer_cache.get()
+    decision_engine = get_decision_engine()
+    distinct = []
+    for request in generate_applications(min(n, DISTINCT_ROWS), seed=seed):
+        zen_input, derived = prepare_evaluation(request, snapshot, scorer)
+        response = build_response(decision_engine.evaluate(zen_input), **derived)
+        distinct.append(
+            audit_row(
+                request,
+                zen_input,
+                derived,
+                response,
+                snapshot.version,
+                scorer.version,
+                decision_engine.version,
+            )
+        )
+    return [distinct[i % len(distinct)] for i in range(n)]
+
+
+async def _reset_table() -> None:
+    from app.core.database import get_engine
+    from app.models.decision_audit import DecisionAudit
+
+    async with get_engine().begin() as conn:
+        await conn.execute(DecisionAudit.__table__.delete())
+
+
+async def _count_rows() -> int:
+    from sqlalchemy import func, select
+
+    from app.core.database import get_engine
+    from app.models.decision_audit import DecisionAudit
+
+    async with get_engine().connect() as conn:
+        return (
+            await conn.execute(select(func.count()).select_from(DecisionAudit))
+        ).scalar_one()
+
+
+async def run_per_row(rows: list[dict]) -> dict:
+    from app.core.database import get_engine
+    from app.models.decision_audit import DecisionAudit
+
+    await _reset_table()
+    engine = get_engine()
+    insert = DecisionAudit.__table__.insert()
+    latencies = []
+    started = time.perf_counter()
+    for row in rows:
+        call_started = time.perf_counter()
+        async with engine.begin() as conn:
+            await conn.execute(insert, row)
+        latencies.append(time.perf_counter() - call_started)
+    elapsed = time.perf_counter() - started
+    return _result(len(rows), elapsed, latencies, await _count_rows())
+
+
+async def run_batched(rows: list[dict], batch_size: int, producers: int) -> dict:
+    from app.core.database import get_engine
+    from app.services.decision_audit import DecisionAuditWriter
+
+    await _reset_table()
+    writer = DecisionAuditWriter(
+        get_engine,
+        mode="batched",
+        batch_size=batch_size,
+        flush_interval=0.05,
+        max_buffer=batch_size * 4,
+        # Producers only ever wait here; nothing should be shed.
+        enqueue_timeout=60.0,
+    )
+    latencies = []
+
+    async def produce(share):
+        for row in share:
+            call_started = time.perf_counter()
+            await writer.record([row])
+            latencies.append(time.perf_counter() - call_started)
+            # A request yields to the loop between decisions.
+            await asyncio.sleep(0)
+
+    await writer.start()
+    started = time.perf_counter()
+    await asyncio.gather(*(produce(rows[p::producers]) for p in range(producers)))
+    await writer.stop()
+    elapsed = time.perf_counter() - started
+
+    result = _result(len(rows), elapsed, latencies, await _count_rows())
+    stats = writer.stats()
+    result.update(
+        batches=stats["batches"],
+        backpressure_waits=stats["backpressure_waits"],
+        flush_ms=stats["total_flush_seconds"] / max(1, stats["batches"]) * 1000,
+    )
+    return result
+
+
+def _result(rows: int, elapsed: float, latencies: list[float], written: int) -> dict:
+    latencies.sort()
+    if written != rows:
+        raise RuntimeError(f"{written} audit rows written, {rows} recorded")
+    return {
+        "rows": rows,
+        "rows_per_sec": rows / elapsed if elapsed else 0.0,
+        "p50_us": _percentile(latencies, 0.50) * 1e6,
+        "p99_us": _percentile(latencies, 0.99) * 1e6,
+        "max_us": latencies[-1] * 1e6 if latencies else 0.0,
+    }
+
+
+async def run(args) -> dict:
+    from app.core.database import dispose_engine
+
+    try:
+        rows = await build_rows(args.rows, args.seed)
+        # Per-row commits are slow; a slice is enough for a rate.
+        results = {"per_row": await run_per_row(rows[: args.per_row_rows])}
+        print_result("per_row", results["per_row"])
+        for batch_size in args.batch_sizes:
+            name = f"batched/{batch_size}"
+            results[name] = await run_batched(rows, batch_size, args.producers)
+            print_result(name, results[name])
+        return results
+    finally:
+        await dispose_engine()
+
+
+def print_result(name: str, result: dict) -> None:
+    extra = ""
+    if "batches" in result:
+        extra = (
+            f" | {result['batches']} batches, {result['flush_ms']:.1f} ms each"
+            f" | {result['backpressure_waits']} backpressure waits"
+        )
+    print(
+        f"{name:<16} {result['rows']:>7} rows {result['rows_per_sec']:>10.0f} rows/s"
+        f" | wait p50 {result['p50_us']:.0f} us p99 {result['p99_us']:.0f} us" + extra
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--per-row-rows", type=int, default=1000)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[50, 500, 2000])
+    parser.add_argument("--producers", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Also write the results JSON here")
+    parser.add_argument("--min-rows-per-sec", type=float)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+    seed_database(os.environ["DATABASE_URL"])
+    try:
+        results = asyncio.run(run(args))
+    finally:
+        if os.environ["DATABASE_URL"].endswith(BENCHMARK_DB_PATH) and os.path.exists(
+            BENCHMARK_DB_PATH
+        ):
+            os.remove(BENCHMARK_DB_PATH)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(json.dumps(results, indent=2) + "\n")
+
+    if args.min_rows_per_sec is not None:
+        slow = [
+            f"{name} {result['rows_per_sec']:.0f} rows/s"
+            for name, result in results.items()
+            if name.startswith("batched/")
+            and result["rows_per_sec"] < args.min_rows_per_sec
+        ]
+        if slow:
+            print(f"Below {args.min_rows_per_sec:.0f} rows/s: " + "; ".join(slow))
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Compares two benchmark result files and fails on regressions.
+
+    python -m benchmarks.compare benchmarks/baseline.json bench.json
+
+A benchmark regresses when its throughput falls by more than the throughput
+tolerance, or its p99 latency rises by more than the latency tolerance
+(p99 is noisier, so its default tolerance is wider).
+"""
+
+import argparse
+import json
+import sys
+
+
+def compare(
+    baseline: dict,
+    current: dict,
+    throughput_tolerance: float = 0.20,
+    latency_tolerance: float = 0.50,
+) -> list[dict]:
+    rows = []
+    for name in sorted(baseline.keys() | current.keys()):
+        before, after = baseline.get(name), current.get(name)
+        if before is None or after is None:
+            rows.append(
+                {"name": name, "status": "new" if before is None else "missing"}
+            )
+            continue
+
+        throughput_change = (
+            after["ops_per_sec"] / before["ops_per_sec"] - 1
+            if before["ops_per_sec"]
+            else 0.0
+        )
+        p99_change = after["p99_us"] / before["p99_us"] - 1 if before["p99_us"] else 0.0
+        regressed = (
+            throughput_change < -throughput_tolerance or p99_change > latency_tolerance
+        )
+        rows.append(
+            {
+                "name": name,
+                "status": "REGRESSION" if regressed else "ok",
+                "ops_per_sec": after["ops_per_sec"],
+                "throughput_change": throughput_change,
+                "p99_us": after["p99_us"],
+                "p99_change": p99_change,
+            }
+        )
+    return rows
+
+
+def print_comparison(rows: list[dict]) -> bool:
+    """
+    Prints the comparison table; returns True if anything regressed.
+    """
+    print(
+        f"{'benchmark':<32} {'ops/s':>12} {'change':>8} {'p99 us':>10} {'change':>8}  status",
+        file=sys.stderr,
+    )
+    for row in rows:
+        if "ops_per_sec" not in row:
+            print(f"{row['name']:<32} {'':>42}  {row['status']}", file=sys.stderr)
+            continue
+        print(
+            f"{row['name']:<32} {row['ops_per_sec']:>12.0f} {row['throughput_change']:>+8.1%}"
+            f" {row['p99_us']:>10.1f} {row['p99_change']:>+8.1%}  {row['status']}",
+            file=sys.stderr,
+        )
+    return any(row["status"] == "REGRESSION" for row in rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--throughput-tolerance", type=float, default=0.20)
+    parser.add_argument("--latency-tolerance", type=float, default=0.50)
+    args = parser.parse_args(argv)
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)["results"]
+    with open(args.current) as f:
+        current = json.load(f)["results"]
+
+    rows = compare(baseline, current, args.throughput_tolerance, args.latency_tolerance)
+    sys.exit(1 if print_comparison(rows) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Benchmark database: the ORM schema plus the seed data of migration
+e2bad41618ea, loaded into a fresh SQLite file.
+"""
+
+from pathlib import Path
+import importlib.util
+import os
+
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+
+SEED_MIGRATION = (
+    Path(__file__).resolve().parent.parent
+    / "alembic"
+    / "versions"
+    / "e2bad41618ea_seed_rule_data.py"
+)
+
+
+def _load_seed_migration():
+    spec = importlib.util.spec_from_file_location("seed_rule_data", SEED_MIGRATION)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def seed_database(database_url: str) -> None:
+    """
+    Recreates the benchmark database and runs the seed migration's upgrade()
+    against it, so the rule data is exactly what production is seeded with.
+    Only SQLite URLs are recreated; any other database must already have the
+    schema (alembic upgrade head) and is seeded in place.
+    """
+    from app.core.database import Base
+
+    # Registers every table on Base.metadata
+    import app.models.city_rules  # noqa: F401
+    import app.models.decision_audit  # noqa: F401
+    import app.models.post_approval_outbox  # noqa: F401
+    import app.models.risk_level  # noqa: F401
+    import app.models.state_risk  # noqa: F401
+    import app.models.unserviceable_pin  # noqa: F401
+
+    url = make_url(database_url)
+    sync_url = url.set(drivername=url.get_backend_name())
+    if url.get_backend_name() == "sqlite" and url.database:
+        if os.path.exists(url.database):
+            os.remove(url.database)
+
+    engine = create_engine(sync_url)
+    try:
+        if url.get_backend_name() == "sqlite":
+            Base.metadata.create_all(engine)
+        seed = _load_seed_migration()
+        with engine.begin() as connection:
+            with Operations.context(MigrationContext.configure(connection)):
+                seed.upgrade()
+    finally:
+        engine.dispose()
@@ -0,0 +1,209 @@
+"""
+Decision backends: zen vs the native compiler, on randomized inputs.
+
+Builds zen inputs with prepare_evaluation from generated applications and the
+rule tables as seeded by migration e2bad41618ea (loaded into a throwaway
+database), then mixes in boundary values from those same tables: incomes at
+each tier's min_income, loans at max_eligible, debt ratios at each stability
+max_dti_ratio, bureau scores at each min_credit_score, Rural tiers. Each
+input is evaluated through zen's sync API (what the "thread" and "inline"
+executor modes call), zen's async API and the compiled decision.
+
+Native must match the async API exactly. Against the sync API, which rounds
+numbers it passes through (loan_requested, debt_ratio, ...) to about 15
+significant digits, every non-numeric field (decision, reason, manual review)
+must match exactly and numbers must agree to that rounding; the report counts
+how many results differ only in those last digits. Then times both.
+
+    python -m benchmarks.decision_parity
+    python -m benchmarks.decision_parity --samples 100000 --rules path/to/graph.json
+"""
+
+import argparse
+import asyncio
+import math
+import os
+import random
+import sys
+import time
+
+import zen
+
+from benchmarks import BENCHMARK_DB_PATH
+from benchmarks.db import seed_database
+from benchmarks.generators import generate_applications
+from app.services.credit.loan_evaluator import RULES_FILE, prepare_evaluation
+from app.services.decision_compiler import compile_decision
+
+# Relative difference allowed against zen's sync API, which rounds numbers
+SYNC_REL_TOL = 1e-14
+
+
+async def load_seeded_rules():
+    """
+    The rule snapshot and credit scorer production evaluates with, from a
+    freshly seeded database.
+    """
+    from app.core.database import dispose_engine, new_session
+    from app.services.credit.scoring import credit_scorer_cache
+    from app.services.credit.snapshot import rule_snapshot_cache
+
+    try:
+        async with new_session() as session:
+            snapshot = await rule_snapshot_cache.get(session)
+    finally:
+        await dispose_engine()
+    return snapshot, credit_scorer_cache.get()
+
+
+def generate_inputs(snapshot, scorer, n: int, seed: int) -> list[dict]:
+    rng = random.Random(seed)
+    city_rules = snapshot.city_rules
+    state_risks = sorted(set(snapshot.state_risk.values()) | {"HIGH"})
+    max_dtis = sorted({r.max_dti_ratio for r in snapshot.risk_rules} | {0.5})
+    min_scores = sorted({r.min_credit_score for r in snapshot.risk_rules})
+
+    inputs = []
+    for request in generate_applications(n, seed=seed):
+        data, _ = prepare_evaluation(request, snapshot, scorer)
+
+        # Boundaries from the seeded tables, where a wrong operator or type
+        # rule would show up. First another tier (Rural among them) and its rule.
+        if rng.random() < 0.3:
+            tier = rng.choice(sorted(city_rules))
+            city_rule = city_rules[tier]
+            data["city_tier"] = tier
+            data["city_rule_min_income"] = city_rule["min_income"]
+            data["city_rule_multiplier"] = city_rule["multiplier"]
+            data["city_rule_rate"] = city_rule["rate"]
+            data["max_eligible"] = data["monthly_income"] * city_rule["multiplier"]
+        if rng.random() < 0.2:
+            data["monthly_income"] = data["city_rule_min_income"] + rng.choice(
+                (-1, 0, 0, 1)
+            )
+        if rng.random() < 0.2:
+            data["loan_requested"] = data["max_eligible"]
+        if rng.random() < 0.2:
+            data["stability_max_dti_ratio"] = rng.choice(max_dtis)
+        if rng.random() < 0.2:
+            data["debt_ratio"] = data["stability_max_dti_ratio"]
+        if rng.random() < 0.2:
+            data["bureau_score"] = rng.choice(min_scores) + rng.choice((-1, 0, 1))
+        if rng.random() < 0.2:
+            data["state_risk"] = rng.choice(state_risks)
+        if rng.random() < 0.1:
+            data["pin_serviceable"] = not data["pin_serviceable"]
+        if rng.random() < 0.3:
+            data["employment_duration_months"] = rng.choice((11, 12, 13))
+        if rng.random() < 0.3:
+            data["address_duration_months"] = rng.choice((5, 6, 7))
+        if rng.random() < 0.05:
+            data["monthly_income"] = 0.0
+        inputs.append(data)
+    return inputs
+
+
+async def async_results(decision, inputs) -> list[dict]:
+    return [(await decision.async_evaluate(data))["result"] for data in inputs]
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _field_matches(zen_value, native_value, rounded: bool) -> bool:
+    if rounded and _is_number(zen_value) and _is_number(native_value):
+        return math.isclose(zen_value, native_value, rel_tol=SYNC_REL_TOL)
+    return zen_value == native_value
+
+
+def check_parity(zen_decision, native, inputs) -> tuple[int, int]:
+    """
+    Returns (mismatches, results differing from the sync API only in rounding).
+    """
+    expected_async = asyncio.run(async_results(zen_decision, inputs))
+    mismatches = rounding_only = 0
+    for data, async_result in zip(inputs, expected_async):
+        sync_result = zen_decision.evaluate(data)["result"]
+        native_result = native.evaluate(data)["result"]
+        failed = []
+        for api, zen_result, rounded in (
+            ("async", async_result, False),
+            ("sync", sync_result, True),
+        ):
+            for field in sorted(zen_result.keys() | native_result.keys()):
+                if not _field_matches(
+                    zen_result.get(field), native_result.get(field), rounded
+                ):
+                    failed.append((api, field, zen_result.get(field)))
+        if failed:
+            mismatches += 1
+            if mismatches <= 5:
+                print(f"MISMATCH for {data}", file=sys.stderr)
+                for api, field, zen_value in failed:
+                    print(
+                        f"  {field}: zen {api}={zen_value!r} "
+                        f"native={native_result.get(field)!r}",
+                        file=sys.stderr,
+                    )
+        elif sync_result != native_result:
+            rounding_only += 1
+    return mismatches, rounding_only
+
+
+def time_per_call(fn, inputs, min_seconds: float = 0.3) -> float:
+    """
+    Microseconds per call, repeating the input set until min_seconds have passed.
+    """
+    calls = 0
+    started = time.perf_counter()
+    while True:
+        for data in inputs:
+            fn(data)
+        calls += len(inputs)
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_seconds:
+            return elapsed / calls * 1e6
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--samples", type=int, default=20_000)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--rules", default=str(RULES_FILE))
+    args = parser.parse_args(argv)
+
+    with open(args.rules, "rb") as f:
+        content = f.read()
+    zen_decision = zen.ZenEngine().create_decision(
+        zen.ZenDecisionContent(content.decode("utf-8"))
+    )
+    native = compile_decision(content)
+
+    seed_database(os.environ["DATABASE_URL"])
+    try:
+        snapshot, scorer = asyncio.run(load_seeded_rules())
+    finally:
+        if os.environ["DATABASE_URL"].endswith(BENCHMARK_DB_PATH) and os.path.exists(
+            BENCHMARK_DB_PATH
+        ):
+            os.remove(BENCHMARK_DB_PATH)
+
+    inputs = generate_inputs(snapshot, scorer, args.samples, args.seed)
+    mismatches, rounding_only = check_parity(zen_decision, native, inputs)
+    print(
+        f"{args.samples} inputs, {mismatches} mismatches "
+        f"({rounding_only} differ from zen's sync API only in rounded digits)"
+    )
+
+    timed = inputs[:2000]
+    zen_us = time_per_call(zen_decision.evaluate, timed)
+    native_us = time_per_call(native.evaluate, timed)
+    print(f"zen {zen_us:.2f} us  native {native_us:.2f} us  {zen_us / native_us:.1f}x")
+
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""
+/loan/evaluate request/response encoding: FastAPI's default path vs the fast path.
+
+Default: json.loads + LoanRequest validation, model_dump for the zen input,
+then LoanResponse validation and stdlib JSON encoding of the response.
+Fast: model_validate_json straight from bytes, the validated field dict for
+the zen input, and orjson encoding of the response dict.
+
+Checks that both paths produce the same request, zen input and response
+JSON, then reports microseconds and peak bytes allocated per request.
+
+    python -m benchmarks.encoding
+    python -m benchmarks.encoding --requests 5000
+"""
+
+import argparse
+import json
+import random
+import time
+import tracemalloc
+
+import orjson
+
+from app.schemas.loan import LoanRequest, LoanResponse
+from app.services.credit.loan_evaluator import build_response, build_zen_input
+from benchmarks.generators import generate_applicant
+
+CITY_RULE = {"min_income": 15000, "multiplier": 10, "rate": "11%"}
+# The zen input arguments other than the request; constant so only encoding is timed.
+ZEN_ARGS = (CITY_RULE, "LOW", 0.25, 250000.0, 720, True, 0.5)
+
+
+def default_decode(body: bytes) -> LoanRequest:
+    return LoanRequest.model_validate(json.loads(body))
+
+
+def default_zen_input(request: LoanRequest) -> dict:
+    city_rule, state_risk, debt_ratio, max_eligible, bureau_score, pin, dti = ZEN_ARGS
+    return {
+        **request.model_dump(),
+        "city_rule_min_income": city_rule["min_income"],
+        "city_rule_multiplier": city_rule["multiplier"],
+        "city_rule_rate": city_rule["rate"],
+        "debt_ratio": debt_ratio,
+        "max_eligible": max_eligible,
+        "bureau_score": bureau_score,
+        "state_risk": state_risk,
+        "pin_serviceable": pin,
+        "stability_max_dti_ratio": dti,
+    }
+
+
+def default_encode(response: dict) -> bytes:
+    # What FastAPI does with a dict returned under response_model, then
+    # Starlette's JSONResponse.render.
+    content = LoanResponse.model_validate(response).model_dump(mode="json")
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def fast_decode(body: bytes) -> LoanRequest:
+    return LoanRequest.model_validate_json(body)
+
+
+def fast_zen_input(request: LoanRequest) -> dict:
+    return build_zen_input(request, *ZEN_ARGS)
+
+
+def fast_encode(response: dict) -> bytes:
+    return orjson.dumps(
+        response, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+    )
+
+
+def make_response(zen_input: dict, i: int) -> dict:
+    approved = i % 3 == 0
+    raw_result = {
+        "result": {
+            **zen_input,
+            "approved": approved,
+            "approved_amount": zen_input["loan_requested"] if approved else 0,
+            "decision_label": "APPROVED" if approved else "REJECTED",
+            "manual_review": i % 7 == 0,
+            "reason": "Meets all criteria" if approved else "Debt ratio too high",
+        }
+    }
+    return build_response(raw_result, "Metro", CITY_RULE, 720, 250000.0, "LOW")
+
+
+def pipeline(decode, zen_input, encode):
+    def handle(body: bytes, i: int) -> bytes:
+        request = decode(body)
+        return encode(make_response(zen_input(request), i))
+
+    return handle
+
+
+def check_parity(bodies) -> None:
+    for i, body in enumerate(bodies):
+        default_request, fast_request = default_decode(body), fast_decode(body)
+        if default_request != fast_request:
+            raise AssertionError(f"request {i} decodes differently")
+        if default_zen_input(default_request) != fast_zen_input(fast_request):
+            raise AssertionError(f"request {i} builds a different zen input")
+        response = make_response(fast_zen_input(fast_request), i)
+        if orjson.loads(fast_encode(response)) != json.loads(default_encode(response)):
+            raise AssertionError(f"request {i} encodes differently")
+
+
+def time_per_call(fn, args_list, min_seconds: float = 0.3) -> float:
+    """
+    Microseconds per call, repeating the argument set until min_seconds have passed.
+    """
+    calls = 0
+    started = time.perf_counter()
+    while True:
+        for args in args_list:
+            fn(*args)
+        calls += len(args_list)
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_seconds:
+            return elapsed / calls * 1e6
+
+
+def peak_bytes_per_call(fn, args_list) -> float:
+    """
+    Mean peak of traced allocations during one call, in bytes.
+    """
+    total = 0
+    tracemalloc.start()
+    try:
+        for args in args_list:
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            fn(*args)
+            _, peak = tracemalloc.get_traced_memory()
+            total += peak - before
+    finally:
+        tracemalloc.stop()
+    return total / len(args_list)
+
+
+def run(n_requests: int, seed: int) -> list[dict]:
+    rng = random.Random(seed)
+    bodies = [json.dumps(generate_applicant(rng)).encode() for _ in range(n_requests)]
+    check_parity(bodies)
+
+    requests = [(fast_decode(body),) for body in bodies]
+    responses = [
+        (make_response(fast_zen_input(request), i),)
+        for i, (request,) in enumerate(requests)
+    ]
+    stages = [
+        ("decode", default_decode, fast_decode, [(body,) for body in bodies]),
+        ("zen_input", default_zen_input, fast_zen_input, requests),
+        ("encode", default_encode, fast_encode, responses),
+        (
+            "request",
+            pipeline(default_decode, default_zen_input, default_encode),
+            pipeline(fast_decode, fast_zen_input, fast_encode),
+            [(body, i) for i, body in enumerate(bodies)],
+        ),
+    ]
+    return [
+        {
+            "stage": stage,
+            "default_us": time_per_call(default, args_list),
+            "fast_us": time_per_call(fast, args_list),
+            "default_bytes": peak_bytes_per_call(default, args_list),
+            "fast_bytes": peak_bytes_per_call(fast, args_list),
+        }
+        for stage, default, fast, args_list in stages
+    ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    print(
+        f"{'stage':>10} {'default us':>11} {'fast us':>8} {'speedup':>8} "
+        f"{'default B':>10} {'fast B':>8}"
+    )
+    for r in run(args.requests, args.seed):
+        print(
+            f"{r['stage']:>10} {r['default_us']:>11.2f} {r['fast_us']:>8.2f} "
+            f"{r['default_us'] / r['fast_us']:>7.1f}x "
+            f"{r['default_bytes']:>10.0f} {r['fast_bytes']:>8.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Synthetic applicant generators. A given seed always yields the same applicants.
+"""
+
+import random
+
+from app.schemas.loan import LoanRequest
+
+# States from the seed data, plus one that isn't configured (falls back to HIGH)
+STATES = (
+    "Maharashtra",
+    "Karnataka",
+    "Tamil Nadu",
+    "Kerala",
+    "West Bengal",
+    "Rajasthan",
+    "Bihar",
+    "Uttar Pradesh",
+    "Odisha",
+    "Goa",
+    "Atlantis",
+)
+CITY_TIERS = ("Metro", "Metro", "Tier1", "Tier1", "Tier2", "Rural", "Village")
+# Mostly serviceable pins, with the seeded unserviceable ones mixed in
+PIN_CODES = ("400001", "560001", "600001", "700001", "302001", "123456", "110099")
+
+
+def generate_applicant(rng: random.Random) -> dict:
+    monthly_income = round(rng.lognormvariate(10.3, 0.6), 2)
+    return {
+        "age": rng.randint(18, 70),
+        "monthly_income": monthly_income,
+        "employment_duration_months": rng.randint(0, 240),
+        "existing_debt": round(monthly_income * rng.betavariate(2, 5), 2),
+        "loan_requested": round(monthly_income * rng.uniform(1, 12), -3),
+        "state": rng.choice(STATES),
+        "city_tier": rng.choice(CITY_TIERS),
+        "pin_code": rng.choice(PIN_CODES),
+        "disaster_affected_area": rng.random() < 0.05,
+        "address_duration_months": rng.randint(0, 120),
+        "work_location_matches_residence": rng.random() < 0.85,
+    }
+
+
+def generate_applications(n: int, seed: int = 0) -> list[LoanRequest]:
+    rng = random.Random(seed)
+    return [LoanRequest(**generate_applicant(rng)) for _ in range(n)]
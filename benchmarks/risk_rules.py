@@ -0,0 +1,142 @@
+"""
+Risk-rule lookup: linear scan vs RiskRuleIndex.
+
+Generates synthetic risk_level_rules tables of 10, 100 and 10,000 rows
+(segmented by state risk and score band), checks that the index returns the
+same rule as the scan for every query, then times both.
+
+    python -m benchmarks.risk_rules
+    python -m benchmarks.risk_rules --sizes 10 100 10000 --queries 20000
+"""
+
+from types import SimpleNamespace
+import argparse
+import random
+import time
+
+from app.services.credit.risk import RiskRuleIndex, get_risk_level
+
+STATE_RISKS = ("HIGH", "MEDIUM", "LOW")
+RISK_LEVELS = ("HIGH", "MEDIUM", "LOW")
+
+
+def generate_rules(n: int, rng: random.Random) -> list:
+    # Plain objects with the RiskLevelRule attributes; no DB needed.
+    return [
+        SimpleNamespace(
+            risk_level=rng.choice(RISK_LEVELS),
+            state_risk=rng.choice(STATE_RISKS),
+            min_credit_score=rng.randrange(300, 900, 10),
+            max_dti_ratio=round(rng.uniform(0.05, 1.0), 2),
+        )
+        for _ in range(n)
+    ]
+
+
+def generate_queries(n: int, rng: random.Random) -> list:
+    return [
+        (
+            rng.choice(STATE_RISKS + ("UNKNOWN",)),
+            rng.uniform(0.0, 1.2),
+            rng.randrange(250, 950),
+        )
+        for _ in range(n)
+    ]
+
+
+def linear_stability_rule(risk_rules, bureau_score):
+    return next(
+        (
+            r
+            for r in risk_rules
+            if r.min_credit_score <= bureau_score and r.max_dti_ratio is not None
+        ),
+        None,
+    )
+
+
+def check_parity(rules, index: RiskRuleIndex, queries) -> None:
+    for state_risk, debt_ratio, bureau_score in queries:
+        expected = get_risk_level(state_risk, debt_ratio, bureau_score, rules)
+        actual = index.risk_level(state_risk, debt_ratio, bureau_score)
+        if actual != expected:
+            raise AssertionError(
+                f"risk_level mismatch for {(state_risk, debt_ratio, bureau_score)}: "
+                f"{actual} != {expected}"
+            )
+        if index.stability_rule(bureau_score) is not linear_stability_rule(
+            rules, bureau_score
+        ):
+            raise AssertionError(f"stability rule mismatch for score {bureau_score}")
+
+
+def time_per_call(fn, queries, min_seconds: float = 0.2) -> float:
+    """
+    Microseconds per call, repeating the query set until min_seconds have passed.
+    """
+    calls = 0
+    started = time.perf_counter()
+    while True:
+        for query in queries:
+            fn(*query)
+        calls += len(queries)
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_seconds:
+            return elapsed / calls * 1e6
+
+
+def run(sizes, n_queries: int, seed: int) -> list[dict]:
+    rng = random.Random(seed)
+    results = []
+    for size in sizes:
+        rules = generate_rules(size, rng)
+        queries = generate_queries(n_queries, rng)
+
+        started = time.perf_counter()
+        index = RiskRuleIndex(rules)
+        build_ms = (time.perf_counter() - started) * 1000
+
+        check_parity(rules, index, queries)
+
+        # The scan is slow at 10k rules; time it on a slice of the queries.
+        scan_queries = queries[: max(100, n_queries * 10 // max(size, 10))]
+        results.append(
+            {
+                "rules": size,
+                "build_ms": build_ms,
+                "scan_us": time_per_call(
+                    lambda s, d, b: get_risk_level(s, d, b, rules), scan_queries
+                ),
+                "index_us": time_per_call(index.risk_level, queries),
+                "stability_scan_us": time_per_call(
+                    lambda s, d, b: linear_stability_rule(rules, b), scan_queries
+                ),
+                "stability_index_us": time_per_call(
+                    lambda s, d, b: index.stability_rule(b), queries
+                ),
+            }
+        )
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 10_000])
+    parser.add_argument("--queries", type=int, default=20_000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    print(
+        f"{'rules':>7} {'build ms':>9} {'scan us':>9} {'index us':>9} "
+        f"{'speedup':>8} {'stab scan':>10} {'stab index':>11}"
+    )
+    for r in run(args.sizes, args.queries, args.seed):
+        print(
+            f"{r['rules']:>7} {r['build_ms']:>9.2f} {r['scan_us']:>9.2f} "
+            f"{r['index_us']:>9.2f} {r['scan_us'] / r['index_us']:>7.1f}x "
+            f"{r['stability_scan_us']:>10.2f} {r['stability_index_us']:>11.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
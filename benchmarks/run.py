@@ -0,0 +1,293 @@
+"""
+Benchmarks the evaluation pipeline stage by stage against a freshly seeded DB.
+
+    python -m benchmarks.run --sizes 100 1000 10000 --output bench.json
+    python -m benchmarks.run --output bench.json --baseline benchmarks/baseline.json
+
+Each benchmark runs every generated application once per round; latencies
+are per call. With --baseline, exits non-zero on a throughput or p99
+regression beyond the tolerances (see benchmarks.compare).
+"""
+
+from datetime import datetime, timezone
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks import BENCHMARK_DB_PATH
+from benchmarks.compare import compare, print_comparison
+from benchmarks.db import seed_database
+from benchmarks.generators import generate_applications
+
+
+def _percentile(sorted_values, q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summarize(rounds: list[tuple[float, list[float]]]) -> dict:
+    """
+    rounds: (wall seconds, per-call latencies) per round. Throughput is the
+    median across rounds; percentiles are over every call of every round.
+    """
+    latencies = sorted(
+        latency for _, round_latencies in rounds for latency in round_latencies
+    )
+    throughputs = [len(calls) / wall for wall, calls in rounds if wall > 0]
+    return {
+        "calls": len(latencies),
+        "ops_per_sec": statistics.median(throughputs) if throughputs else 0.0,
+        "mean_us": statistics.fmean(latencies) * 1e6 if latencies else 0.0,
+        "p50_us": _percentile(latencies, 0.50) * 1e6,
+        "p95_us": _percentile(latencies, 0.95) * 1e6,
+        "p99_us": _percentile(latencies, 0.99) * 1e6,
+        "max_us": latencies[-1] * 1e6 if latencies else 0.0,
+    }
+
+
+def _timed(fn, args_list) -> tuple[float, list[float]]:
+    perf_counter = time.perf_counter
+    latencies = []
+    started = perf_counter()
+    for args in args_list:
+        call_started = perf_counter()
+        fn(*args)
+        latencies.append(perf_counter() - call_started)
+    return perf_counter() - started, latencies
+
+
+async def _timed_async(fn, args_list) -> tuple[float, list[float]]:
+    perf_counter = time.perf_counter
+    latencies = []
+    started = perf_counter()
+    for args in args_list:
+        call_started = perf_counter()
+        await fn(*args)
+        latencies.append(perf_counter() - call_started)
+    return perf_counter() - started, latencies
+
+
+class PipelineBenchmarks:
+    """
+    One method per benchmark; each returns (wall seconds, latencies) for a round.
+    Everything a benchmark doesn't measure is prepared in setup().
+    """
+
+    NAMES = (
+        "credit_score",
+        "credit_score_compiled",
+        "risk_level",
+        "risk_level_indexed",
+        "load_rules",
+        "decision_evaluate",
+        "evaluate_loan",
+    )
+
+    async def setup(self, applications):
+        from app.core.database import new_session
+        from app.services.credit.loan_evaluator import prepare_evaluation
+        from app.services.credit.loaders import load_bureau_config_from_json
+        from app.services.credit.scoring import credit_scorer_cache
+        from app.services.credit.snapshot import rule_snapshot_cache
+
+        self.applications = applications
+        self.session = new_session()
+        self.snapshot = await rule_snapshot_cache.get(self.session)
+        self.bureau_cfg = load_bureau_config_from_json()
+        self.scorer = credit_scorer_cache.get()
+
+        self.zen_inputs, self.derived = [], []
+        for request in applications:
+            zen_input, derived = prepare_evaluation(request, self.snapshot, self.scorer)
+            self.zen_inputs.append(zen_input)
+            self.derived.append(derived)
+
+    async def teardown(self):
+        await self.session.close()
+
+    def credit_score(self):
+        from app.services.credit.scoring import calculate_credit_score
+
+        cfg = self.bureau_cfg
+        return _timed(
+            calculate_credit_score,
+            [
+                (request, zen_input["debt_ratio"], cfg)
+                for request, zen_input in zip(self.applications, self.zen_inputs)
+            ],
+        )
+
+    def credit_score_compiled(self):
+        return _timed(
+            self.scorer.score,
+            [
+                (
+                    zen_input["debt_ratio"],
+                    request.employment_duration_months,
+                    request.age,
+                )
+                for request, zen_input in zip(self.applications, self.zen_inputs)
+            ],
+        )
+
+    def risk_level(self):
+        from app.services.credit.risk import get_risk_level
+
+        risk_rules = self.snapshot.risk_rules
+        return _timed(
+            get_risk_level,
+            [
+                (z["state_risk"], z["debt_ratio"], z["bureau_score"], risk_rules)
+                for z in self.zen_inputs
+            ],
+        )
+
+    def risk_level_indexed(self):
+        return _timed(
+            self.snapshot.risk_index.risk_level,
+            [
+                (z["state_risk"], z["debt_ratio"], z["bureau_score"])
+                for z in self.zen_inputs
+            ],
+        )
+
+    async def load_rules(self):
+        from app.services.credit.loaders import load_rules
+
+        # Rule loading doesn't depend on the applicants; cap the call count.
+        calls = min(len(self.applications), 200)
+        return await _timed_async(load_rules, [(self.session,)] * calls)
+
+    def decision_evaluate(self):
+        from app.services.credit.loan_evaluator import get_decision_engine
+
+        return _timed(get_decision_engine().evaluate, [(z,) for z in self.zen_inputs])
+
+    async def evaluate_loan(self):
+        from app.services.credit.loan_evaluator import evaluate_loan
+
+        return await _timed_async(
+            evaluate_loan, [(request, self.session) for request in self.applications]
+        )
+
+
+async def run_benchmarks(sizes, rounds: int, seed: int, only=None) -> dict:
+    results = {}
+    names = [n for n in PipelineBenchmarks.NAMES if not only or n in only]
+    for size in sizes:
+        applications = generate_applications(size, seed=seed + size)
+        bench = PipelineBenchmarks()
+        await bench.setup(applications)
+        try:
+            for name in names:
+                method = getattr(bench, name)
+                measured = []
+                for _ in range(rounds):
+                    outcome = method()
+                    if asyncio.iscoroutine(outcome):
+                        outcome = await outcome
+                    measured.append(outcome)
+                results[f"{name}/{size}"] = summarize(measured)
+                print(
+                    f"{name:>22} n={size:<6} {results[f'{name}/{size}']['ops_per_sec']:>12.0f} ops/s"
+                    f"  p99 {results[f'{name}/{size}']['p99_us']:>10.1f} us",
+                    file=sys.stderr,
+                )
+        finally:
+            await bench.teardown()
+    return results
+
+
+def environment() -> dict:
+    import numpy
+    import sqlalchemy
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except Exception:
+        commit = None
+
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": numpy.__version__,
+        "sqlalchemy": sqlalchemy.__version__,
+        "database_url": os.environ["DATABASE_URL"],
+    }
+
+
+async def _run(args) -> dict:
+    from app.core.database import dispose_engine
+
+    try:
+        return await run_benchmarks(args.sizes, args.rounds, args.seed, args.only)
+    finally:
+        await dispose_engine()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000])
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--only", nargs="+", choices=PipelineBenchmarks.NAMES)
+    parser.add_argument("--output", help="Write results JSON here (default: stdout)")
+    parser.add_argument("--baseline", help="Baseline JSON to compare against")
+    parser.add_argument("--throughput-tolerance", type=float, default=0.20)
+    parser.add_argument("--latency-tolerance", type=float, default=0.50)
+    args = parser.parse_args(argv)
+
+    # Post-action and rule-load logging would dominate the timings.
+    logging.disable(logging.WARNING)
+
+    seed_database(os.environ["DATABASE_URL"])
+    report = {
+        "environment": environment(),
+        "config": {"sizes": args.sizes, "rounds": args.rounds, "seed": args.seed},
+        "results": asyncio.run(_run(args)),
+    }
+
+    payload = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(payload + "\n")
+    else:
+        print(payload)
+
+    if os.environ["DATABASE_URL"].endswith(BENCHMARK_DB_PATH) and os.path.exists(
+        BENCHMARK_DB_PATH
+    ):
+        os.remove(BENCHMARK_DB_PATH)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        rows = compare(
+            baseline["results"],
+            report["results"],
+            args.throughput_tolerance,
+            args.latency_tolerance,
+        )
+        if print_comparison(rows):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
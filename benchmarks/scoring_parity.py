@@ -0,0 +1,266 @@
+"""
+Credit scorer: the compiled scorer vs calculate_credit_score over the band domain.
+
+For the shipped bureau config and a few edited variants (fractional and
+inverted thresholds, float bonuses, a tight clamp), compares
+compile_credit_scorer(cfg) with calculate_credit_score, and the vectorised
+calculate_credit_scores, on:
+
+- every debt-ratio, employment and age band edge, the nearest values on either
+  side of it and a point inside each band, in every combination;
+- out-of-range values (negative, zero, huge, +-inf, NaN debt ratios);
+- missing values (None in each input): both must raise the same error;
+- random applicants across the whole range.
+
+Also checks compile_credit_scorer rejects a config with any key missing.
+Then times both scorers.
+
+    python -m benchmarks.scoring_parity
+    python -m benchmarks.scoring_parity --samples 1000000 --config path/to/config.json
+"""
+
+import argparse
+import itertools
+import json
+import math
+import random
+import sys
+import time
+
+import numpy as np
+
+from app.services.credit.loaders import BUREAU_CONFIG_FILE
+from app.services.credit.scoring import (
+    BUREAU_CONFIG_KEYS,
+    calculate_credit_score,
+    calculate_credit_scores,
+    compile_credit_scorer,
+)
+
+OUT_OF_RANGE_INTEGERS = (-(10**9), -1, 0, 1, 10**9)
+OUT_OF_RANGE_RATIOS = (-math.inf, -(10**9), -1.0, -0.0, 0.0, 10**9, math.inf, math.nan)
+
+
+class Applicant:
+    __slots__ = ("employment_duration_months", "age")
+
+    def __init__(self, employment_duration_months, age):
+        self.employment_duration_months = employment_duration_months
+        self.age = age
+
+
+def config_variants(cfg: dict) -> dict[str, dict]:
+    return {
+        "shipped": cfg,
+        "fractional thresholds": {
+            **cfg,
+            "debt_low_threshold": 0.1 + 0.2,
+            "emp_long_months": 47.5,
+            "emp_medium_months": 23.5,
+            "emp_short_months": 11.5,
+            "age_min": 29.5,
+            "age_max": 50.5,
+        },
+        # Bands that overlap or are out of order: the elif chains decide.
+        "inverted thresholds": {
+            **cfg,
+            "debt_low_threshold": cfg["debt_medium_threshold"],
+            "debt_medium_threshold": cfg["debt_low_threshold"],
+            "debt_high_threshold": cfg["debt_low_threshold"],
+            "emp_medium_months": cfg["emp_long_months"],
+            "emp_short_months": cfg["emp_long_months"] + 1,
+            "age_min": cfg["age_max"],
+            "age_max": cfg["age_min"],
+        },
+        "float bonuses": {
+            **cfg,
+            "debt_low_bonus": 150.5,
+            "emp_short_penalty": 49.25,
+            "age_bonus": 0.1,
+        },
+        "tight clamp": {**cfg, "score_min": 650, "score_max": 700},
+    }
+
+
+def band_points(thresholds, integral: bool) -> list:
+    """
+    Every threshold, the nearest values on either side of it and a point
+    inside each band between consecutive thresholds.
+    """
+    edges = sorted(set(thresholds))
+    points = set()
+    for t in edges:
+        if integral:
+            points.update({math.floor(t) - 1, math.floor(t), math.ceil(t)})
+            points.add(math.ceil(t) + 1)
+        else:
+            points.update({math.nextafter(t, -math.inf), t})
+            points.add(math.nextafter(t, math.inf))
+    for low, high in zip(edges, edges[1:]):
+        middle = (low + high) / 2
+        points.add(math.floor(middle) if integral else middle)
+    points.update(OUT_OF_RANGE_INTEGERS if integral else OUT_OF_RANGE_RATIOS)
+    return list(points)
+
+
+def domain(cfg: dict) -> list[tuple]:
+    debt_ratios = band_points(
+        [
+            cfg["debt_low_threshold"],
+            cfg["debt_medium_threshold"],
+            cfg["debt_high_threshold"],
+        ],
+        integral=False,
+    )
+    employment = band_points(
+        [cfg["emp_long_months"], cfg["emp_medium_months"], cfg["emp_short_months"]],
+        integral=True,
+    )
+    ages = band_points([cfg["age_min"], cfg["age_max"]], integral=True)
+    return list(itertools.product(debt_ratios, employment, ages))
+
+
+def random_points(rng: random.Random, n: int) -> list[tuple]:
+    return [
+        (rng.uniform(-0.5, 3.0), rng.randrange(-12, 600), rng.randrange(-5, 120))
+        for _ in range(n)
+    ]
+
+
+def _outcome(fn, *args):
+    try:
+        return fn(*args)
+    except Exception as e:
+        return type(e)
+
+
+def _same(expected, actual) -> bool:
+    return expected == actual and type(expected) is type(actual)
+
+
+def check_points(name: str, cfg: dict, points: list[tuple]) -> int:
+    scorer = compile_credit_scorer(cfg)
+    mismatches = 0
+
+    def report(point, expected, actual, label):
+        nonlocal mismatches
+        mismatches += 1
+        if mismatches <= 5:
+            print(
+                f"MISMATCH [{name}] {label} at (debt_ratio, employment_months, age)"
+                f"={point}: reference={expected!r} compiled={actual!r}",
+                file=sys.stderr,
+            )
+
+    for point in points:
+        debt_ratio, employment_months, age = point
+        expected = _outcome(
+            calculate_credit_score, Applicant(employment_months, age), debt_ratio, cfg
+        )
+        actual = _outcome(scorer, debt_ratio, employment_months, age)
+        if not _same(expected, actual):
+            report(point, expected, actual, "scalar")
+
+    debt_ratios, employment, ages = (np.asarray(column) for column in zip(*points))
+    vectorised = calculate_credit_scores(debt_ratios, employment, ages, cfg)
+    for point, value in zip(points, vectorised.tolist()):
+        expected = calculate_credit_score(Applicant(point[1], point[2]), point[0], cfg)
+        if value != expected:
+            report(point, expected, value, "vectorised")
+    return mismatches
+
+
+def check_missing_values(name: str, cfg: dict) -> int:
+    """
+    None in any input: both scorers must fail, and with the same error.
+    """
+    scorer = compile_credit_scorer(cfg)
+    mismatches = 0
+    present = (cfg["debt_low_threshold"], cfg["emp_long_months"], cfg["age_min"])
+    for position in range(3):
+        point = list(present)
+        point[position] = None
+        debt_ratio, employment_months, age = point
+        expected = _outcome(
+            calculate_credit_score, Applicant(employment_months, age), debt_ratio, cfg
+        )
+        actual = _outcome(scorer, debt_ratio, employment_months, age)
+        if not (isinstance(expected, type) and expected is actual):
+            mismatches += 1
+            print(
+                f"MISMATCH [{name}] missing value at {tuple(point)}: "
+                f"reference={expected!r} compiled={actual!r}",
+                file=sys.stderr,
+            )
+    return mismatches
+
+
+def check_missing_keys(cfg: dict) -> int:
+    failures = 0
+    for key in BUREAU_CONFIG_KEYS:
+        partial = {k: v for k, v in cfg.items() if k != key}
+        if _outcome(compile_credit_scorer, partial) is not ValueError:
+            failures += 1
+            print(f"Config without {key!r} was not rejected", file=sys.stderr)
+    return failures
+
+
+def time_per_call(fn, points, min_seconds: float = 0.3) -> float:
+    """
+    Microseconds per call, repeating the points until min_seconds have passed.
+    """
+    calls = 0
+    started = time.perf_counter()
+    while True:
+        for point in points:
+            fn(*point)
+        calls += len(points)
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_seconds:
+            return elapsed / calls * 1e6
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--samples", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--config", default=str(BUREAU_CONFIG_FILE))
+    args = parser.parse_args(argv)
+
+    with open(args.config) as f:
+        cfg = json.load(f)
+
+    rng = random.Random(args.seed)
+    samples = random_points(rng, args.samples)
+    mismatches = check_missing_keys(cfg)
+    for name, variant in config_variants(cfg).items():
+        edges = domain(variant)
+        found = check_points(name, variant, edges + samples)
+        found += check_missing_values(name, variant)
+        print(
+            f"{name:<22} {len(edges):>6} band points + {len(samples)} random, "
+            f"{found} mismatches"
+        )
+        mismatches += found
+
+    scorer = compile_credit_scorer(cfg)
+    timed = samples[:2000]
+    applicants = [(Applicant(e, a), d) for d, e, a in timed]
+    reference_us = time_per_call(
+        lambda applicant, debt_ratio: calculate_credit_score(
+            applicant, debt_ratio, cfg
+        ),
+        applicants,
+    )
+    compiled_us = time_per_call(scorer, timed)
+    print(
+        f"reference {reference_us:.2f} us  compiled {compiled_us:.2f} us  "
+        f"{reference_us / compiled_us:.1f}x"
+    )
+
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
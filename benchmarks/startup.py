@@ -0,0 +1,161 @@
+"""
+Cold start: importing the service and warming it up, in fresh interpreters.
+
+Each run starts a new Python process with -X importtime that imports main
+and runs the startup warm-up against a freshly seeded DB, then reports the
+import cost per top-level package and the time of each warm-up phase
+(medians across runs).
+
+    python -m benchmarks.startup
+    python -m benchmarks.startup --runs 7 --max-ready-ms 1500
+
+With --max-import-ms / --max-ready-ms, exits non-zero when the median
+exceeds the budget, so a cold-start regression fails CI.
+"""
+
+from collections import defaultdict
+from pathlib import Path
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from benchmarks import BENCHMARK_DB_PATH
+from benchmarks.db import seed_database
+
+ROOT = Path(__file__).resolve().parent.parent
+
+CHILD = """
+import asyncio, json, logging
+logging.disable(logging.WARNING)
+import main
+from app.core.database import dispose_engine
+
+async def run():
+    try:
+        await main.warm_up_service()
+    finally:
+        await dispose_engine()
+
+asyncio.run(run())
+print(json.dumps(main.startup_profile.stats()))
+"""
+
+
+def parse_importtime(stderr: str) -> dict[str, float]:
+    """
+    Self time per top-level package in ms, from -X importtime output.
+    Summing self times counts every module exactly once.
+    """
+    packages = defaultdict(float)
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, _, name = line[len("import time:") :].split("|")
+        if not self_us.strip().isdigit():
+            continue  # header row
+        packages[name.strip().split(".")[0]] += int(self_us) / 1000
+    return dict(packages)
+
+
+def run_once() -> dict:
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CHILD],
+        cwd=ROOT,
+        env=os.environ,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if process.returncode != 0:
+        raise RuntimeError(f"Startup run failed:\n{process.stderr[-2000:]}")
+    stats = json.loads(process.stdout.strip().splitlines()[-1])
+    return {"stats": stats, "packages": parse_importtime(process.stderr)}
+
+
+def _median(values) -> float:
+    return statistics.median(values) if values else 0.0
+
+
+def run(runs: int) -> dict:
+    samples = [run_once() for _ in range(runs)]
+    phases = defaultdict(list)
+    packages = defaultdict(list)
+    for sample in samples:
+        for name, seconds in sample["stats"]["phases"].items():
+            phases[name].append(seconds * 1000)
+        for name, ms in sample["packages"].items():
+            packages[name].append(ms)
+
+    return {
+        "runs": runs,
+        "import_ms": _median([s["stats"]["imports_seconds"] * 1000 for s in samples]),
+        "warmup_ms": _median([s["stats"]["warmup_seconds"] * 1000 for s in samples]),
+        "ready_ms": _median([s["stats"]["ready_seconds"] * 1000 for s in samples]),
+        "phases_ms": {name: _median(values) for name, values in phases.items()},
+        # A package missing from a run (not imported) counts as 0 there.
+        "packages_ms": dict(
+            sorted(
+                (
+                    (name, _median(values + [0.0] * (runs - len(values))))
+                    for name, values in packages.items()
+                ),
+                key=lambda item: item[1],
+                reverse=True,
+            )
+        ),
+    }
+
+
+def print_report(result: dict, top: int) -> None:
+    print(f"median of {result['runs']} cold starts")
+    print(f"  imports  {result['import_ms']:>8.1f} ms")
+    print(f"  warm-up  {result['warmup_ms']:>8.1f} ms")
+    for name, ms in result["phases_ms"].items():
+        print(f"    {name:<16} {ms:>8.1f} ms")
+    print(f"  ready    {result['ready_ms']:>8.1f} ms")
+    print(f"heaviest imports (self time, top {top})")
+    for name, ms in list(result["packages_ms"].items())[:top]:
+        print(f"  {name:<24} {ms:>8.1f} ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--output", help="Also write the results JSON here")
+    parser.add_argument("--max-import-ms", type=float)
+    parser.add_argument("--max-ready-ms", type=float)
+    args = parser.parse_args(argv)
+
+    seed_database(os.environ["DATABASE_URL"])
+    try:
+        result = run(args.runs)
+    finally:
+        if os.environ["DATABASE_URL"].endswith(BENCHMARK_DB_PATH) and os.path.exists(
+            BENCHMARK_DB_PATH
+        ):
+            os.remove(BENCHMARK_DB_PATH)
+
+    print_report(result, args.top)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(json.dumps(result, indent=2) + "\n")
+
+    over_budget = [
+        f"{label} {result[key]:.1f} ms > {budget:.1f} ms"
+        for label, key, budget in (
+            ("imports", "import_ms", args.max_import_ms),
+            ("ready", "ready_ms", args.max_ready_ms),
+        )
+        if budget is not None and result[key] > budget
+    ]
+    if over_budget:
+        print("Over budget: " + "; ".join(over_budget))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
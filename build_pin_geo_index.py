@@ -0,0 +1,118 @@
+"""
+Builds the PIN geo index used by PIN_GEO_MODE from the India Post directory.
+
+Reads the all-India pincode directory CSV (one row per post office, with
+pincode, district and statename columns), optionally assigns city tiers per
+district from a tier map CSV (state,district,tier), and writes the sorted
+binary file that the API memory-maps at startup.
+
+    python build_pin_geo_index.py pincode_directory.csv --tier-map tiers.csv
+    python build_pin_geo_index.py pincode_directory.csv -o /srv/pin_geo_index.bin
+"""
+
+import argparse
+import csv
+import logging
+import sys
+
+from app.services.pin_geo import PIN_GEO_FILE, write_pin_geo_index
+
+logger = logging.getLogger("build_pin_geo_index")
+
+PIN_COLUMNS = ("pincode", "pin_code", "pin")
+STATE_COLUMNS = ("statename", "state_name", "state")
+DISTRICT_COLUMNS = ("district", "districtname", "district_name")
+TIER_COLUMNS = ("tier", "city_tier")
+# Lower-case words inside names, e.g. "ANDAMAN AND NICOBAR ISLANDS".
+MINOR_WORDS = {"and", "of"}
+
+
+def normalize_name(name: str) -> str:
+    """
+    India Post names are upper case; the rule tables use title case
+    ("TAMIL NADU" -> "Tamil Nadu").
+    """
+    words = name.strip().replace("&", "and").split()
+    return " ".join(
+        word.lower() if i and word.lower() in MINOR_WORDS else word.capitalize()
+        for i, word in enumerate(words)
+    )
+
+
+def _column(fieldnames, candidates, required: bool = True) -> str | None:
+    by_key = {name.strip().lower(): name for name in fieldnames or ()}
+    for candidate in candidates:
+        if candidate in by_key:
+            return by_key[candidate]
+    if required:
+        raise SystemExit(f"Missing column, expected one of: {', '.join(candidates)}")
+    return None
+
+
+def read_tier_map(path: str) -> dict[tuple[str, str], str]:
+    with open(path, "r", newline="") as f:
+        reader = csv.DictReader(f)
+        state = _column(reader.fieldnames, STATE_COLUMNS)
+        district = _column(reader.fieldnames, DISTRICT_COLUMNS)
+        tier = _column(reader.fieldnames, TIER_COLUMNS)
+        tiers = {}
+        for row in reader:
+            key = (normalize_name(row[state]), normalize_name(row[district]))
+            tiers[key] = row[tier].strip()
+        return tiers
+
+
+def read_directory(path: str, tier_map: dict, default_tier: str | None):
+    """
+    Yields (pin, state, district, tier) per post office row; rows without a
+    valid six-digit PIN are skipped.
+    """
+    skipped = 0
+    with open(path, "r", newline="", encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f)
+        pin_col = _column(reader.fieldnames, PIN_COLUMNS)
+        state_col = _column(reader.fieldnames, STATE_COLUMNS)
+        district_col = _column(reader.fieldnames, DISTRICT_COLUMNS)
+        tier_col = _column(reader.fieldnames, TIER_COLUMNS, required=False)
+
+        for row in reader:
+            pin = (row[pin_col] or "").strip()
+            if len(pin) != 6 or not pin.isascii() or not pin.isdigit():
+                skipped += 1
+                continue
+            state = normalize_name(row[state_col] or "")
+            district = normalize_name(row[district_col] or "")
+            tier = (row[tier_col] or "").strip() if tier_col else ""
+            tier = tier or tier_map.get((state, district)) or default_tier
+            yield int(pin), state, district, tier
+
+    if skipped:
+        logger.warning("Skipped %d rows without a valid PIN code", skipped)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("input", help="India Post pincode directory CSV")
+    parser.add_argument(
+        "-o", "--output", default=str(PIN_GEO_FILE), help="Index file to write"
+    )
+    parser.add_argument(
+        "--tier-map", help="CSV of state,district,tier assigning city tiers"
+    )
+    parser.add_argument(
+        "--default-tier",
+        help="Tier for PINs the tier map doesn't cover (default: unknown, so "
+        "the client's city_tier is kept)",
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr)
+    tier_map = read_tier_map(args.tier_map) if args.tier_map else {}
+    count = write_pin_geo_index(
+        args.output, read_directory(args.input, tier_map, args.default_tier)
+    )
+    logger.info("Wrote %d PINs to %s", count, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Bulk-imports a rule table from a CSV file.
+
+The CSV header names the table's columns (e.g. pin_code for
+unserviceable_pins; state,risk_level for state_risk). By default the table is
+made to match the file exactly; --upsert keeps rows the file doesn't mention.
+The whole import is one transaction.
+
+    python import_rules.py unserviceable_pins pins.csv
+    python import_rules.py state_risk state_risk.csv --upsert --dry-run
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+
+logger = logging.getLogger("import_rules")
+
+
+async def run(args) -> dict:
+    from app.core.database import dispose_engine, get_engine
+    from app.services.rule_import import import_rule_table
+
+    try:
+        return await import_rule_table(
+            get_engine(),
+            args.table,
+            args.input,
+            delete_missing=not args.upsert,
+            dry_run=args.dry_run,
+            batch_size=args.batch_size,
+        )
+    finally:
+        await dispose_engine()
+
+
+def main(argv=None):
+    from app.services.rule_import import IMPORT_SPECS, RuleImportError
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("table", choices=sorted(IMPORT_SPECS))
+    parser.add_argument("input", help="CSV file with a header row")
+    parser.add_argument(
+        "--upsert",
+        action="store_true",
+        help="Insert and update only; keep rows missing from the file",
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Report the changes and roll back"
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=5000,
+        help="Rows per executemany batch (non-Postgres databases)",
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr)
+    try:
+        result = asyncio.run(run(args))
+    except RuleImportError as e:
+        logger.error("%s", e)
+        sys.exit(1)
+    print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
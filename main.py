@@ -1,9 +1,112 @@
+from app.core.startup import startup_profile  # first, so imports are timed
+
+from contextlib import asynccontextmanager
+import asyncio
 import uvicorn
 from fastapi import FastAPI
+from app.api.debug import router as debug_router
+from app.api.health import router as health_router
 from app.api.loan import router as loan_router
+from app.api.metrics import router as metrics_router
+from app.api.shadow import router as shadow_router
+from app.core import settings
+from app.core.database import database_url, dispose_engine, new_session, pool_stats
+from app.core.metrics import MetricsMiddleware, registry
+from app.services.credit.loan_evaluator import (
+    get_decision_engine,
+    get_shadow_evaluator,
+    location_resolver,
+    warm_up,
+)
+from app.services.credit.rule_listener import create_rule_listener
+from app.services.credit.scoring import credit_scorer_cache
+from app.services.credit.snapshot import rule_snapshot_cache
+from app.services.admission import admission_controller
+from app.services.decision_audit import decision_audit_writer
+from app.services.idempotency import idempotency_store
+from app.services.outbox_dispatcher import outbox_dispatcher
+
+WARMUP_MODES = ("blocking", "background", "off")
+
+# Component stats, exported as gauges on every /metrics scrape
+registry.register_stats("startup", startup_profile.stats)
+registry.register_stats("db_pool", pool_stats)
+registry.register_stats("rule_snapshot", rule_snapshot_cache.stats)
+registry.register_stats("credit_scorer", credit_scorer_cache.stats)
+registry.register_stats("outbox", outbox_dispatcher.stats)
+registry.register_stats("pin_geo", location_resolver.stats)
+registry.register_stats("idempotency", idempotency_store.stats)
+registry.register_stats("admission", admission_controller.stats)
+registry.register_stats("decision_audit", decision_audit_writer.stats)
+
+startup_profile.imports_done()
+
+
+async def warm_up_service() -> None:
+    startup_profile.warming()
+    try:
+        await warm_up(startup_profile)
+    except Exception as e:
+        startup_profile.mark_failed(e)
+        raise
+    startup_profile.mark_ready()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.STARTUP_WARMUP not in WARMUP_MODES:
+        raise ValueError(f"Unknown startup warm-up mode: {settings.STARTUP_WARMUP!r}")
+
+    # Created here rather than at import: it needs DATABASE_URL.
+    rule_listener = create_rule_listener(
+        rule_snapshot_cache, new_session, database_url()
+    )
+    registry.register_stats("rule_listener", rule_listener.stats)
+    # Also built here rather than at import: loading zen and parsing the rules
+    # file belong to startup, not to importing the app.
+    decision_engine = get_decision_engine()
+    shadow_evaluator = get_shadow_evaluator()
+    registry.register_stats("decision_engine", decision_engine.stats)
+    registry.register_stats("decision_executor", decision_engine.executor.stats)
+    registry.register_stats("shadow", shadow_evaluator.stats)
+
+    warmup_task = None
+    if settings.STARTUP_WARMUP == "blocking":
+        await warm_up_service()
+    elif settings.STARTUP_WARMUP == "background":
+        warmup_task = asyncio.get_running_loop().create_task(warm_up_service())
+    else:
+        startup_profile.mark_ready()
+
+    decision_engine.start_watching()
+    await rule_listener.start()
+    await outbox_dispatcher.start()
+    await shadow_evaluator.start()
+    await decision_audit_writer.start()
+    yield
+    startup_profile.stopping()
+    if warmup_task is not None:
+        warmup_task.cancel()
+        await asyncio.gather(warmup_task, return_exceptions=True)
+    await shadow_evaluator.stop()
+    await outbox_dispatcher.stop()
+    await rule_listener.stop()
+    decision_engine.stop_watching()
+    decision_engine.executor.shutdown()
+    # Last, so decisions made while shutting down are still written.
+    await decision_audit_writer.stop()
+    await dispose_engine()
+
 
-app = FastAPI(title="Location aware Loan Engine")
+app = FastAPI(title="Location aware Loan Engine", lifespan=lifespan)
+app.add_middleware(MetricsMiddleware)
 app.include_router(loan_router)
+app.include_router(metrics_router)
+app.include_router(health_router)
+# Expose applicant data without authentication; opt-in only.
+if settings.DEBUG_ENDPOINTS:
+    app.include_router(shadow_router)
+    app.include_router(debug_router)
 
 
 if __name__ == "__main__":
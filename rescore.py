@@ -0,0 +1,189 @@
+"""
+Offline bulk re-scoring of historical loan applications.
+
+Streams applications from a CSV or NDJSON file, validates each row against
+LoanRequest and runs the same pipeline as /loan/evaluate (without the
+post-approval actions) in a pool of worker processes. Results are written as
+NDJSON, one line per input row and in input order.
+
+    python rescore.py applications.csv -o decisions.ndjson --workers 8
+"""
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import time
+
+from pydantic import ValidationError
+
+from app.services.applications_io import load_live_snapshot, read_applications
+
+logger = logging.getLogger("rescore")
+
+# Set in each worker process by _init_worker
+_snapshot = None
+_scorer = None
+_engine = None
+
+
+def chunked(iterable, size: int):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def _init_worker(snapshot, bureau_cfg, bureau_version):
+    global _snapshot, _scorer, _engine
+    from app.services.credit.loan_evaluator import RULES_FILE
+    from app.services.credit.scoring import CreditScorer, compile_credit_scorer
+    from app.services.zen_engine import DecisionExecutor, LoanDecisionEngine
+
+    _snapshot = snapshot
+    # Compiled once per worker; the parent already validated the config.
+    _scorer = CreditScorer(
+        cfg=bureau_cfg,
+        version=bureau_version,
+        score=compile_credit_scorer(bureau_cfg),
+    )
+    # Workers evaluate synchronously; no watcher or thread pool needed.
+    _engine = LoanDecisionEngine(
+        RULES_FILE, watch_interval=0, executor=DecisionExecutor("inline", 1)
+    )
+    _engine.load()
+
+
+def _score_chunk(chunk):
+    from app.schemas.loan import LoanRequest
+    from app.services.credit.loan_evaluator import build_response, prepare_evaluation
+
+    results = []
+    for row_number, raw in chunk:
+        try:
+            request = LoanRequest.model_validate(raw)
+        except ValidationError as e:
+            results.append({"row": row_number, "error": e.errors(include_url=False)})
+            continue
+
+        try:
+            zen_input, derived = prepare_evaluation(request, _snapshot, _scorer)
+            raw_result = _engine.evaluate(zen_input, _snapshot.version)
+            results.append({"row": row_number, **build_response(raw_result, **derived)})
+        except Exception as e:
+            results.append({"row": row_number, "error": str(e)})
+
+    return results
+
+
+def rescore(
+    input_path: str,
+    output,
+    fmt: str,
+    workers: int,
+    chunk_size: int,
+    progress_interval: float,
+) -> dict:
+    from app.services.credit.scoring import credit_scorer_cache
+
+    snapshot = asyncio.run(load_live_snapshot())
+    scorer = credit_scorer_cache.get()
+    logger.info(
+        "Rule snapshot %s loaded, starting %d workers", snapshot.version, workers
+    )
+
+    rows = errors = 0
+    started = last_report = time.perf_counter()
+
+    def report(final=False):
+        elapsed = time.perf_counter() - started
+        logger.info(
+            "%s %d rows | %d errors | %.0f rows/sec",
+            "Done:" if final else "Progress:",
+            rows,
+            errors,
+            rows / elapsed if elapsed else 0.0,
+        )
+
+    # spawn, not fork: workers start clean instead of inheriting the parent's
+    # DB engine and event-loop state.
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=context,
+        initializer=_init_worker,
+        initargs=(snapshot, scorer.cfg, scorer.version),
+    ) as pool:
+        # At most 2 chunks per worker are in flight, which bounds memory
+        # while keeping every worker busy. Results are written oldest-first.
+        pending = deque()
+        chunks = chunked(read_applications(input_path, fmt), chunk_size)
+
+        def drain_one():
+            nonlocal rows, errors, last_report
+            for result in pending.popleft().result():
+                output.write(json.dumps(result, default=str) + "\n")
+                rows += 1
+                errors += "error" in result
+
+            now = time.perf_counter()
+            if now - last_report >= progress_interval:
+                last_report = now
+                report()
+
+        for chunk in chunks:
+            pending.append(pool.submit(_score_chunk, chunk))
+            if len(pending) >= workers * 2:
+                drain_one()
+        while pending:
+            drain_one()
+
+    output.flush()
+    report(final=True)
+    return {"rows": rows, "errors": errors, "rule_version": snapshot.version}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("input", help="CSV or NDJSON file of loan applications")
+    parser.add_argument("-o", "--output", help="NDJSON output file (default: stdout)")
+    parser.add_argument(
+        "--format",
+        choices=("csv", "ndjson"),
+        help="Input format (default: from the file extension)",
+    )
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument(
+        "--progress-interval",
+        type=float,
+        default=5.0,
+        help="Seconds between progress reports on stderr",
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr)
+    fmt = args.format or ("csv" if args.input.lower().endswith(".csv") else "ndjson")
+
+    output = open(args.output, "w") if args.output else sys.stdout
+    try:
+        rescore(
+            args.input,
+            output,
+            fmt,
+            args.workers,
+            args.chunk_size,
+            args.progress_interval,
+        )
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+"""
+Shared test setup. Settings are read once at import, so the test database
+URL is set here, before any test module imports the app.
+"""
+
+import os
+import tempfile
+
+import pytest
+
+TEST_DB_PATH = os.path.join(tempfile.gettempdir(), "loan_engine_test.db")
+
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{TEST_DB_PATH}"
+
+
+@pytest.fixture(scope="session")
+def seeded_database():
+    """
+    The test database with the schema and the seed migration's rule data.
+    """
+    from benchmarks.db import seed_database
+
+    seed_database(os.environ["DATABASE_URL"])
+    yield
+    if os.path.exists(TEST_DB_PATH):
+        os.remove(TEST_DB_PATH)
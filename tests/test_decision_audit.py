@@ -0,0 +1,38 @@
+import asyncio
+
+from app.services.decision_audit import DecisionAuditWriter
+
+
+class _UnavailableEngine:
+    def begin(self):
+        raise ConnectionError("database is down")
+
+
+def _writer() -> DecisionAuditWriter:
+    return DecisionAuditWriter(
+        _UnavailableEngine,
+        mode="batched",
+        batch_size=2,
+        flush_interval=1.0,
+        max_buffer=10,
+        enqueue_timeout=0.01,
+    )
+
+
+async def _commit_with_failing_inline_flush(writer: DecisionAuditWriter) -> list:
+    committed = []
+    for i in range(2):
+        async with writer.reserve([{"row": i}]):
+            committed.append(i)
+    return committed
+
+
+def test_inline_flush_failure_does_not_fail_the_committed_request():
+    writer = _writer()
+    committed = asyncio.run(_commit_with_failing_inline_flush(writer))
+
+    assert committed == [0, 1]
+    stats = writer.stats()
+    assert stats["flush_failures"] == 1
+    assert stats["recorded"] == 2
+    assert stats["buffered"] == 2
@@ -0,0 +1,117 @@
+import asyncio
+import copy
+import json
+
+import pytest
+import zen
+
+from app.services.credit.loan_evaluator import RULES_FILE
+from app.services.decision_compiler import UnsupportedDecision, compile_decision
+from app.services.zen_engine import LoanDecisionEngine
+from benchmarks.decision_parity import (
+    async_results,
+    generate_inputs,
+    load_seeded_rules,
+)
+
+SAMPLES = 5000
+
+RULES = json.loads(RULES_FILE.read_text())
+
+
+def _zen_decision(graph: dict):
+    return zen.ZenEngine().create_decision(zen.ZenDecisionContent(json.dumps(graph)))
+
+
+def _table(graph: dict, name: str) -> dict:
+    return next(node for node in graph["nodes"] if node["name"] == name)["content"]
+
+
+def _with_range_cell(graph: dict) -> None:
+    table = _table(graph, "LoanPolicy")
+    income = next(c["id"] for c in table["inputs"] if c["field"] == "monthly_income")
+    table["rules"][1][income] = "[0..10000]"
+
+
+def _with_function_node(graph: dict) -> None:
+    request = next(n for n in graph["nodes"] if n["type"] == "inputNode")
+    graph["nodes"].append(
+        {
+            "id": "function-node",
+            "type": "functionNode",
+            "name": "Passthrough",
+            "position": {"x": 0, "y": 0},
+            "content": {"source": "export const handler = async (input) => input;"},
+        }
+    )
+    edge = next(e for e in graph["edges"] if e["sourceId"] == request["id"])
+    graph["edges"].append(
+        {
+            "id": "function-edge",
+            "type": "edge",
+            "sourceId": request["id"],
+            "targetId": "function-node",
+        }
+    )
+    edge["sourceId"] = "function-node"
+
+
+def _with_collect_hit_policy(graph: dict) -> None:
+    _table(graph, "LoanPolicy")["hitPolicy"] = "collect"
+
+
+UNSUPPORTED = {
+    "range cell": _with_range_cell,
+    "function node": _with_function_node,
+    "collect hit policy": _with_collect_hit_policy,
+}
+
+
+def _variant(name: str) -> dict:
+    graph = copy.deepcopy(RULES)
+    UNSUPPORTED[name](graph)
+    return graph
+
+
+@pytest.fixture(scope="module")
+def zen_inputs(seeded_database):
+    snapshot, scorer = asyncio.run(load_seeded_rules())
+    return generate_inputs(snapshot, scorer, SAMPLES, seed=7)
+
+
+def test_native_matches_zen_async_on_randomized_inputs(zen_inputs):
+    content = RULES_FILE.read_bytes()
+    native = compile_decision(content)
+    expected = asyncio.run(async_results(_zen_decision(RULES), zen_inputs))
+
+    for data, zen_result in zip(zen_inputs, expected):
+        assert native.evaluate(data)["result"] == zen_result, data
+
+
+@pytest.mark.parametrize("name", list(UNSUPPORTED))
+def test_unsupported_graph_is_rejected(name):
+    graph = _variant(name)
+    # zen itself accepts the graph; only the compiler can't handle it.
+    _zen_decision(graph).validate()
+
+    with pytest.raises(UnsupportedDecision):
+        compile_decision(json.dumps(graph))
+
+
+@pytest.mark.parametrize("name", list(UNSUPPORTED))
+def test_native_backend_falls_back_to_zen(name, tmp_path, zen_inputs):
+    graph = _variant(name)
+    rules_path = tmp_path / "loan_decision.json"
+    rules_path.write_text(json.dumps(graph))
+
+    engine = LoanDecisionEngine(rules_path, watch_interval=0, backend="native")
+    try:
+        engine.load()
+        assert engine.stats()["active_backend"] == "zen"
+        assert engine.fallback_reason
+
+        reference = _zen_decision(graph)
+        for data in zen_inputs[:200]:
+            assert engine.evaluate(data)["result"] == reference.evaluate(data)["result"]
+    finally:
+        engine.executor.shutdown()
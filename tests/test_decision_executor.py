@@ -0,0 +1,38 @@
+import asyncio
+
+import pytest
+
+from app.services.zen_engine import DecisionExecutor
+
+
+class _Decision:
+    def evaluate(self, input_data: dict, options: dict | None = None):
+        if input_data.get("fail"):
+            raise RuntimeError("evaluation failed")
+        return {"result": input_data}
+
+    async def async_evaluate(self, input_data: dict, options: dict | None = None):
+        return self.evaluate(input_data, options)
+
+
+async def _run_all(executor: DecisionExecutor, inputs: list[dict]) -> None:
+    decision = _Decision()
+    for input_data in inputs:
+        try:
+            await executor.run(decision, input_data)
+        except RuntimeError:
+            pass
+
+
+@pytest.mark.parametrize("mode", DecisionExecutor.MODES)
+def test_errors_are_counted_as_failed_not_completed(mode):
+    executor = DecisionExecutor(mode, max_concurrency=2)
+    try:
+        asyncio.run(_run_all(executor, [{}, {"fail": True}, {}, {"fail": True}, {}]))
+    finally:
+        executor.shutdown()
+
+    stats = executor.stats()
+    assert stats["completed"] == 3
+    assert stats["failed"] == 2
+    assert stats["running"] == 0
@@ -0,0 +1,72 @@
+import asyncio
+import uuid
+
+import pytest
+from sqlalchemy import func, select
+
+from app.core.database import dispose_engine, new_session
+from app.models.post_approval_outbox import PostApprovalOutbox
+from app.schemas.loan import LoanRequest
+from app.services.credit.loan_evaluator import WARMUP_APPLICATION, evaluate_loan
+from app.services.idempotency import IdempotencyConflict, IdempotencyStore
+
+
+def _worker() -> IdempotencyStore:
+    # One store per simulated process; they only share the database.
+    return IdempotencyStore("header", max_entries=100, ttl_seconds=300)
+
+
+async def _run(store: IdempotencyStore, application: dict, key: str):
+    request = LoanRequest(**application)
+    async with new_session() as db:
+        return await store.run(
+            request,
+            key,
+            lambda idempotency: evaluate_loan(request, db, idempotency=idempotency),
+        )
+
+
+async def _outbox_rows(key: str) -> int:
+    async with new_session() as db:
+        return await db.scalar(
+            select(func.count())
+            .select_from(PostApprovalOutbox)
+            .where(PostApprovalOutbox.idempotency_key == key)
+        )
+
+
+async def _retry_on_another_worker(retried_application: dict):
+    key = str(uuid.uuid4())
+    second = _worker()
+    try:
+        first_result = await _run(_worker(), WARMUP_APPLICATION, key)
+        try:
+            retry_result = await _run(second, retried_application, key)
+        except IdempotencyConflict as e:
+            retry_result = e
+        return first_result, retry_result, second, await _outbox_rows(key)
+    finally:
+        await dispose_engine()
+
+
+def test_retry_on_another_worker_replays_the_committed_approval(seeded_database):
+    first, retry, second, rows = asyncio.run(
+        _retry_on_another_worker(WARMUP_APPLICATION)
+    )
+
+    response, replayed = first
+    assert response["decision"] == "APPROVED"
+    assert not replayed
+    assert retry == (response, True)
+    assert second.stats()["outbox_replays"] == 1
+    assert rows == 1
+
+
+def test_key_reused_with_another_payload_on_another_worker(seeded_database):
+    changed = {**WARMUP_APPLICATION, "loan_requested": 250000.0}
+    first, retry, second, rows = asyncio.run(_retry_on_another_worker(changed))
+
+    assert first[0]["decision"] == "APPROVED"
+    assert isinstance(retry, IdempotencyConflict)
+    assert second.stats()["conflicts"] == 1
+    assert rows == 1
@@ -0,0 +1,67 @@
+import asyncio
+
+from sqlalchemy import select
+
+from app.core.database import dispose_engine, new_session
+from app.models.city_rules import CityRule
+from app.services.credit.rule_listener import RuleChangeListener
+from app.services.credit.snapshot import rule_snapshot_cache
+
+UNCHANGED_TABLES = ("state_risk", "unserviceable_pins", "risk_rules")
+
+
+async def _set_multiplier(tier: str, multiplier: int) -> None:
+    async with new_session() as session:
+        row = await session.scalar(select(CityRule).where(CityRule.tier == tier))
+        row.multiplier = multiplier
+        await session.commit()
+
+
+async def _notify_city_rules_change():
+    """
+    Loads a snapshot, edits one city_rules row and notifies the stand-in
+    listener. Returns the snapshots before and after the reload, the edited
+    tier and the listener.
+    """
+    try:
+        rule_snapshot_cache.invalidate()
+        async with new_session() as session:
+            before = await rule_snapshot_cache.get(session)
+
+        tier = sorted(before.city_rules)[0]
+        multiplier = before.city_rules[tier]["multiplier"]
+        await _set_multiplier(tier, multiplier + 1)
+        try:
+            listener = RuleChangeListener(
+                rule_snapshot_cache, new_session, debounce_seconds=0
+            )
+            listener.notify("city_rules")
+            await listener._reload_task
+        finally:
+            await _set_multiplier(tier, multiplier)
+        return before, rule_snapshot_cache.current, tier, listener
+    finally:
+        rule_snapshot_cache.invalidate()
+        await dispose_engine()
+
+
+def test_notify_reloads_only_the_changed_table(seeded_database):
+    before, after, tier, listener = asyncio.run(_notify_city_rules_change())
+
+    assert listener.notifications == 1
+    assert listener.reloads == 1
+    assert listener.reload_failures == 0
+
+    assert after is not before
+    assert after.city_rules is not before.city_rules
+    assert (
+        after.city_rules[tier]["multiplier"]
+        == before.city_rules[tier]["multiplier"] + 1
+    )
+    assert after.table_versions["city_rules"] != before.table_versions["city_rules"]
+    assert after.version != before.version
+
+    for table in UNCHANGED_TABLES:
+        assert getattr(after, table) is getattr(before, table)
+        assert after.table_versions[table] == before.table_versions[table]
+    assert after.risk_index is before.risk_index
@@ -0,0 +1,39 @@
+import json
+
+import pytest
+
+from app.services.credit.loaders import BUREAU_CONFIG_FILE
+from app.services.credit.scoring import calculate_credit_score, compile_credit_scorer
+from benchmarks.scoring_parity import Applicant, config_variants, domain
+
+with open(BUREAU_CONFIG_FILE) as f:
+    VARIANTS = config_variants(json.load(f))
+
+
+@pytest.mark.parametrize("name", list(VARIANTS))
+def test_compiled_scorer_matches_reference_on_every_band_edge(name):
+    cfg = VARIANTS[name]
+    scorer = compile_credit_scorer(cfg)
+
+    for debt_ratio, employment_months, age in domain(cfg):
+        expected = calculate_credit_score(
+            Applicant(employment_months, age), debt_ratio, cfg
+        )
+        actual = scorer(debt_ratio, employment_months, age)
+        point = (debt_ratio, employment_months, age)
+        assert actual == expected, point
+        assert type(actual) is type(expected), point
+
+
+@pytest.mark.parametrize("name", list(VARIANTS))
+@pytest.mark.parametrize("missing", range(3))
+def test_compiled_scorer_fails_like_reference_on_missing_input(name, missing):
+    cfg = VARIANTS[name]
+    point = [cfg["debt_low_threshold"], cfg["emp_long_months"], cfg["age_min"]]
+    point[missing] = None
+    debt_ratio, employment_months, age = point
+
+    with pytest.raises(TypeError):
+        calculate_credit_score(Applicant(employment_months, age), debt_ratio, cfg)
+    with pytest.raises(TypeError):
+        compile_credit_scorer(cfg)(debt_ratio, employment_months, age)
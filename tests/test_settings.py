@@ -0,0 +1,29 @@
+import pytest
+
+from app.core.settings import _get_bool
+
+
+@pytest.mark.parametrize("value", ["1", "true", "True", "YES", " on "])
+def test_bool_setting_true(monkeypatch, value):
+    monkeypatch.setenv("DEBUG_ENDPOINTS", value)
+    assert _get_bool("DEBUG_ENDPOINTS", False) is True
+
+
+@pytest.mark.parametrize("value", ["0", "false", "No", "off"])
+def test_bool_setting_false(monkeypatch, value):
+    monkeypatch.setenv("DEBUG_ENDPOINTS", value)
+    assert _get_bool("DEBUG_ENDPOINTS", True) is False
+
+
+def test_bool_setting_unset_uses_default(monkeypatch):
+    monkeypatch.setenv("DEBUG_ENDPOINTS", "")
+    assert _get_bool("DEBUG_ENDPOINTS", True) is True
+    monkeypatch.delenv("DEBUG_ENDPOINTS")
+    assert _get_bool("DEBUG_ENDPOINTS", False) is False
+
+
+@pytest.mark.parametrize("value", ["0.5", "2", "enabled", "maybe"])
+def test_bool_setting_rejects_anything_else(monkeypatch, value):
+    monkeypatch.setenv("DEBUG_ENDPOINTS", value)
+    with pytest.raises(ValueError, match="DEBUG_ENDPOINTS"):
+        _get_bool("DEBUG_ENDPOINTS", False)